@@ -1,6 +1,9 @@
+import logging
 import os
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 class Settings:
     """Application settings loaded from environment variables"""
 
@@ -102,13 +105,74 @@ class Settings:
     USE_TOON = os.getenv('USE_TOON', 'true').lower() == 'true'
     print(f"[CONFIG]  Token Optimization (TOON): {'Enabled' if USE_TOON else 'Disabled'}")
 
+    # Story extraction batching - requirements analyzed per AI call, and the response token cap for a batch
+    STORY_EXTRACTION_BATCH_SIZE = int(os.getenv('STORY_EXTRACTION_BATCH_SIZE', 5))
+    STORY_EXTRACTION_BATCH_MAX_TOKENS = int(os.getenv('STORY_EXTRACTION_BATCH_MAX_TOKENS', 16000))
+    print(f"[CONFIG]  Story Extraction Batch Size: {STORY_EXTRACTION_BATCH_SIZE}, Max Tokens: {STORY_EXTRACTION_BATCH_MAX_TOKENS}")
+
+    # Test case extraction batching - user stories sent per AI call, and the response token cap for a batch
+    TEST_CASE_EXTRACTION_BATCH_SIZE = int(os.getenv('TEST_CASE_EXTRACTION_BATCH_SIZE', 5))
+    TEST_CASE_EXTRACTION_BATCH_MAX_TOKENS = int(os.getenv('TEST_CASE_EXTRACTION_BATCH_MAX_TOKENS', 16000))
+    print(f"[CONFIG]  Test Case Extraction Batch Size: {TEST_CASE_EXTRACTION_BATCH_SIZE}, Max Tokens: {TEST_CASE_EXTRACTION_BATCH_MAX_TOKENS}")
+    # How long the synchronous extraction API routes wait before answering 202 with a job ID to poll instead;
+    # covers a batched call of TEST_CASE_EXTRACTION_BATCH_MAX_TOKENS plus the OPENAI_MAX_RETRIES backoffs
+    TEST_CASE_EXTRACTION_WAIT_SECONDS = int(os.getenv('TEST_CASE_EXTRACTION_WAIT_SECONDS', 300))
+    
+    # Maximum AI requests in flight at once when extracting concurrently
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+    print(f"[CONFIG]  LLM Max Concurrency: {LLM_MAX_CONCURRENCY}")
+    
+    # Client-side AI rate limits (0 disables); keep them at or just below the provider's RPM/TPM quota
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', 0))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', 0))
+    print(f"[CONFIG]  LLM Rate Limits - Requests/min: {LLM_REQUESTS_PER_MINUTE or 'unlimited'}, Tokens/min: {LLM_TOKENS_PER_MINUTE or 'unlimited'}")
+    
+    # Persistent cache of AI responses keyed by prompt hash. Off by default: entries never expire, so once
+    # enabled, re-running an extraction returns the stored response until the cache directory is removed
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'false').lower() == 'true'
+    LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '.llm_cache')
+    print(f"[CONFIG]  LLM Response Cache: {'Enabled' if LLM_CACHE_ENABLED else 'Disabled'} ({LLM_CACHE_DIR})")
+    
+    # Semantic cache - reuse responses for near-duplicate requirements (needs sentence-transformers)
+    SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'false').lower() == 'true'
+    SEMANTIC_CACHE_MODEL = os.getenv('SEMANTIC_CACHE_MODEL', 'all-MiniLM-L6-v2')
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.95))
+    print(f"[CONFIG]  Semantic Cache: {'Enabled' if SEMANTIC_CACHE_ENABLED else 'Disabled'} (threshold {SEMANTIC_CACHE_THRESHOLD})")
+    
+    # Batch API runs - status poll interval, and how long to wait before falling back to direct calls
+    AI_BATCH_POLL_SECONDS = int(os.getenv('AI_BATCH_POLL_SECONDS', 60))
+    AI_BATCH_TIMEOUT_SECONDS = int(os.getenv('AI_BATCH_TIMEOUT_SECONDS', 6 * 3600))
+    
+    # Stream story-extraction responses so each story is built while the rest is still generating
+    STORY_STREAMING_ENABLED = os.getenv('STORY_STREAMING_ENABLED', 'true').lower() == 'true'
+    
+    # Stream test case extraction responses so each test case is built while the rest is still generating;
+    # skipped for providers that report no token usage on streams (Azure API versions before 2024-09-01)
+    TEST_CASE_STREAMING_ENABLED = os.getenv('TEST_CASE_STREAMING_ENABLED', 'true').lower() == 'true'
+    
+    # Model context window in tokens; requirements whose prompt would overflow it are extracted in parts
+    LLM_CONTEXT_WINDOW = int(os.getenv('LLM_CONTEXT_WINDOW', 16385))
+    
+    # Ask the model for schema-conforming JSON (structured outputs). Off by default: the default models
+    # (gpt-3.5-turbo / gpt-35-turbo) reject json_schema response formats; enable for gpt-4o and newer
+    STORY_STRUCTURED_OUTPUTS_ENABLED = os.getenv('STORY_STRUCTURED_OUTPUTS_ENABLED', 'false').lower() == 'true'
+    
+    # Same for test case extraction responses, and off by default for the same reason
+    TEST_CASE_STRUCTURED_OUTPUTS_ENABLED = os.getenv('TEST_CASE_STRUCTURED_OUTPUTS_ENABLED', 'false').lower() == 'true'
+    
+    # Estimated Jaccard similarity at which a new story counts as a paraphrase of an existing one (0 disables)
+    STORY_NEAR_DUPLICATE_THRESHOLD = float(os.getenv('STORY_NEAR_DUPLICATE_THRESHOLD', 0.85))
+
+    # Work item types offered for configuration; validate checks TEST_CASE_EXTRACTION_TYPE against it
+    _AVAILABLE_WORK_ITEM_TYPES = {
+        'story_types': ['User Story', 'Task'],
+        'test_case_types': ['Issue', 'Test Case']
+    }
+
     @classmethod
     def get_available_work_item_types(cls):
         """Get available work item types for configuration"""
-        return {
-            'story_types': ['User Story', 'Task'],
-            'test_case_types': ['Issue', 'Test Case']
-        }
+        return {key: list(types) for key, types in cls._AVAILABLE_WORK_ITEM_TYPES.items()}
 
     @classmethod
     def validate(cls):
@@ -118,7 +182,7 @@ class Settings:
         
         # Validate and print test case type
         print(f"[CONFIG]  Validating TEST_CASE_EXTRACTION_TYPE: {cls.TEST_CASE_EXTRACTION_TYPE}")
-        if cls.TEST_CASE_EXTRACTION_TYPE not in ['Issue', 'Test Case']:
+        if cls.TEST_CASE_EXTRACTION_TYPE not in cls._AVAILABLE_WORK_ITEM_TYPES['test_case_types']:
             print(f"[CONFIG]  Invalid TEST_CASE_EXTRACTION_TYPE: {cls.TEST_CASE_EXTRACTION_TYPE}. Changing to default: Test Case")
             old_value = cls.TEST_CASE_EXTRACTION_TYPE
             cls.TEST_CASE_EXTRACTION_TYPE = 'Test Case'
@@ -191,12 +255,12 @@ class Settings:
     @classmethod
     def reload_config(cls):
         """Reload configuration from .env file"""
-        print("[CONFIG]  Starting configuration reload...")
+        logger.debug("Starting configuration reload...")
         # Get the directory of this settings.py file (config/) and load .env from there
         _config_dir = os.path.dirname(__file__)
         _env_path = os.path.join(_config_dir, '.env')
         load_dotenv(_env_path, override=True)  # Force reload with override
-        print("[CONFIG]  Environment variables reloaded with override")
+        logger.debug("Environment variables reloaded with override")
         
         # Platform selection
         old_platform = cls.PLATFORM_TYPE
@@ -204,10 +268,10 @@ class Settings:
         if old_platform != cls.PLATFORM_TYPE:
             print(f"[CONFIG]  Platform Type changed: {old_platform} → {cls.PLATFORM_TYPE}")
         else:
-            print(f"[CONFIG]  Platform Type unchanged: {cls.PLATFORM_TYPE}")
+            logger.debug("Platform Type unchanged: %s", cls.PLATFORM_TYPE)
         
         # Reload Azure DevOps settings
-        print("[CONFIG]  Reloading Azure DevOps settings...")
+        logger.debug("Reloading Azure DevOps settings...")
         old_ado_org = cls.ADO_ORGANIZATION
         old_ado_project = cls.ADO_PROJECT
         cls.ADO_ORGANIZATION = os.getenv('ADO_ORGANIZATION')
@@ -220,14 +284,14 @@ class Settings:
             print(f"[CONFIG]  ADO_PROJECT changed: {old_ado_project} → {cls.ADO_PROJECT}")
         
         # Reload JIRA settings
-        print("[CONFIG]  Reloading JIRA settings...")
+        logger.debug("Reloading JIRA settings...")
         cls.JIRA_BASE_URL = os.getenv('JIRA_BASE_URL')
         cls.JIRA_USERNAME = os.getenv('JIRA_USERNAME')
         cls.JIRA_TOKEN = os.getenv('JIRA_TOKEN')
         cls.JIRA_PROJECT_KEY = os.getenv('JIRA_PROJECT_KEY')
         
         # Work item types based on platform
-        print(f"[CONFIG]  Reloading work item types for platform: {cls.PLATFORM_TYPE}")
+        logger.debug("Reloading work item types for platform: %s", cls.PLATFORM_TYPE)
         old_requirement_type = cls.REQUIREMENT_TYPE
         old_user_story_type = cls.USER_STORY_TYPE
         old_story_extraction_type = cls.STORY_EXTRACTION_TYPE
@@ -260,14 +324,14 @@ class Settings:
             print(f"[CONFIG]  AUTO_TEST_CASE_EXTRACTION changed: {old_auto_test_case_extraction} → {cls.AUTO_TEST_CASE_EXTRACTION}")
         
         # AI service configuration
-        print("[CONFIG]  Reloading AI service configuration...")
+        logger.debug("Reloading AI service configuration...")
         old_ai_provider = cls.AI_SERVICE_PROVIDER
         cls.AI_SERVICE_PROVIDER = os.getenv('AI_SERVICE_PROVIDER', 'OPENAI')
         if old_ai_provider != cls.AI_SERVICE_PROVIDER:
             print(f"[CONFIG]  AI_SERVICE_PROVIDER changed: {old_ai_provider} → {cls.AI_SERVICE_PROVIDER}")
         
         # OpenAI settings
-        print("[CONFIG]  Reloading OpenAI settings...")
+        logger.debug("Reloading OpenAI settings...")
         old_openai_model = cls.OPENAI_MODEL
         cls.OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
         cls.OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
@@ -276,7 +340,7 @@ class Settings:
             print(f"[CONFIG]  OPENAI_MODEL changed: {old_openai_model} → {cls.OPENAI_MODEL}")
         
         # Azure OpenAI settings
-        print("[CONFIG]  Reloading Azure OpenAI settings...")
+        logger.debug("Reloading Azure OpenAI settings...")
         old_azure_endpoint = cls.AZURE_OPENAI_ENDPOINT
         old_azure_deployment = cls.AZURE_OPENAI_DEPLOYMENT_NAME
         cls.AZURE_OPENAI_ENDPOINT = os.getenv('AZURE_OPENAI_ENDPOINT')
@@ -297,11 +361,33 @@ class Settings:
         except Exception as e:
             print(f"[CONFIG]  Failed to reload OPENAI_RETRY_DELAY, keeping current value: {cls.OPENAI_RETRY_DELAY} - Error: {e}")
         
-        print(f"[CONFIG]  Reloaded - REQUIREMENT_TYPE: {cls.REQUIREMENT_TYPE}")
-        print(f"[CONFIG]  Reloaded - USER_STORY_TYPE: {cls.USER_STORY_TYPE}")
-        print(f"[CONFIG]  Reloaded - STORY_EXTRACTION_TYPE: {cls.STORY_EXTRACTION_TYPE}")
-        print(f"[CONFIG]  Reloaded - TEST_CASE_EXTRACTION_TYPE: {cls.TEST_CASE_EXTRACTION_TYPE}")
-        print(f"[CONFIG]  Reloaded - AUTO_TEST_CASE_EXTRACTION: {cls.AUTO_TEST_CASE_EXTRACTION}")
+        cls.STORY_EXTRACTION_BATCH_SIZE = int(os.getenv('STORY_EXTRACTION_BATCH_SIZE', 5))
+        cls.STORY_EXTRACTION_BATCH_MAX_TOKENS = int(os.getenv('STORY_EXTRACTION_BATCH_MAX_TOKENS', 16000))
+        cls.TEST_CASE_EXTRACTION_BATCH_SIZE = int(os.getenv('TEST_CASE_EXTRACTION_BATCH_SIZE', 5))
+        cls.TEST_CASE_EXTRACTION_BATCH_MAX_TOKENS = int(os.getenv('TEST_CASE_EXTRACTION_BATCH_MAX_TOKENS', 16000))
+        cls.TEST_CASE_EXTRACTION_WAIT_SECONDS = int(os.getenv('TEST_CASE_EXTRACTION_WAIT_SECONDS', 300))
+        cls.LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+        cls.LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', 0))
+        cls.LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', 0))
+        cls.LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'false').lower() == 'true'
+        cls.LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '.llm_cache')
+        cls.SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'false').lower() == 'true'
+        cls.SEMANTIC_CACHE_MODEL = os.getenv('SEMANTIC_CACHE_MODEL', 'all-MiniLM-L6-v2')
+        cls.SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.95))
+        cls.STORY_NEAR_DUPLICATE_THRESHOLD = float(os.getenv('STORY_NEAR_DUPLICATE_THRESHOLD', 0.85))
+        cls.STORY_STREAMING_ENABLED = os.getenv('STORY_STREAMING_ENABLED', 'true').lower() == 'true'
+        cls.TEST_CASE_STREAMING_ENABLED = os.getenv('TEST_CASE_STREAMING_ENABLED', 'true').lower() == 'true'
+        cls.LLM_CONTEXT_WINDOW = int(os.getenv('LLM_CONTEXT_WINDOW', 16385))
+        cls.STORY_STRUCTURED_OUTPUTS_ENABLED = os.getenv('STORY_STRUCTURED_OUTPUTS_ENABLED', 'false').lower() == 'true'
+        cls.TEST_CASE_STRUCTURED_OUTPUTS_ENABLED = os.getenv('TEST_CASE_STRUCTURED_OUTPUTS_ENABLED', 'false').lower() == 'true'
+        cls.AI_BATCH_POLL_SECONDS = int(os.getenv('AI_BATCH_POLL_SECONDS', 60))
+        cls.AI_BATCH_TIMEOUT_SECONDS = int(os.getenv('AI_BATCH_TIMEOUT_SECONDS', 6 * 3600))
+        
+        logger.debug("Reloaded - REQUIREMENT_TYPE: %s", cls.REQUIREMENT_TYPE)
+        logger.debug("Reloaded - USER_STORY_TYPE: %s", cls.USER_STORY_TYPE)
+        logger.debug("Reloaded - STORY_EXTRACTION_TYPE: %s", cls.STORY_EXTRACTION_TYPE)
+        logger.debug("Reloaded - TEST_CASE_EXTRACTION_TYPE: %s", cls.TEST_CASE_EXTRACTION_TYPE)
+        logger.debug("Reloaded - AUTO_TEST_CASE_EXTRACTION: %s", cls.AUTO_TEST_CASE_EXTRACTION)
         print("[CONFIG]  Configuration reload completed successfully")
         
         return True
@@ -309,7 +395,7 @@ class Settings:
     @classmethod
     def get_current_config(cls):
         """Get current configuration values for verification"""
-        print("[CONFIG]  Gathering current configuration values...")
+        logger.debug("Gathering current configuration values...")
         config = {
             'ADO_USER_STORY_TYPE': cls.USER_STORY_TYPE,
             'ADO_STORY_EXTRACTION_TYPE': cls.STORY_EXTRACTION_TYPE,
@@ -320,9 +406,9 @@ class Settings:
             'OPENAI_MAX_RETRIES': cls.OPENAI_MAX_RETRIES,
             'OPENAI_RETRY_DELAY': cls.OPENAI_RETRY_DELAY
         }
-        print(f"[CONFIG]  Current configuration collected: {len(config)} settings")
+        logger.debug("Current configuration collected: %s settings", len(config))
         for key, value in config.items():
-            print(f"[CONFIG]  {key}: {value}")
+            logger.debug("%s: %s", key, value)
         return config
 
     @classmethod
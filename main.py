@@ -12,6 +12,7 @@ print("[STARTUP] Settings and Agent imported")
 def main():
     print("[MAIN] Entering main function")
     parser = argparse.ArgumentParser(description="Extract user stories from ADO requirements using AI")
+    parser.add_argument('--no-cache', action='store_true', help='Always call the AI service instead of reusing cached responses')
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
@@ -24,6 +25,7 @@ def main():
     process_all_cmd = subparsers.add_parser('process-all', help='Process all requirements')
     process_all_cmd.add_argument('--state', type=str, help='Filter requirements by state (e.g., "Active", "New")')
     process_all_cmd.add_argument('--no-upload', action='store_true', help='Extract stories but do not upload to ADO')
+    process_all_cmd.add_argument('--offline-batch', action='store_true', help='Extract through the AI provider\'s Batch API (cheaper, but can take hours)')
     
     # Preview stories
     preview_cmd = subparsers.add_parser('preview', help='Preview extracted stories without uploading')
@@ -61,6 +63,9 @@ def main():
     
     try:
         print(f"[DEBUG] Starting command: {args.command}")
+        if args.no_cache:
+            Settings.LLM_CACHE_ENABLED = False
+            Settings.SEMANTIC_CACHE_ENABLED = False
         if args.command == 'validate-config':
             validate_config()
             return
@@ -89,7 +94,8 @@ def main():
         elif args.command == 'process-all':
             results = agent.process_all_requirements(
                 state_filter=args.state,
-                upload_to_ado=not args.no_upload
+                upload_to_ado=not args.no_upload,
+                offline_batch=args.offline_batch
             )
             print_batch_results(results)
         
@@ -12,6 +12,13 @@ from src.models import Requirement, ExistingUserStory, RequirementSnapshot
 
 class ADOClient:
     """Client for interacting with Azure DevOps APIs"""
+
+    # Priority text to Azure DevOps priority number
+    PRIORITY_MAPPING = {
+        'High': 1,
+        'Medium': 2,
+        'Low': 3
+    }
     
     def __init__(self):
         Settings.validate()
@@ -728,12 +735,7 @@ class ADOClient:
 
     def _map_priority_to_number(self, priority_text: str) -> int:
         """Map priority text to Azure DevOps priority number"""
-        priority_mapping = {
-            'High': 1,
-            'Medium': 2,
-            'Low': 3
-        }
-        return priority_mapping.get(priority_text, 2)
+        return self.PRIORITY_MAPPING.get(priority_text, 2)
 
     def get_work_item(self, work_item_id: int):
         """Get a work item by ID (compatibility method for monitor)"""
@@ -1,10 +1,10 @@
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 
 from src.ado_client import ADOClient
 from src.story_extractor import StoryExtractor
 from src.test_case_extractor import TestCaseExtractor
-from src.models import Requirement, StoryExtractionResult, UserStory, ChangeDetectionResult, EpicSyncResult, TestCaseExtractionResult
+from src.models import Requirement, StoryExtractionResult, UserStory, ChangeDetectionResult, EpicSyncResult, TestCaseExtractionResult, TestCase
 from src.enhanced_story_creator import EnhancedStoryCreator
 from src.models_enhanced import EnhancedUserStory
 from config.settings import Settings
@@ -83,6 +83,36 @@ class StoryExtractionAgent:
         """Extract and preview stories without uploading to ADO"""
         return self.process_requirement_by_id(requirement_id, upload_to_ado=False)
     
+    def process_all_requirements(self, state_filter: Optional[str] = None, upload_to_ado: bool = True,
+                                 offline_batch: bool = False) -> List[StoryExtractionResult]:
+        """Extract stories for every requirement in the project, optionally filtered by state
+        
+        Requirements are extracted concurrently, or through the provider's Batch API when offline_batch is
+        set; that is cheaper but can take up to AI_BATCH_TIMEOUT_SECONDS, so it suits unattended runs.
+        """
+        requirements = self.ado_client.get_requirements(state_filter=state_filter)
+        if not requirements:
+            print("[AGENT] No requirements found to process")
+            return []
+        
+        print(f"[AGENT] Extracting stories for {len(requirements)} requirements{' via the Batch API' if offline_batch else ''}")
+        if offline_batch:
+            results = self.story_extractor.extract_stories_batch_offline(requirements)
+        else:
+            results = self.story_extractor.extract_stories_many_sync(requirements)
+        
+        if upload_to_ado:
+            for requirement, result in zip(requirements, results):
+                if not result.extraction_successful or not result.stories:
+                    continue
+                try:
+                    self._upload_stories_to_ado(result.stories, str(requirement.id))
+                except Exception as e:
+                    print(f"[ERROR] StoryExtractionAgent: Failed to upload stories for requirement {requirement.id}: {str(e)}")
+                    result.error_message = f"Failed to upload stories: {str(e)}"
+                    result.extraction_successful = False
+        return results
+    
     def _upload_stories_to_ado(self, stories: List[UserStory], parent_requirement_id: str) -> List[int]:
         """Upload user stories to ADO as child items of the requirement"""
         parent_id = parent_requirement_id  # No numeric parsing anymore
@@ -133,6 +163,10 @@ class StoryExtractionAgent:
         try:
             self.logger.info(f"Extracting test cases for story: {user_story.heading}")
             
+            # Test case extraction only needs the plain story fields; share them instead of rebuilding the story
+            if isinstance(user_story, EnhancedUserStory):
+                user_story = user_story.to_user_story()
+            
             # Extract test cases using AI
             test_case_result = self.test_case_extractor.extract_test_cases(user_story, parent_story_id)
             
@@ -163,6 +197,37 @@ class StoryExtractionAgent:
     
     def extract_test_cases_for_story(self, story_id: str) -> TestCaseExtractionResult:
         """Extract test cases for an existing user story by ID"""
+        user_story, failure = self._load_story_for_test_extraction(story_id)
+        if failure is not None:
+            return failure
+        try:
+            return self.test_case_extractor.extract_test_cases(user_story, story_id)
+        except Exception as e:
+            return self._failed_test_case_result(story_id, e)
+    
+    def extract_test_cases_for_stories(self, story_ids: List[str]) -> List[TestCaseExtractionResult]:
+        """Extract test cases for several existing user stories by ID, batching their AI calls"""
+        results: List[Optional[TestCaseExtractionResult]] = []
+        loaded: List[Tuple[int, UserStory, str]] = []
+        for story_id in story_ids:
+            user_story, failure = self._load_story_for_test_extraction(story_id)
+            if failure is None:
+                loaded.append((len(results), user_story, story_id))
+            results.append(failure)
+        
+        if loaded:
+            try:
+                batch_results = self.test_case_extractor.extract_test_cases_batch(
+                    [user_story for _, user_story, _ in loaded], [story_id for _, _, story_id in loaded]
+                )
+            except Exception as e:
+                batch_results = [self._failed_test_case_result(story_id, e) for _, _, story_id in loaded]
+            for (position, _, _), result in zip(loaded, batch_results):
+                results[position] = result
+        return results
+    
+    def _load_story_for_test_extraction(self, story_id: str) -> Tuple[Optional[UserStory], Optional[TestCaseExtractionResult]]:
+        """Validate and fetch a work item for test case extraction, returning the story or a failed result"""
         try:
             # First validate that the work item is appropriate for test case extraction
             is_valid, work_item_type = self.ado_client.is_valid_work_item_for_test_extraction(story_id)
@@ -170,7 +235,7 @@ class StoryExtractionAgent:
             if not is_valid:
                 if work_item_type.startswith("Error:"):
                     # Handle API errors
-                    return TestCaseExtractionResult(
+                    return None, TestCaseExtractionResult(
                         story_id=story_id,
                         story_title="",
                         test_cases=[],
@@ -197,7 +262,7 @@ class StoryExtractionAgent:
                             f"**Solution:** Please provide a {allowed_types} work item ID for test case extraction."
                         )
 
-                    return TestCaseExtractionResult(
+                    return None, TestCaseExtractionResult(
                         story_id=story_id,
                         story_title="",
                         test_cases=[],
@@ -210,7 +275,7 @@ class StoryExtractionAgent:
             # Fetch the user story from ADO
             story_work_item = self.ado_client.get_work_item_by_id(story_id)
             if not story_work_item:
-                return TestCaseExtractionResult(
+                return None, TestCaseExtractionResult(
                     story_id=story_id,
                     story_title="",
                     test_cases=[],
@@ -227,18 +292,21 @@ class StoryExtractionAgent:
                     fields.get("System.Description", "")
                 )
             )
-            
-            # Extract test cases
-            return self.test_case_extractor.extract_test_cases(user_story, story_id)
+            return user_story, None
             
         except Exception as e:
-            return TestCaseExtractionResult(
-                story_id=story_id,
-                story_title="",
-                test_cases=[],
-                extraction_successful=False,
-                error_message=str(e)
-            )
+            return None, self._failed_test_case_result(story_id, e)
+    
+    @staticmethod
+    def _failed_test_case_result(story_id: str, error: Exception) -> TestCaseExtractionResult:
+        """Failed extraction result carrying the error message"""
+        return TestCaseExtractionResult(
+            story_id=story_id,
+            story_title="",
+            test_cases=[],
+            extraction_successful=False,
+            error_message=str(error)
+        )
     
     def extract_test_cases_as_issues(self, story_id: str, upload_to_ado: bool = True) -> TestCaseExtractionResult:
         """Extract test cases for a user story and create them using the configured work item type"""
@@ -282,39 +350,7 @@ class StoryExtractionAgent:
 
             # Upload test cases using the configured type to ADO if requested
             if upload_to_ado and result.test_cases:
-                print(f"[AGENT] Creating {len(result.test_cases)} test cases as {Settings.TEST_CASE_EXTRACTION_TYPE} in Azure DevOps...")
-                created_issues = []
-
-                for i, test_case in enumerate(result.test_cases, 1):
-                    try:
-                        print(f"[AGENT] Creating test case {i}/{len(result.test_cases)}: {test_case.title}")
-
-                        # Convert TestCase to dict format for ADO client
-                        test_case_data = {
-                            'title': test_case.title,
-                            'description': test_case.description,
-                            'test_type': test_case.test_type,
-                            'preconditions': test_case.preconditions,
-                            'test_steps': test_case.test_steps,
-                            'expected_result': test_case.expected_result,
-                            'priority': test_case.priority
-                        }
-
-                        # Use the new configurable method
-                        work_item_id = self.ado_client.create_test_case_with_config(
-                            test_case_data=test_case_data,
-                            parent_story_id=int(story_id)
-                        )
-
-                        created_issues.append(work_item_id)
-                        print(f"[AGENT] ✅ Created {Settings.TEST_CASE_EXTRACTION_TYPE} #{work_item_id} for test case: {test_case.title}")
-
-                    except Exception as e:
-                        print(f"[ERROR] Failed to create {Settings.TEST_CASE_EXTRACTION_TYPE} for test case '{test_case.title}': {e}")
-                        continue
-
-                print(f"[AGENT] Successfully created {len(created_issues)} test case {Settings.TEST_CASE_EXTRACTION_TYPE}s in Azure DevOps")
-                result.created_issue_ids = created_issues
+                result.created_issue_ids, _ = self.upload_test_cases(story_id, result.test_cases)
 
             return result
 
@@ -329,32 +365,70 @@ class StoryExtractionAgent:
                 error_message=error_msg
             )
 
+    def upload_test_cases(self, story_id: str, test_cases: List[TestCase]) -> Tuple[List[int], List[str]]:
+        """Create test cases under a story using the configured work item type
+
+        Returns the IDs of the created work items and the error messages for the ones that failed.
+        """
+        self.logger.info("[AGENT] Creating %d test cases as %s in Azure DevOps...", len(test_cases), Settings.TEST_CASE_EXTRACTION_TYPE)
+        created_ids = []
+        errors = []
+        parent_story_id = int(story_id)
+
+        for i, test_case in enumerate(test_cases, 1):
+            try:
+                self.logger.debug("[AGENT] Creating test case %d/%d: %s", i, len(test_cases), test_case.title)
+
+                # Convert TestCase to dict format for ADO client
+                test_case_data = {
+                    'title': test_case.title,
+                    'description': test_case.description,
+                    'test_type': test_case.test_type,
+                    'preconditions': test_case.preconditions,
+                    'test_steps': test_case.test_steps,
+                    'expected_result': test_case.expected_result,
+                    'priority': test_case.priority
+                }
+
+                work_item_id = self.ado_client.create_test_case_with_config(
+                    test_case_data=test_case_data,
+                    parent_story_id=parent_story_id
+                )
+
+                created_ids.append(work_item_id)
+                self.logger.info("[AGENT] ✅ Created %s #%s for test case: %s", Settings.TEST_CASE_EXTRACTION_TYPE, work_item_id, test_case.title)
+
+            except Exception as e:
+                self.logger.warning("Failed to create %s for test case '%s': %s", Settings.TEST_CASE_EXTRACTION_TYPE, test_case.title, e)
+                errors.append(f"{test_case.title}: {e}")
+
+        self.logger.info("[AGENT] Successfully created %d test case %ss in Azure DevOps", len(created_ids), Settings.TEST_CASE_EXTRACTION_TYPE)
+        return created_ids, errors
+
     def extract_test_cases_for_epic_stories(self, epic_id: str, upload_to_ado: bool = True) -> Dict[str, TestCaseExtractionResult]:
         """Extract test cases as issues for all user stories under an epic"""
+        return dict(self.iter_test_cases_for_epic_stories(epic_id, upload_to_ado))
+
+    def iter_test_cases_for_epic_stories(self, epic_id: str, upload_to_ado: bool = True) -> Iterator[Tuple[str, TestCaseExtractionResult]]:
+        """Yield (story_id, result) pairs for each story under an epic as soon as it is processed"""
         try:
-            print(f"\n[AGENT] Extracting test cases as issues for all stories in epic: {epic_id}")
+            self.logger.info("[AGENT] Extracting test cases as issues for all stories in epic: %s", epic_id)
 
             # Get all child stories for the epic
             child_story_ids = self.ado_client.get_child_stories(int(epic_id))
 
             if not child_story_ids:
-                print(f"[WARNING] No child stories found for epic {epic_id}")
-                return {}
+                self.logger.warning("No child stories found for epic %s", epic_id)
+                return
 
-            print(f"[AGENT] Found {len(child_story_ids)} child stories in epic")
+            self.logger.info("[AGENT] Found %d child stories in epic", len(child_story_ids))
 
-            results = {}
             for story_id in child_story_ids:
-                print(f"\n[AGENT] Processing story {story_id}...")
-                result = self.extract_test_cases_as_issues(str(story_id), upload_to_ado)
-                results[str(story_id)] = result
-
-            return results
+                self.logger.info("[AGENT] Processing story %s...", story_id)
+                yield str(story_id), self.extract_test_cases_as_issues(str(story_id), upload_to_ado)
 
         except Exception as e:
-            error_msg = f"Failed to extract test cases for epic stories: {str(e)}"
-            print(f"[ERROR] {error_msg}")
-            return {}
+            self.logger.error("Failed to extract test cases for epic stories: %s", e)
 
     def _extract_acceptance_criteria_from_description(self, description: str) -> List[str]:
         """Extract acceptance criteria from story description"""
@@ -3,22 +3,89 @@ AI Client Factory for OpenAI and Azure OpenAI Service
 Provides unified interface for both AI services with automatic provider switching
 """
 
-from openai import OpenAI, AzureOpenAI
+from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI, APIStatusError, RateLimitError, NOT_GIVEN
 from config.settings import Settings
+import asyncio
+import functools
+import httpx
+import json
+import random
+import threading
 import time
 import logging
+import weakref
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # Optional: HTTP/2 needs the h2 package (httpx[http2]); HTTP/1.1 keep-alive is used otherwise
+    HTTP2_AVAILABLE = False
+
+try:
+    import tiktoken
+except ImportError:  # Optional: token counts fall back to the ~4 characters per token estimate
+    tiktoken = None
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by every AI client in the process so TLS connections are reused across requests
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+HTTP_TIMEOUT = httpx.Timeout(600.0, connect=5.0)  # Same as the SDK default; long completions need the read budget
+
+_shared_http_client = None
+_shared_http_client_lock = threading.Lock()
+
+
+def get_shared_http_client() -> httpx.Client:
+    """Process-wide pooled HTTP client handed to the sync SDK clients"""
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is None:
+            _shared_http_client = httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT)
+        return _shared_http_client
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """Pooled async HTTP client; async pools are bound to one event loop, so callers keep one per loop"""
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+@functools.lru_cache(maxsize=None)
+def _token_encoding(model: str):
+    """tiktoken encoding for a model, or None when tiktoken or its encoding files are unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model.rsplit('/', 1)[-1])
+        except KeyError:
+            # Deployment names and newer models tiktoken does not know use the current GPT encoding
+            return tiktoken.get_encoding('o200k_base')
+    except Exception as e:  # Encoding files are downloaded on first use, which fails offline
+        logger.warning(f"tiktoken encoding unavailable for '{model}', estimating tokens instead: {e}")
+        return None
+
+
+def _configured_model() -> str:
+    """Model name of the configured AI provider"""
+    provider = Settings.AI_SERVICE_PROVIDER
+    if provider == 'AZURE_OPENAI':
+        return Settings.AZURE_OPENAI_MODEL
+    if provider == 'GITHUB':
+        return Settings.GITHUB_MODEL
+    return Settings.OPENAI_MODEL
+
 
 def estimate_tokens(text: str) -> int:
     """
-    Estimate token count for text
-    Simple approximation: ~4 characters per token for English text
-    For more accuracy, use tiktoken library
+    Count tokens for text with the configured model's tiktoken encoding
+    Without tiktoken, approximates ~4 characters per token for English text
     """
     if not text:
         return 0
+    encoding = _token_encoding(_configured_model())
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
     # Simple estimation: 4 chars per token (conservative estimate)
     return len(text) // 4
 
@@ -35,6 +102,25 @@ def count_message_tokens(messages: list) -> int:
             total += 4  # Every message has overhead tokens
     return total
 
+def _retry_after_seconds(error: Exception):
+    """Seconds the provider asked us to wait in a 429's Retry-After header, if present"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a failed AI request may succeed if sent again
+    
+    Client errors such as a bad request or an invalid key fail the same way every time; rate limits,
+    timeouts, conflicts, server errors and connection failures are transient.
+    """
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return True
+
 class AIClientFactory:
     """Factory class for creating AI clients with provider abstraction"""
     
@@ -57,19 +143,195 @@ class AIClientFactory:
 class BaseAIClient:
     """Base class for AI clients"""
     
+    # Whether the endpoint accepts stream_options, which makes the last streamed chunk carry token usage
+    stream_usage_supported = True
+    
     def __init__(self):
         self.max_retries = Settings.OPENAI_MAX_RETRIES
         self.retry_delay = Settings.OPENAI_RETRY_DELAY
         self.last_request_tokens = {
             'prompt_tokens': 0,
             'completion_tokens': 0,
-            'total_tokens': 0
+            'total_tokens': 0,
+            'cached_tokens': 0
         }
+        # One asyncio client per event loop; httpx connections cannot be shared between loops
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_clients_lock = threading.Lock()
     
-    def chat_completion(self, messages, temperature=0.7, max_tokens=2000):
+    def chat_completion(self, messages, temperature=0.7, max_tokens=2000, response_format=None):
         """Abstract method for chat completion"""
         raise NotImplementedError
     
+    def _create_async_client(self):
+        """Abstract method returning the provider's asyncio client"""
+        raise NotImplementedError
+    
+    def chat_completion_stream(self, messages, temperature=0.7, max_tokens=2000, response_format=None):
+        """Make a streaming chat completion request, yielding content deltas as they arrive"""
+        logger.info(f"AI: Making streaming chat completion request with model '{self.request_model}'")
+        
+        # Only opening the stream is retried; a failure mid-stream surfaces to the caller
+        stream = self._retry_request(
+            self.client.chat.completions.create,
+            model=self.request_model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format or NOT_GIVEN,
+            stream=True,
+            stream_options={'include_usage': True} if self.stream_usage_supported else NOT_GIVEN
+        )
+        
+        completion_chars = 0
+        usage_chunk = None
+        for chunk in stream:
+            # With include_usage the final chunk has no choices, only the request's usage block
+            if getattr(chunk, 'usage', None) is not None:
+                usage_chunk = chunk
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                completion_chars += len(delta)
+                yield delta
+        
+        if usage_chunk is not None:
+            self._record_usage(usage_chunk)
+        else:
+            # The provider sent no usage block, so record estimates instead
+            prompt_tokens = count_message_tokens(messages)
+            completion_tokens = completion_chars // 4
+            self.last_request_tokens = {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+                'cached_tokens': 0
+            }
+        logger.info(f"AI: Streaming request completed, response length: {completion_chars} characters")
+    
+    def _record_usage(self, response):
+        """Keep the response's token usage, including prompt tokens served from the provider's prompt cache
+        
+        OpenAI-compatible providers cache repeated prompt prefixes automatically; the static system
+        prompts are sent first and unchanged so that later requests hit that cache.
+        """
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        self.last_request_tokens = {
+            'prompt_tokens': usage.prompt_tokens,
+            'completion_tokens': usage.completion_tokens,
+            'total_tokens': usage.total_tokens,
+            'cached_tokens': getattr(details, 'cached_tokens', None) or 0
+        }
+    
+    def _get_async_client(self):
+        """Get the asyncio client for the running event loop, creating one per loop"""
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = self._create_async_client()
+        return client
+    
+    async def aclose_async_client(self):
+        """Close the running event loop's asyncio client; call this before the loop ends so its connections are released"""
+        with self._async_clients_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+    
+    async def chat_completion_async(self, messages, temperature=0.7, max_tokens=2000, response_format=None):
+        """Make a chat completion request without blocking the event loop"""
+        async def _make_request():
+            logger.info(f"AI: Making async chat completion request with model '{self.request_model}'")
+            
+            response = await self._get_async_client().chat.completions.create(
+                model=self.request_model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format=response_format or NOT_GIVEN
+            )
+            
+            # Track token usage from response
+            self._record_usage(response)
+            
+            result = response.choices[0].message.content.strip()
+            logger.info(f"AI: Async request completed successfully, response length: {len(result)} characters")
+            return result
+        
+        return await self._retry_request_async(_make_request)
+    
+    # Endpoint used for Batch API requests; None when the provider has no Batch API
+    batch_endpoint = "/v1/chat/completions"
+    
+    def run_batch(self, requests, temperature=0.7, max_tokens=2000, poll_interval=60, timeout=None, response_format=None):
+        """Run chat completions through the provider's Batch API and return {custom_id: content}
+        
+        requests is a list of (custom_id, messages) pairs. Raises TimeoutError, after cancelling the
+        batch, if it has not finished within timeout seconds, and RuntimeError if it does not complete.
+        """
+        if self.batch_endpoint is None:
+            raise NotImplementedError(f"{type(self).__name__} does not support the Batch API")
+        
+        body_options = {"temperature": temperature, "max_tokens": max_tokens}
+        if response_format:
+            body_options["response_format"] = response_format
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": self.batch_endpoint,
+                "body": {
+                    "model": self.request_model,
+                    "messages": messages,
+                    **body_options
+                }
+            })
+            for custom_id, messages in requests
+        ]
+        batch_input = self._retry_request(
+            self.client.files.create,
+            file=("batch_input.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self._retry_request(
+            self.client.batches.create,
+            input_file_id=batch_input.id,
+            endpoint=self.batch_endpoint,
+            completion_window="24h"
+        )
+        logger.info(f"AI: Submitted batch {batch.id} with {len(lines)} requests")
+        
+        deadline = time.monotonic() + timeout if timeout else None
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if deadline is not None and time.monotonic() >= deadline:
+                self.client.batches.cancel(batch.id)
+                raise TimeoutError(f"Batch {batch.id} did not finish within {timeout}s (status: {batch.status})")
+            time.sleep(poll_interval)
+            batch = self._retry_request(self.client.batches.retrieve, batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+        
+        output = self._retry_request(self.client.files.content, batch.output_file_id)
+        contents = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") == 200:
+                contents[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+            else:
+                logger.warning(f"AI: Batch request {record.get('custom_id')} failed: {record.get('error') or response.get('status_code')}")
+        
+        logger.info(f"AI: Batch {batch.id} completed, {len(contents)} of {len(lines)} requests succeeded")
+        return contents
+    
     def get_last_token_usage(self):
         """Get token usage from last API call"""
         return self.last_request_tokens.copy()
@@ -83,25 +345,63 @@ class BaseAIClient:
                 return func(*args, **kwargs)
             except Exception as e:
                 last_exception = e
+                if not _is_retryable(e):
+                    logger.error(f"AI request failed with a non-retryable error: {e}")
+                    break
                 if attempt < self.max_retries - 1:
-                    wait_time = self.retry_delay * (2 ** attempt)
+                    wait_time = self._retry_wait(attempt, e)
                     logger.warning(f"AI request failed (attempt {attempt + 1}/{self.max_retries}), retrying in {wait_time}s: {e}")
                     time.sleep(wait_time)
                 else:
                     logger.error(f"AI request failed after {self.max_retries} attempts: {e}")
         
         raise last_exception
+    
+    def _retry_wait(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff before retry number attempt + 1, honouring a 429's Retry-After
+        
+        The wait is jittered so concurrent callers that failed together don't retry in lockstep.
+        """
+        wait_time = self.retry_delay * (2 ** attempt)
+        if isinstance(error, RateLimitError):
+            wait_time = _retry_after_seconds(error) or wait_time
+        return round(wait_time * random.uniform(1.0, 1.5), 2)
+    
+    async def _retry_request_async(self, func):
+        """Async counterpart of _retry_request that sleeps without blocking the event loop"""
+        last_exception = None
+        
+        for attempt in range(self.max_retries):
+            try:
+                return await func()
+            except Exception as e:
+                last_exception = e
+                if not _is_retryable(e):
+                    logger.error(f"AI request failed with a non-retryable error: {e}")
+                    break
+                if attempt < self.max_retries - 1:
+                    wait_time = self._retry_wait(attempt, e)
+                    logger.warning(f"AI request failed (attempt {attempt + 1}/{self.max_retries}), retrying in {wait_time}s: {e}")
+                    await asyncio.sleep(wait_time)
+                else:
+                    logger.error(f"AI request failed after {self.max_retries} attempts: {e}")
+        
+        raise last_exception
 
 class OpenAIClient(BaseAIClient):
     """Client for standard OpenAI API"""
     
     def __init__(self):
         super().__init__()
-        self.client = OpenAI(api_key=Settings.OPENAI_API_KEY)
+        self.client = OpenAI(api_key=Settings.OPENAI_API_KEY, http_client=get_shared_http_client())
         self.model = Settings.OPENAI_MODEL
+        self.request_model = self.model
         logger.info(f"Initialized OpenAI client with model: {self.model}")
     
-    def chat_completion(self, messages, temperature=0.7, max_tokens=2000):
+    def _create_async_client(self):
+        return AsyncOpenAI(api_key=Settings.OPENAI_API_KEY, http_client=create_async_http_client())
+    
+    def chat_completion(self, messages, temperature=0.7, max_tokens=2000, response_format=None):
         """Make chat completion request to OpenAI"""
         def _make_request():
             logger.info(f"🔶 OpenAI: Making chat completion request with model '{self.model}'")
@@ -110,20 +410,16 @@ class OpenAIClient(BaseAIClient):
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                response_format=response_format or NOT_GIVEN
             )
             
             # Track token usage from response
-            if hasattr(response, 'usage'):
-                self.last_request_tokens = {
-                    'prompt_tokens': response.usage.prompt_tokens,
-                    'completion_tokens': response.usage.completion_tokens,
-                    'total_tokens': response.usage.total_tokens
-                }
+            self._record_usage(response)
             
             result = response.choices[0].message.content.strip()
             logger.info(f"🔶 OpenAI: Request completed successfully, response length: {len(result)} characters")
-            logger.info(f"🔶 OpenAI: Token usage - Prompt: {self.last_request_tokens['prompt_tokens']}, Completion: {self.last_request_tokens['completion_tokens']}, Total: {self.last_request_tokens['total_tokens']}")
+            logger.info(f"🔶 OpenAI: Token usage - Prompt: {self.last_request_tokens['prompt_tokens']}, Completion: {self.last_request_tokens['completion_tokens']}, Total: {self.last_request_tokens['total_tokens']}, Cached: {self.last_request_tokens['cached_tokens']}")
             return result
         
         return self._retry_request(_make_request)
@@ -131,18 +427,32 @@ class OpenAIClient(BaseAIClient):
 class AzureOpenAIClient(BaseAIClient):
     """Client for Azure OpenAI Service"""
     
+    batch_endpoint = "/chat/completions"  # Azure batch jobs route to the deployment named in the body
+    
     def __init__(self):
         super().__init__()
         self.client = AzureOpenAI(
             api_key=Settings.AZURE_OPENAI_API_KEY,
             api_version=Settings.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT
+            azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT,
+            http_client=get_shared_http_client()
         )
         self.deployment_name = Settings.AZURE_OPENAI_DEPLOYMENT_NAME
         self.model = Settings.AZURE_OPENAI_MODEL
+        self.request_model = self.deployment_name  # Use deployment name as model for Azure
+        # Azure accepts stream_options from API version 2024-09-01-preview on
+        self.stream_usage_supported = Settings.AZURE_OPENAI_API_VERSION[:10] >= '2024-09-01'
         logger.info(f"Initialized Azure OpenAI client with deployment: {self.deployment_name}")
     
-    def chat_completion(self, messages, temperature=0.7, max_tokens=2000):
+    def _create_async_client(self):
+        return AsyncAzureOpenAI(
+            api_key=Settings.AZURE_OPENAI_API_KEY,
+            api_version=Settings.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=Settings.AZURE_OPENAI_ENDPOINT,
+            http_client=create_async_http_client()
+        )
+    
+    def chat_completion(self, messages, temperature=0.7, max_tokens=2000, response_format=None):
         """Make chat completion request to Azure OpenAI"""
         def _make_request():
             logger.info(f"🔷 Azure OpenAI: Making chat completion request to deployment '{self.deployment_name}'")
@@ -152,20 +462,16 @@ class AzureOpenAIClient(BaseAIClient):
                 model=self.deployment_name,  # Use deployment name as model for Azure
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                response_format=response_format or NOT_GIVEN
             )
             
             # Track token usage from response
-            if hasattr(response, 'usage'):
-                self.last_request_tokens = {
-                    'prompt_tokens': response.usage.prompt_tokens,
-                    'completion_tokens': response.usage.completion_tokens,
-                    'total_tokens': response.usage.total_tokens
-                }
+            self._record_usage(response)
             
             result = response.choices[0].message.content.strip()
             logger.info(f"🔷 Azure OpenAI: Request completed successfully, response length: {len(result)} characters")
-            logger.info(f"🔷 Azure OpenAI: Token usage - Prompt: {self.last_request_tokens['prompt_tokens']}, Completion: {self.last_request_tokens['completion_tokens']}, Total: {self.last_request_tokens['total_tokens']}")
+            logger.info(f"🔷 Azure OpenAI: Token usage - Prompt: {self.last_request_tokens['prompt_tokens']}, Completion: {self.last_request_tokens['completion_tokens']}, Total: {self.last_request_tokens['total_tokens']}, Cached: {self.last_request_tokens['cached_tokens']}")
             return result
         
         return self._retry_request(_make_request)
@@ -178,17 +484,28 @@ def get_ai_client():
 class GitHubModelsClient(BaseAIClient):
     """Client for GitHub Models (free tier with GitHub PAT)"""
     
+    batch_endpoint = None
+    
     def __init__(self):
         super().__init__()
         self.client = OpenAI(
             base_url=Settings.GITHUB_API_BASE,
-            api_key=Settings.GITHUB_TOKEN
+            api_key=Settings.GITHUB_TOKEN,
+            http_client=get_shared_http_client()
         )
         self.model = Settings.GITHUB_MODEL
+        self.request_model = self.model
         logger.info(f"Initialized GitHub Models client with model: {self.model}")
         logger.info(f"Using endpoint: {Settings.GITHUB_API_BASE}")
     
-    def chat_completion(self, messages, temperature=0.7, max_tokens=2000):
+    def _create_async_client(self):
+        return AsyncOpenAI(
+            base_url=Settings.GITHUB_API_BASE,
+            api_key=Settings.GITHUB_TOKEN,
+            http_client=create_async_http_client()
+        )
+    
+    def chat_completion(self, messages, temperature=0.7, max_tokens=2000, response_format=None):
         """Make chat completion request to GitHub Models"""
         def _make_request():
             logger.info(f"🐙 GitHub Models: Making chat completion request with model '{self.model}'")
@@ -197,20 +514,16 @@ class GitHubModelsClient(BaseAIClient):
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                response_format=response_format or NOT_GIVEN
             )
             
             # Track token usage from response
-            if hasattr(response, 'usage'):
-                self.last_request_tokens = {
-                    'prompt_tokens': response.usage.prompt_tokens,
-                    'completion_tokens': response.usage.completion_tokens,
-                    'total_tokens': response.usage.total_tokens
-                }
+            self._record_usage(response)
             
             result = response.choices[0].message.content.strip()
             logger.info(f"🐙 GitHub Models: Request completed successfully, response length: {len(result)} characters")
-            logger.info(f"🐙 GitHub Models: Token usage - Prompt: {self.last_request_tokens['prompt_tokens']}, Completion: {self.last_request_tokens['completion_tokens']}, Total: {self.last_request_tokens['total_tokens']}")
+            logger.info(f"🐙 GitHub Models: Token usage - Prompt: {self.last_request_tokens['prompt_tokens']}, Completion: {self.last_request_tokens['completion_tokens']}, Total: {self.last_request_tokens['total_tokens']}, Cached: {self.last_request_tokens['cached_tokens']}")
             return result
         
         return self._retry_request(_make_request)
@@ -1,3 +1,5 @@
+import threading
+
 from flask import Flask, request, jsonify
 from src.enhanced_story_creator import EnhancedStoryCreator
 from src.models_enhanced import EnhancedUserStory
@@ -6,12 +8,36 @@ from config.settings import Settings
 
 app = Flask(__name__)
 app.debug = False  # Disable debug mode
-story_creator = EnhancedStoryCreator()
-ado_client = ADOClient()
+
+# Clients are built on first request so importing this module stays cheap
+_story_creator = None
+_ado_client = None
+_clients_lock = threading.Lock()
 
 # Configure port
 PORT = 8080
 
+
+def get_story_creator() -> EnhancedStoryCreator:
+    """Return the shared story creator, constructing it on first use"""
+    global _story_creator
+    if _story_creator is None:
+        with _clients_lock:
+            if _story_creator is None:
+                _story_creator = EnhancedStoryCreator()
+    return _story_creator
+
+
+def get_ado_client() -> ADOClient:
+    """Return the shared ADO client, constructing it on first use"""
+    global _ado_client
+    if _ado_client is None:
+        with _clients_lock:
+            if _ado_client is None:
+                _ado_client = ADOClient()
+    return _ado_client
+
+
 @app.route('/')
 def test_connection():
     """Test endpoint to verify server is up"""
@@ -60,7 +86,7 @@ def create_enhanced_story():
                 'description': description,
                 'acceptance_criteria': acceptance_criteria
             })
-            story = story_creator.create_enhanced_story(
+            story = get_story_creator().create_enhanced_story(
                 heading=title,  # Using title as heading
                 description=description,
                 acceptance_criteria=acceptance_criteria
@@ -80,7 +106,7 @@ def create_enhanced_story():
         # Create work item in ADO with specified type
         app.logger.info(f"Creating work item in ADO with type: {work_item_type}")
         try:
-            work_item = ado_client.create_user_story(story_data, item_type=work_item_type)
+            work_item = get_ado_client().create_user_story(story_data, item_type=work_item_type)
         except Exception as e:
             app.logger.error(f"Error creating ADO work item: {str(e)}")
             return jsonify({"error": "Failed to create ADO work item", "details": str(e), "success": False}), 500
@@ -135,7 +135,7 @@ class EnhancedEpicChangeMonitor:
 
     def _load_existing_snapshots(self):
         """Load existing snapshots with enhanced state"""
-        for epic_id in self.config.epic_ids or []:
+        for epic_id in self.config.epic_ids or ():
             snapshot_file = self.snapshot_dir / f"epic_{epic_id}.json"
             if snapshot_file.exists():
                 try:
@@ -1,6 +1,8 @@
 import logging
 import json
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import ClassVar, List
 from src.models_enhanced import EnhancedUserStory, StoryComplexityAnalysis, ComplexityFactor, ComplexityLevel
 from config.settings import Settings
 from src.ai_client import get_ai_client
@@ -8,9 +10,15 @@ from src.ai_client import get_ai_client
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Complexity analyses remembered per distinct story content, shared by all creators
+COMPLEXITY_CACHE_SIZE = 4096
+
 class EnhancedStoryCreator:
     """Creates enhanced user stories with complexity analysis"""
     
+    _complexity_cache: ClassVar[OrderedDict] = OrderedDict()
+    _complexity_cache_lock: ClassVar[threading.Lock] = threading.Lock()
+    
     def __init__(self):
         Settings.validate()
         self.ai_client = get_ai_client()
@@ -41,6 +49,30 @@ class EnhancedStoryCreator:
 
     def analyze_complexity(self, story_content: dict) -> StoryComplexityAnalysis:
         """Analyze the complexity of a user story using AI"""
+        try:
+            return self._request_complexity_analysis(story_content)
+        except Exception as e:
+            return self._default_complexity_analysis(e)
+
+    @staticmethod
+    def _default_complexity_analysis(error: Exception) -> StoryComplexityAnalysis:
+        """Medium-complexity fallback used when the AI analysis fails"""
+        logger.error(f"Error in complexity analysis: {str(error)}")
+        return StoryComplexityAnalysis(
+            overall_complexity=ComplexityLevel.MEDIUM,
+            story_points=3,
+            factors=[
+                ComplexityFactor(
+                    name="Default Assessment",
+                    assessment=ComplexityLevel.MEDIUM,
+                    impact="Automated complexity analysis failed, using default medium complexity"
+                )
+            ],
+            rationale=f"Automated analysis failed: {str(error)}"
+        )
+
+    def _request_complexity_analysis(self, story_content: dict) -> StoryComplexityAnalysis:
+        """Ask the AI service for a complexity analysis, raising if it cannot be obtained"""
         story_description = story_content['description']
         acceptance_criteria = story_content['acceptance_criteria']
         
@@ -89,72 +121,56 @@ Return ONLY valid JSON using this exact format (no additional text):
   "rationale": "Story involves moderate technical implementation with standard API patterns"
 }}"""
 
-        try:
-            logger.info("Sending request to AI service")
-            result = self.ai_client.chat_completion(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are an expert software project analyst specializing in story complexity assessment.
+        logger.info("Sending request to AI service")
+        result = self.ai_client.chat_completion(
+            messages=[
+                {
+                    "role": "system",
+                    "content": """You are an expert software project analyst specializing in story complexity assessment.
 Your task is to analyze user stories and output valid JSON that conforms to the specified structure.
 - Use only 'Low', 'Medium', or 'High' for complexity assessments
 - Story points should be a number between 1 and 13 from the Fibonacci sequence
 - Always ensure your output is valid JSON
 - Return ONLY the JSON response, no additional text or explanations
 - Do not wrap the JSON in markdown code blocks"""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3  # Lower temperature for more consistent JSON output
-            )
-            
-            # Log the raw AI response for debugging
-            logger.debug(f"Raw AI response for complexity: {repr(result)}")
-            logger.debug(f"AI response length: {len(result) if result else 0} characters")
-            
-            # Check if response is empty
-            if not result or not result.strip():
-                raise Exception("AI returned empty response for complexity analysis")
-            
-            # Clean up the response (remove markdown code blocks if present)
-            result = result.strip()
-            if result.startswith('```json'):
-                result = result[7:]  # Remove ```json
-            if result.startswith('```'):
-                result = result[3:]   # Remove ```
-            if result.endswith('```'):
-                result = result[:-3]  # Remove trailing ```
-            result = result.strip()
-            
-            logger.debug(f"Cleaned AI response for complexity: {repr(result[:200])}...")
-            
-            # Parse the response
-            try:
-                # First try to parse as valid JSON
-                analysis_dict = json.loads(result)
-                logger.info("Successfully parsed complexity response as JSON")
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parse error for complexity: {e}")
-                logger.error(f"Failed to parse complexity response: {result[:500]}...")  # Log first 500 chars
-                raise ValueError(f"Invalid JSON response from OpenAI: {str(e)}")
-                
-        except Exception as e:
-            logger.error(f"Error in complexity analysis: {str(e)}")
-            return StoryComplexityAnalysis(
-                overall_complexity=ComplexityLevel.MEDIUM,
-                story_points=3,
-                factors=[
-                    ComplexityFactor(
-                        name="Default Assessment",
-                        assessment=ComplexityLevel.MEDIUM,
-                        impact="Automated complexity analysis failed, using default medium complexity"
-                    )
-                ],
-                rationale=f"Automated analysis failed: {str(e)}"
-            )
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.3  # Lower temperature for more consistent JSON output
+        )
+        
+        # Log the raw AI response for debugging
+        logger.debug(f"Raw AI response for complexity: {repr(result)}")
+        logger.debug(f"AI response length: {len(result) if result else 0} characters")
+        
+        # Check if response is empty
+        if not result or not result.strip():
+            raise Exception("AI returned empty response for complexity analysis")
+        
+        # Clean up the response (remove markdown code blocks if present)
+        result = result.strip()
+        if result.startswith('```json'):
+            result = result[7:]  # Remove ```json
+        if result.startswith('```'):
+            result = result[3:]   # Remove ```
+        if result.endswith('```'):
+            result = result[:-3]  # Remove trailing ```
+        result = result.strip()
+        
+        logger.debug(f"Cleaned AI response for complexity: {repr(result[:200])}...")
+        
+        # Parse the response
+        try:
+            # First try to parse as valid JSON
+            analysis_dict = json.loads(result)
+            logger.info("Successfully parsed complexity response as JSON")
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON parse error for complexity: {e}")
+            logger.error(f"Failed to parse complexity response: {result[:500]}...")  # Log first 500 chars
+            raise ValueError(f"Invalid JSON response from OpenAI: {str(e)}")
 
         # Convert to our model
         return StoryComplexityAnalysis(
@@ -180,7 +196,7 @@ Your task is to analyze user stories and output valid JSON that conforms to the
             "acceptance_criteria": acceptance_criteria
         }
         
-        complexity_analysis = self.analyze_complexity(story_content)
+        complexity_analysis = self._cached_complexity_analysis(story_content)
         
         # Create and return the enhanced story
         return EnhancedUserStory(
@@ -189,3 +205,27 @@ Your task is to analyze user stories and output valid JSON that conforms to the
             acceptance_criteria=acceptance_criteria,
             complexity_analysis=complexity_analysis
         )
+
+    def _cached_complexity_analysis(self, story_content: dict) -> StoryComplexityAnalysis:
+        """Reuse the analysis of an identical story; only successful AI analyses are remembered"""
+        criteria = story_content['acceptance_criteria']
+        key = (story_content['heading'], story_content['description'], tuple(criteria) if isinstance(criteria, list) else criteria)
+        
+        with self._complexity_cache_lock:
+            cached = self._complexity_cache.get(key)
+            if cached is not None:
+                self._complexity_cache.move_to_end(key)
+        if cached is not None:
+            logger.info("Reusing complexity analysis for an identical story")
+            return cached.model_copy(deep=True)
+        
+        try:
+            analysis = self._request_complexity_analysis(story_content)
+        except Exception as e:
+            return self._default_complexity_analysis(e)
+        
+        with self._complexity_cache_lock:
+            self._complexity_cache[key] = analysis
+            while len(self._complexity_cache) > COMPLEXITY_CACHE_SIZE:
+                self._complexity_cache.popitem(last=False)
+        return analysis.model_copy(deep=True)
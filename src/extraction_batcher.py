@@ -0,0 +1,103 @@
+"""
+Micro-batching for test case extraction requests
+Collects story IDs that arrive within a short window and extracts each unique story once,
+optionally handing groups of unique stories to a batch extraction function
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionBatcher:
+    """Groups concurrent extraction requests so duplicate stories share a single LLM/ADO run"""
+
+    def __init__(self, extract_func: Callable[[str], Any], executor: Executor,
+                 max_batch: int = 16, flush_interval: float = 0.05,
+                 batch_func: Optional[Callable[[List[str]], List[Any]]] = None, batch_size: int = 5):
+        self._extract_func = extract_func
+        # Extracts several stories in one run, returning results in input order; groups hold at most batch_size stories
+        self._batch_func = batch_func
+        self._batch_size = max(1, batch_size)
+        self._executor = executor
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='extraction-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, story_id: str) -> Future:
+        """Queue a story for extraction and return a future for its result"""
+        future = Future()
+        self._queue.put((story_id, future))
+        return future
+
+    def _drain(self) -> List[Tuple[str, Future]]:
+        """Block for the first request, then collect more until the batch is full or the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Worker loop: dispatch one extraction per unique story, or per group of them with a batch function"""
+        while True:
+            batch = self._drain()
+            waiters: Dict[str, List[Future]] = {}
+            for story_id, future in batch:
+                if future.set_running_or_notify_cancel():
+                    waiters.setdefault(story_id, []).append(future)
+
+            logger.debug("Dispatching extraction batch: %d requests, %d unique stories", len(batch), len(waiters))
+            if self._batch_func is None or len(waiters) < 2:
+                for story_id, futures in waiters.items():
+                    self._executor.submit(self._extract, story_id, futures)
+                continue
+
+            story_ids = list(waiters)
+            for start in range(0, len(story_ids), self._batch_size):
+                group = {story_id: waiters[story_id] for story_id in story_ids[start:start + self._batch_size]}
+                self._executor.submit(self._extract_group, group)
+
+    def _extract(self, story_id: str, futures: List[Future]):
+        """Run the extraction once and hand every waiting request its own copy of the result"""
+        try:
+            result = self._extract_func(story_id)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self._resolve(futures, result)
+
+    def _extract_group(self, waiters: Dict[str, List[Future]]):
+        """Run the batch function once for a group of unique stories and resolve each story's waiters"""
+        try:
+            results = self._batch_func(list(waiters))
+        except Exception as e:
+            for futures in waiters.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        for futures, result in zip(waiters.values(), results):
+            self._resolve(futures, result)
+
+    @staticmethod
+    def _resolve(futures: List[Future], result: Any):
+        """Give the first waiter the result and every other waiter its own copy"""
+        futures[0].set_result(result)
+        for future in futures[1:]:
+            future.set_result(result.model_copy(deep=True) if hasattr(result, 'model_copy') else result)
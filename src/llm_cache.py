@@ -0,0 +1,69 @@
+"""
+Persistent cache of AI responses
+Identical prompts sent to the same model reuse the stored response instead of a new AI call
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """SQLite-backed map from prompt hash to the raw response content"""
+
+    def __init__(self, cache_dir: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'responses.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(messages: List[dict], model: str, temperature: float) -> str:
+        """SHA-256 of everything that determines the response: prompt messages, model and temperature"""
+        payload = json.dumps([model, temperature, messages], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute('SELECT content FROM responses WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, content: str):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, content, created_at) VALUES (?, ?, ?)',
+                (key, content, time.time())
+            )
+            self._conn.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Shared cache for Settings.LLM_CACHE_DIR, or None when caching is disabled"""
+    if not getattr(Settings, 'LLM_CACHE_ENABLED', False):
+        return None
+    cache_dir = Settings.LLM_CACHE_DIR
+    with _caches_lock:
+        if cache_dir not in _caches:
+            try:
+                _caches[cache_dir] = LLMResponseCache(cache_dir)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("LLM response cache unavailable at %s: %s", cache_dir, e)
+                return None
+        return _caches[cache_dir]
@@ -98,6 +98,7 @@ class StoryExtractionResult(BaseModel):
     stories: List[Union[UserStory, EnhancedUserStory]]  # Allow both types of story objects
     extraction_successful: bool = True
     error_message: Optional[str] = None
+    salvaged: bool = False  # Stories were recovered from a truncated or malformed AI response
 
 class ExistingUserStory(BaseModel):
     """Model representing an existing user story in ADO"""
@@ -1,7 +1,10 @@
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
 
+if TYPE_CHECKING:
+    from src.models import UserStory
+
 class ComplexityLevel(str, Enum):
     LOW = "Low"
     MEDIUM = "Medium"
@@ -24,6 +27,21 @@ class EnhancedUserStory(BaseModel):
     acceptance_criteria: str | List[str]  # Accept either a string or list of strings
     complexity_analysis: Optional[StoryComplexityAnalysis] = None
 
+    def to_user_story(self) -> "UserStory":
+        """Plain UserStory view of this story, sharing its field values rather than copying them"""
+        from src.models import UserStory  # src.models imports this module
+        
+        # model_construct skips validation, which would otherwise rebuild the acceptance criteria list
+        acceptance_criteria = self.acceptance_criteria
+        if not isinstance(acceptance_criteria, list):
+            acceptance_criteria = [acceptance_criteria]
+        return UserStory.model_construct(
+            heading=self.heading,
+            description=self.description,
+            acceptance_criteria=acceptance_criteria,
+            test_cases=[]
+        )
+
     def to_ado_format(self) -> dict:
         """Convert the story to ADO work item format"""
         print(f"[DEBUG] EnhancedUserStory.to_ado_format() called for: {self.heading}")
@@ -4,10 +4,13 @@ Background monitoring service for EPIC change detection and automatic synchroniz
 """
 
 import asyncio
+import copy
 import json
 import logging
 import os
 import sys
+import tempfile
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -71,9 +74,10 @@ class EpicMonitorState:
 class EpicChangeMonitor:
     """Background service that monitors EPICs for changes and triggers synchronization"""
     
-    def __init__(self, config: MonitorConfig):
+    def __init__(self, config: MonitorConfig, agent: Optional[StoryExtractionAgent] = None):
         self.config = config
-        self.agent = StoryExtractionAgent()
+        # Share the caller's agent when given so its AI and ADO clients are not built twice
+        self.agent = agent if agent is not None else StoryExtractionAgent()
         self.story_creator = EnhancedStoryCreator()  # Add enhanced story creator
         self.logger = self._setup_logger()
         self.is_running = False
@@ -88,9 +92,30 @@ class EpicChangeMonitor:
         self.state_file = Path("monitor_state.json")
         self.processed_epics = self._load_processed_epics()
 
+        # Change notification for push consumers (dashboard event stream)
+        self._state_version = 0
+        self._state_changed = threading.Condition()
+
         # Load existing snapshots
         self._load_existing_snapshots()
     
+    def notify_state_change(self):
+        """Wake up any listeners waiting for a monitor state change"""
+        with self._state_changed:
+            self._state_version += 1
+            self._state_changed.notify_all()
+
+    @property
+    def state_version(self) -> int:
+        """Counter bumped on every state change; usable as a cache key"""
+        return self._state_version
+
+    def wait_for_state_change(self, last_version: int, timeout: float = 15.0) -> int:
+        """Block until the state version differs from last_version or the timeout elapses"""
+        with self._state_changed:
+            self._state_changed.wait_for(lambda: self._state_version != last_version, timeout=timeout)
+            return self._state_version
+
     def _setup_logger(self) -> logging.Logger:
         """Setup logging for the monitor"""
         logger = logging.getLogger("EpicChangeMonitor")
@@ -135,7 +160,7 @@ class EpicChangeMonitor:
             self.logger.error(f"Failed to save processed epics state: {e}")
 
     def _load_existing_snapshots(self):
-        for epic_id in self.config.epic_ids or []:
+        for epic_id in self.config.epic_ids or ():
             snapshot_file = self.snapshot_dir / f"epic_{epic_id}.json"
             if snapshot_file.exists():
                 try:
@@ -186,6 +211,7 @@ class EpicChangeMonitor:
                         if self.config.auto_sync:
                             self.logger.info(f"Immediately synchronizing new EPIC {epic_id} after detection.")
                             self._sync_epic(epic_id)
+                    self.notify_state_change()
                     return True
                 else:
                     self.monitored_epics[epic_id] = EpicMonitorState(
@@ -205,8 +231,7 @@ class EpicChangeMonitor:
     
     def remove_epic(self, epic_id: str, exclude_from_auto_monitoring: bool = True) -> bool:
         """Remove an EPIC from monitoring and optionally add to exclusion list"""
-        if epic_id in self.monitored_epics:
-            del self.monitored_epics[epic_id]
+        if self.monitored_epics.pop(epic_id, None) is not None:
             self.logger.info(f"Removed EPIC {epic_id} from monitoring")
             
             # Add to exclusion list to prevent automatic re-addition
@@ -223,7 +248,8 @@ class EpicChangeMonitor:
                         save_config_to_file(self.config, "config/monitor_config.json")
                     except Exception as e:
                         self.logger.error(f"Failed to save configuration after excluding EPIC {epic_id}: {e}")
-            
+
+            self.notify_state_change()
             return True
         return False
     
@@ -306,8 +332,7 @@ class EpicChangeMonitor:
         """Remove an EPIC from monitoring and clean up associated files"""
         try:
             # Remove from monitored epics
-            if epic_id in self.monitored_epics:
-                del self.monitored_epics[epic_id]
+            if self.monitored_epics.pop(epic_id, None) is not None:
                 self.logger.info(f"Removed EPIC {epic_id} from monitored epics list")
 
             # Remove from processed epics if present
@@ -323,6 +348,7 @@ class EpicChangeMonitor:
                 self.logger.info(f"Removed snapshot file for EPIC {epic_id}")
 
             self.logger.info(f"Successfully removed EPIC {epic_id} from all monitoring systems")
+            self.notify_state_change()
 
         except Exception as e:
             self.logger.error(f"Error removing EPIC {epic_id} from monitoring: {e}")
@@ -500,6 +526,8 @@ class EpicChangeMonitor:
                                 import traceback
                                 self.logger.error(traceback.format_exc())
 
+                    self.notify_state_change()
+
                     # Wait before next polling cycle
                     self.logger.debug(f"Monitoring cycle complete, sleeping for {self.config.poll_interval_seconds} seconds")
                     await asyncio.sleep(self.config.poll_interval_seconds)
@@ -572,6 +600,10 @@ class EpicChangeMonitor:
         
         self.is_running = True
         self.logger.info("Starting EPIC Change Monitor")
+        self.notify_state_change()
+
+        # _monitor_loop shuts the executor down on exit, so a restarted monitor needs a fresh one
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_syncs)
 
         # Load all existing EPICs from Azure DevOps when monitoring starts
         self._load_all_existing_epics()
@@ -622,7 +654,7 @@ class EpicChangeMonitor:
 
             # Capture snapshots before stopping
             self.logger.info("Saving snapshots before shutdown")
-            for epic_id, state in self.monitored_epics.items():
+            for epic_id, state in list(self.monitored_epics.items()):
                 try:
                     if state.last_snapshot:
                         self._save_snapshot(epic_id, state.last_snapshot)
@@ -644,6 +676,7 @@ class EpicChangeMonitor:
                 self._check_timer.cancel()
                 
             self.logger.info("Monitor service stopped successfully")
+            self.notify_state_change()
             return True
             
         except Exception as e:
@@ -672,7 +705,7 @@ class EpicChangeMonitor:
             'last_update': datetime.now().isoformat()
         }
         
-        for epic_id, state in self.monitored_epics.items():
+        for epic_id, state in list(self.monitored_epics.items()):
             status['monitored_epics'][epic_id] = {
                 'last_check': state.last_check.isoformat(),
                 'consecutive_errors': state.consecutive_errors,
@@ -696,7 +729,8 @@ class EpicChangeMonitor:
             'failed_syncs': 0
         }
         
-        for epic_id, state in self.monitored_epics.items():
+        # Iterate a snapshot; API threads add and remove EPICs while the monitor runs
+        for epic_id, state in list(self.monitored_epics.items()):
             if state.consecutive_errors > 0:
                 stats['epics_with_errors'] += 1
             
@@ -743,6 +777,7 @@ class EpicChangeMonitor:
                         'check_time': datetime.now().isoformat()
                     }
         
+        self.notify_state_change()
         return results
 
     def _load_all_existing_epics(self):
@@ -935,30 +970,75 @@ class EpicChangeMonitor:
             return True  # Default to allowing extraction on error
 
 
+# Parsed config files: path -> ((mtime_ns, size), MonitorConfig fields), reused until the file changes
+_config_file_cache: Dict[str, tuple] = {}
+_config_file_cache_lock = threading.Lock()
+
+
 def load_config_from_file(config_file: str) -> MonitorConfig:
     """Load monitor configuration from JSON file"""
     try:
-        with open(config_file, 'r') as f:
-            config_data = json.load(f)
-        
-        # Filter out fields that aren't part of MonitorConfig (like ADO credentials)
-        from dataclasses import fields
-        valid_fields = {f.name for f in fields(MonitorConfig)}
-        filtered_config = {k: v for k, v in config_data.items() if k in valid_fields}
-        
-        return MonitorConfig(**filtered_config)
+        path = os.path.abspath(config_file)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with _config_file_cache_lock:
+            cached = _config_file_cache.get(path)
+
+        if cached is not None and cached[0] == stamp:
+            filtered_config = cached[1]
+        else:
+            with open(config_file, 'r') as f:
+                config_data = json.load(f)
+
+            # Filter out fields that aren't part of MonitorConfig (like ADO credentials)
+            from dataclasses import fields
+            valid_fields = {f.name for f in fields(MonitorConfig)}
+            filtered_config = {k: v for k, v in config_data.items() if k in valid_fields}
+            with _config_file_cache_lock:
+                _config_file_cache[path] = (stamp, filtered_config)
+
+        # MonitorConfig is mutable, so every caller gets its own copy of the cached fields
+        return MonitorConfig(**copy.deepcopy(filtered_config))
     except Exception as e:
         logging.error(f"Failed to load config from {config_file}: {e}")
         return MonitorConfig()
 
 
+def write_json_if_changed(path: str, data: Dict, indent: int = 2) -> bool:
+    """Atomically write data as JSON to path; returns False without writing if the file already matches"""
+    content = json.dumps(data, indent=indent)
+    try:
+        with open(path, 'r') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+
+    write_file_atomic(path, content)
+    return True
+
+
+def write_file_atomic(path: str, content: str):
+    """Write content to a sibling temp file and swap it in so readers never see a partial file"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def save_config_to_file(config: MonitorConfig, config_file: str):
     """Save monitor configuration to JSON file"""
     try:
         # Convert dataclass to dict, excluding None values for cleaner JSON
         config_dict = {k: v for k, v in asdict(config).items() if v is not None}
-        with open(config_file, 'w') as f:
-            json.dump(config_dict, f, indent=2)
+        if not write_json_if_changed(config_file, config_dict):
+            logging.debug(f"Configuration unchanged, skipped writing {config_file}")
+            return
         logging.info(f"Configuration saved to {config_file}")
     except Exception as e:
         logging.error(f"Failed to save config to {config_file}: {e}")
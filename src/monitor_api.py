@@ -4,26 +4,327 @@ Provides REST API endpoints for the web dashboard
 Former name: ADO Story Extractor
 """
 
+import atexit
+import gzip
+import hashlib
 import json
 import logging
 import os
+import queue
+import signal
+import sys
 import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, fields
 from datetime import datetime
-from typing import Dict, Any, List
-from flask import Flask, render_template, request, jsonify, Response
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, List, Optional, Tuple
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; responses fall back to Flask's stdlib encoder
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:  # Optional; responses are sent uncompressed without it
+    Compress = None
+
+try:
+    from waitress import serve as waitress_serve
+except ImportError:  # Optional production server; run() falls back to the Werkzeug server
+    waitress_serve = None
 
 from src.agent import StoryExtractionAgent
+from src.ado_client import ADOClient
+from src.extraction_batcher import ExtractionBatcher
+from src.jira_client import JiraClient
 from src.models import TestCaseExtractionResult, StoryExtractionResult
-from src.monitor import EpicChangeMonitor, MonitorConfig
+from src.monitor import EpicChangeMonitor, MonitorConfig, write_file_atomic, write_json_if_changed
+from src.token_stats_manager import get_token_stats_manager
 from config.settings import Settings
 
 
+# Upper bound on how long a request waits for a manual monitor check
+FORCE_CHECK_TIMEOUT_SECONDS = 300
+
+# How long /api/epics and /api/stats reuse their ADO-derived payloads while monitor state is unchanged
+EPIC_DATA_CACHE_TTL_SECONDS = 5.0
+
+# Request threads for the production WSGI server. Every open dashboard holds one for its /api/events
+# stream (capped by SSE_MAX_STREAMS), and NDJSON bulk extractions hold one until they finish, so size
+# this above the expected number of open dashboards plus concurrent bulk extractions
+WSGI_THREADS = int(os.getenv('WSGI_THREADS', '16'))
+
+# Concurrent /api/events streams; half the WSGI threads by default so dashboards cannot starve other requests
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', str(max(1, WSGI_THREADS // 2))))
+
+# An SSE stream ends after this long and EventSource reconnects, so a thread is never held forever
+SSE_STREAM_MAX_SECONDS = 300
+
+# Reconnect delay sent to dashboards turned away because every stream slot is taken
+SSE_OVERFLOW_RETRY_MS = 30000
+
+# Production WSGI server: 'waitress' (threaded) or 'gevent' (requires startup monkey patching)
+WSGI_SERVER = os.getenv('WSGI_SERVER', 'waitress')
+
+# Upper bound on how long a cached /api/monitor/status payload is served
+STATUS_CACHE_TTL_SECONDS = 1.0
+
+# gzip level for responses: shared by flask-compress and the streamed JSON arrays it skips
+COMPRESS_LEVEL = 4
+
+# Background jobs kept for polling via /api/jobs/<job_id>; the oldest are forgotten first
+MAX_TRACKED_JOBS = 1000
+
+# Error message prefixes for routes that report failures through _handle_unexpected_error
+_ROUTE_ERROR_MESSAGES = {
+    'start_monitor': 'Failed to start monitor',
+    'stop_monitor': 'Failed to stop monitor',
+    'get_monitor_status': 'Failed to get monitor status',
+    'remove_epic': 'Failed to remove EPIC',
+    'get_config': 'Failed to get configuration',
+    'switch_platform': 'Failed to switch platform',
+    'test_platform_connection': 'Failed to test connection',
+    'force_check': 'Force check failed',
+    'extract_test_cases_for_story': 'Failed to extract test cases',
+    'upload_test_cases_for_story': 'Failed to upload test cases',
+    'clear_logs_display': 'Failed to clear log display',
+}
+
+def _config_bool(value: Any) -> bool:
+    """Read a JSON boolean, also accepting the 'true'/'false' strings form posts send"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _config_str_list(value: Any) -> Optional[List[str]]:
+    """Read a list of IDs as strings, whether they arrive as JSON numbers or strings"""
+    return None if value is None else [str(item) for item in value]
+
+
+def _config_optional_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+# Casters for incoming values, keyed by the MonitorConfig field annotation
+_CONFIG_TYPE_COERCERS = {
+    int: int,
+    bool: _config_bool,
+    str: str,
+    Optional[str]: _config_optional_str,
+    List[str]: _config_str_list,
+}
+
+# Every MonitorConfig field accepted by POST /api/config, with the caster for its incoming value
+_MONITOR_CONFIG_COERCERS = {
+    field.name: _CONFIG_TYPE_COERCERS[field.type] for field in fields(MonitorConfig)
+}
+
+# Monitor config fields applied directly by PUT /api/config, with the caster for incoming values
+_MONITOR_CONFIG_FIELDS = (
+    ('auto_sync', _config_bool),
+    ('auto_extract_new_epics', _config_bool),
+    ('log_level', str),
+    ('max_concurrent_syncs', int),
+    ('retry_attempts', int),
+    ('retry_delay_seconds', int),
+)
+
+# Keys accepted by PUT /api/config that are persisted to .env, mapped to their environment variable
+_ENV_CONFIG_MAPPING = {
+    'ado_organization': 'ADO_ORGANIZATION',
+    'ado_project': 'ADO_PROJECT',
+    'ado_pat': 'ADO_PAT',
+    'jira_base_url': 'JIRA_BASE_URL',
+    'jira_username': 'JIRA_USERNAME',
+    'jira_token': 'JIRA_TOKEN',
+    'jira_project_key': 'JIRA_PROJECT_KEY',
+    'ai_service_provider': 'AI_SERVICE_PROVIDER',
+    'openai_api_key': 'OPENAI_API_KEY',
+    'openai_model': 'OPENAI_MODEL',
+    'azure_openai_endpoint': 'AZURE_OPENAI_ENDPOINT',
+    'azure_openai_api_key': 'AZURE_OPENAI_API_KEY',
+    'azure_openai_deployment_name': 'AZURE_OPENAI_DEPLOYMENT_NAME',
+    'azure_openai_api_version': 'AZURE_OPENAI_API_VERSION',
+    'github_token': 'GITHUB_TOKEN',
+    'github_model': 'GITHUB_MODEL',
+    'story_extraction_type': 'ADO_STORY_EXTRACTION_TYPE',
+    'test_case_extraction_type': 'ADO_TEST_CASE_EXTRACTION_TYPE',
+    'auto_test_case_extraction': 'ADO_AUTO_TEST_CASE_EXTRACTION',
+    'openai_max_retries': 'OPENAI_MAX_RETRIES',
+    'openai_retry_delay': 'OPENAI_RETRY_DELAY',
+    'requirement_type': 'ADO_REQUIREMENT_TYPE',
+    'user_story_type': 'ADO_USER_STORY_TYPE'
+}
+
+# Secrets that are masked in logs and never overwritten with an empty value
+_SENSITIVE_CONFIG_KEYS = frozenset({'ado_pat', 'openai_api_key', 'azure_openai_api_key', 'jira_token', 'github_token'})
+
+# Numeric settings that are stored as plain strings in .env
+_NUMERIC_ENV_CONFIG_KEYS = frozenset({'openai_max_retries', 'openai_retry_delay'})
+
+
+def _parse_log_line(line: str) -> Dict[str, str]:
+    """Parse a log line of the form "2025-08-09 07:12:03,405 - MonitorAPI - INFO - Message" for the dashboard"""
+    parts = line.split(' - ', 3)
+    if len(parts) < 4:
+        # Fallback for malformed lines
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'level': 'info',
+            'component': 'System',
+            'message': line
+        }
+
+    timestamp_str, component, level, message = parts
+    # Convert timestamp to ISO format
+    try:
+        iso_timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S,%f').isoformat()
+    except ValueError:
+        iso_timestamp = timestamp_str
+
+    return {
+        'timestamp': iso_timestamp,
+        'level': level.lower(),
+        'component': component,
+        'message': message
+    }
+
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes jsonify() responses with orjson"""
+
+    _OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _apply_env_updates(lines: List[str], updates: Dict[str, str]) -> List[str]:
+    """Update existing .env keys in place and append missing ones, indexing the file in a single pass"""
+    key_to_lineno: Dict[str, int] = {}
+    for i, line in enumerate(lines):
+        eq = line.find('=')
+        if eq > 0:
+            # First occurrence wins, matching Settings.verify_env_file_update
+            key_to_lineno.setdefault(line[:eq], i)
+
+    lines = list(lines)
+    if lines and not lines[-1].endswith('\n'):
+        lines[-1] += '\n'
+    for key, value in updates.items():
+        entry = f'{key}={value}\n'
+        if key in key_to_lineno:
+            lines[key_to_lineno[key]] = entry
+        else:
+            lines.append(entry)
+    return lines
+
+
+def _json_etag(body: str) -> str:
+    """Content hash used as the ETag for a cached JSON body"""
+    return hashlib.blake2b(body.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _etag_matches(etag: str) -> bool:
+    """Whether If-None-Match names etag, including the ':gzip'-suffixed tag flask-compress hands out"""
+    if_none_match = request.if_none_match
+    return etag in if_none_match or any(tag.split(':', 1)[0] == etag for tag in if_none_match)
+
+
+def _gzip_chunks(chunks, level: int = COMPRESS_LEVEL):
+    """Gzip a stream of text chunks, sync-flushing after each so every chunk reaches the client as written"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk.encode('utf-8')) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _tail_lines(path: str, n: int, block_size: int = 8192) -> List[str]:
+    """Return the last n lines of a text file, reading backwards from the end in fixed-size blocks"""
+    with open(path, 'rb') as f:
+        return _tail_lines_from(f, n, block_size)
+
+
+def _tail_lines_from(f, n: int, block_size: int = 8192) -> List[str]:
+    """Return the last n lines of an open binary file; the caller must serialize access to f"""
+    if n <= 0:
+        return []
+
+    chunks = []
+    newline_count = 0
+    position = f.seek(0, os.SEEK_END)
+    # Stop once there is one newline more than needed so the oldest returned line is complete
+    while position > 0 and newline_count <= n:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        chunk = f.read(read_size)
+        chunks.append(chunk)
+        newline_count += chunk.count(b'\n')
+
+    data = b''.join(reversed(chunks))
+    return [line.decode('utf-8', errors='replace') for line in data.splitlines()[-n:]]
+
+
 class MonitorAPI:
     """Flask-based API for monitoring and controlling the story extraction process"""
 
-    def _update_env_file(self, key: str, value: str):
-        """Update a value in both .env files (root and config/)"""
+    # URL rule, endpoint (handler method name) and options for every API route
+    _ROUTES = (
+        ('/', 'dashboard', ['GET']),
+        ('/dashboard', 'dashboard_route', ['GET']),
+        ('/api/health', 'health_check', ['GET']),
+        ('/api/config', 'update_config', ['POST']),
+        ('/api/monitor/start', 'start_monitor', ['POST']),
+        ('/api/monitor/stop', 'stop_monitor', ['POST']),
+        ('/api/shutdown', 'shutdown', ['POST']),
+        ('/api/monitor/status', 'get_monitor_status', ['GET']),
+        ('/api/events', 'stream_events', ['GET']),
+        ('/api/epics/<epic_id>', 'remove_epic', ['DELETE']),
+        ('/api/epics', 'get_epics', ['GET']),
+        ('/api/stats', 'get_stats', ['GET']),
+        ('/api/token-stats', 'get_token_stats', ['GET']),
+        ('/api/config', 'get_config', ['GET']),
+        ('/api/config', 'update_config_put', ['PUT']),
+        ('/api/platform/switch', 'switch_platform', ['POST']),
+        ('/api/platform/test-connection', 'test_platform_connection', ['POST']),
+        ('/api/monitor/check', 'force_check', ['POST']),
+        ('/api/jobs/<job_id>', 'get_job', ['GET']),
+        ('/api/stories/<story_id>/test-cases', 'extract_test_cases_for_story', ['POST']),
+        ('/api/stories/<story_id>/test-cases/upload', 'upload_test_cases_for_story', ['POST']),
+        ('/api/logs', 'get_logs', ['GET']),
+        ('/api/logs/clear', 'clear_logs_display', ['POST']),
+        ('/api/test-cases/extract', 'extract_test_cases', ['POST']),
+        ('/api/test-cases/preview', 'preview_test_cases', ['POST']),
+        ('/api/test-cases/bulk-extract', 'bulk_extract_test_cases', ['POST']),
+        ('/api/stories/extract', 'extract_stories', ['POST']),
+        ('/api/stories/preview', 'preview_stories', ['POST']),
+    )
+
+    def _update_env_file(self, updates: Dict[str, str]):
+        """Apply key/value updates to both .env files (root and config/), rewriting each file once"""
+        if not updates:
+            return
+
         root_dir = os.path.dirname(os.path.dirname(__file__))
         env_paths = [
             os.path.join(root_dir, '.env'),  # Root .env
@@ -31,27 +332,15 @@ class MonitorAPI:
         ]
         
         for env_path in env_paths:
-            if not os.path.exists(env_path):
+            try:
+                # Read current content
+                with open(env_path, 'r') as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
                 continue
-                
-            # Read current content
-            with open(env_path, 'r') as f:
-                lines = f.readlines()
-            
-            # Update or add the key-value pair
-            key_found = False
-            for i, line in enumerate(lines):
-                if line.startswith(f'{key}='):
-                    lines[i] = f'{key}={value}\n'
-                    key_found = True
-                    break
             
-            if not key_found:
-                lines.append(f'{key}={value}\n')
-            
-            # Write back to file
-            with open(env_path, 'w') as f:
-                f.writelines(lines)
+            # Swap the new content in atomically so a crash cannot leave a truncated .env
+            write_file_atomic(env_path, ''.join(_apply_env_updates(lines, updates)))
 
     def __init__(self, config: MonitorConfig = None, port: int = 5001):
         # Force reload settings from .env file at startup
@@ -61,9 +350,49 @@ class MonitorAPI:
         
         self.app = Flask(__name__, template_folder='../templates', static_folder='../static')
         CORS(self.app)
+        if orjson is not None:
+            self.app.json = _OrjsonProvider(self.app)
+        # Responses go to the dashboard's fetch() calls: skip key sorting and debug pretty-printing
+        self.app.json.sort_keys = False
+        self.app.json.compact = True
+        self.app.url_map.strict_slashes = False
+        if Compress is not None:
+            # flask-compress would buffer streams; SSE stays uncompressed and JSON arrays gzip themselves
+            self.app.config.update(
+                COMPRESS_MIMETYPES=['application/json', 'text/html'],
+                COMPRESS_LEVEL=COMPRESS_LEVEL,
+                COMPRESS_MIN_SIZE=1024,
+                COMPRESS_STREAMS=False,
+            )
+            Compress(self.app)
         self.port = port
 
         self.agent = StoryExtractionAgent()
+        # Bounded pool for I/O-heavy agent calls (LLM + ADO round trips)
+        self.io_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix='monitor-api-io')
+        # Small pool for monitor operations so manual checks cannot stampede ADO
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='monitor')
+        atexit.register(self._executor.shutdown, wait=False)
+        # Concurrent extraction requests for the same story are merged into one run, and different
+        # stories arriving together share batched AI calls
+        self._extraction_batcher = ExtractionBatcher(
+            self.agent.extract_test_cases_for_story, self.io_pool,
+            batch_func=self.agent.extract_test_cases_for_stories,
+            batch_size=Settings.TEST_CASE_EXTRACTION_BATCH_SIZE
+        )
+        # Free /api/events stream slots; each open stream holds a WSGI worker thread
+        self._sse_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+        # In-flight manual checks keyed by EPIC ID ('__all__' for a full check) so duplicates share one run
+        self._inflight_checks: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Requests accepted with 202 run here; kept apart from the pools they wait on so they cannot starve them
+        self._job_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='monitor-api-job')
+        atexit.register(self._job_pool.shutdown, wait=False)
+        self._jobs: "OrderedDict[str, Future]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        # Platform clients reused across connection tests, rebuilt when their credentials change
+        self._platform_clients: Dict[type, Tuple[tuple, Any]] = {}
+        self._platform_clients_lock = threading.Lock()
         Settings.validate()  # Validate settings first
         self.settings = Settings  # Use the class itself, not an instance
         self.logger = logging.getLogger(__name__)
@@ -71,6 +400,25 @@ class MonitorAPI:
         # Create monitor instance, loading config from file if none provided
         self.monitor = None
         self.monitor_thread = None
+        self._config_snapshot = None
+        self._config_snapshot_lock = threading.Lock()
+        self._config_snapshot_version = 0
+        # Settings reloads are serialized; a request is satisfied by any reload that started after it asked
+        self._settings_reload_lock = threading.Lock()
+        self._settings_reload_requests = 0
+        self._settings_reloaded_through = 0
+        self._logs_cache = None
+        self._log_handle = None
+        self._log_handle_id = None
+        self._log_handle_lock = threading.Lock()
+        self._status_cache = None
+        self._epic_data_cache: Dict[str, Tuple[tuple, float, Any]] = {}
+        self._dashboard_page = None
+        self.monitor_restart_count = 0
+        self.monitor_last_error = None
+        self._monitor_stop_event = threading.Event()
+        # Serializes monitor start/stop so the supervisor thread is never created twice
+        self._monitor_lock = threading.Lock()
         if config is None:
             try:
                 with open('config/monitor_config.json', 'r') as f:
@@ -84,7 +432,7 @@ class MonitorAPI:
                 self.logger.error(f"Failed to load monitor configuration: {str(e)}")
                 raise RuntimeError("Monitor configuration is required. Please provide a valid configuration.")
 
-        self.monitor = EpicChangeMonitor(config)
+        self.monitor = EpicChangeMonitor(config, agent=self.agent)
 
         # Setup routes
         self._setup_routes()
@@ -114,487 +462,744 @@ class MonitorAPI:
             # Brand new epic that hasn't been processed
             return "New"
 
-    def _setup_routes(self):
-        """Setup Flask routes"""
+    def _run_io(self, func, *args, **kwargs):
+        """Run a blocking agent call on the shared I/O pool and wait for its result"""
+        return self.io_pool.submit(func, *args, **kwargs).result()
 
-        @self.app.route('/')
-        def dashboard():
-            """Main dashboard page"""
-            return render_template('dashboard.html')
-
-        @self.app.route('/dashboard')
-        def dashboard_route():
-            """Dashboard page accessible via /dashboard"""
-            return render_template('dashboard.html')
-
-        @self.app.route('/api/health')
-        def health_check():
-            """Health check endpoint"""
-            return jsonify({
-                'status': 'healthy',
-                'timestamp': datetime.now().isoformat(),
-                'service': 'STAX API'
-            })
-
-        # Config endpoints
-        @self.app.route('/api/config', methods=['POST'])
-        def update_config():
-            """Update the monitor configuration"""
-            self.logger.info("[CONFIG-API] 🔄 Configuration update request received")
-            if not self.monitor:
-                self.logger.error("[CONFIG-API] ❌ Monitor not configured")
-                return jsonify({
-                    'error': 'Monitor not configured'
-                }), 500
-            
+    def _supervise_monitor(self, initial_backoff: float = 5.0, max_backoff: float = 300.0):
+        """Run the monitor loop, restarting it with exponential backoff if it exits unexpectedly"""
+        backoff = initial_backoff
+        while self.is_monitor_running:
             try:
-                config_data = request.get_json()
-                if not config_data:
-                    self.logger.error("[CONFIG-API] ❌ No configuration data provided")
-                    return jsonify({
-                        'error': 'No configuration data provided'
-                    }), 400
-
-                self.logger.info(f"[CONFIG-API] 📥 Received configuration data: {config_data}")
-
-                # Get current config from monitor
-                current_config = self.monitor.config.__dict__.copy()
-                self.logger.info(f"[CONFIG-API] 📋 Current configuration: {current_config}")
-
-                # Track changes for logging
-                changes_made = {}
-
-                # Update with new values
-                if 'epic_ids' in config_data:
-                    # Handle epic_ids specially since they need to be strings
-                    old_epic_ids = current_config.get('epic_ids', [])
-                    new_epic_ids = [str(epic_id) for epic_id in config_data['epic_ids']]
-                    current_config['epic_ids'] = new_epic_ids
-                    changes_made['epic_ids'] = {'old': old_epic_ids, 'new': new_epic_ids}
-                    self.logger.info(f"[CONFIG-API] 🔄 Epic IDs changed: {old_epic_ids} → {new_epic_ids}")
-                    del config_data['epic_ids']  # Remove from config_data to prevent double processing
-                
-                # Log each configuration change
-                for key, new_value in config_data.items():
-                    old_value = current_config.get(key)
-                    if old_value != new_value:
-                        changes_made[key] = {'old': old_value, 'new': new_value}
-                        self.logger.info(f"[CONFIG-API] 🔄 {key} changed: {old_value} → {new_value}")
-                    else:
-                        self.logger.info(f"[CONFIG-API] ➡️ {key} unchanged: {new_value}")
-
-                current_config.update(config_data)
-                
-                # Create new config object
-                self.logger.info("[CONFIG-API] 🔨 Creating new MonitorConfig object")
-                new_config = MonitorConfig(**current_config)
-                
-                # Save the updated config to file
-                self.logger.info("[CONFIG-API] 💾 Saving updated config to config/monitor_config.json")
-                with open('config/monitor_config.json', 'w') as f:
-                    json.dump(current_config, f, indent=4)
-                self.logger.info("[CONFIG-API] ✅ Configuration file saved successfully")
-                
-                # Update monitor with new config
-                self.logger.info("[CONFIG-API] 🔄 Updating monitor with new configuration")
-                self.monitor.config = new_config
-                
-                # If epic_ids were updated, refresh the monitored epics
-                if 'epic_ids' in changes_made:
-                    self.logger.info("[CONFIG-API] 🎯 Refreshing monitored epics based on updated epic_ids")
-                    current_epics = set(self.monitor.monitored_epics.keys())
-                    new_epics = set(str(epic_id) for epic_id in changes_made['epic_ids']['new'])
-                    
-                    # Remove epics that are no longer in the config
-                    removed_epics = current_epics - new_epics
-                    for epic_id in removed_epics:
-                        if epic_id in self.monitor.monitored_epics:
-                            self.logger.info(f"[CONFIG-API] ➖ Removing epic {epic_id} from monitoring")
-                            del self.monitor.monitored_epics[epic_id]
-                    
-                    # Add new epics
-                    added_epics = new_epics - current_epics
-                    for epic_id in added_epics:
-                        self.logger.info(f"[CONFIG-API] ➕ Adding epic {epic_id} to monitoring")
-                        self.monitor.add_epic(str(epic_id))
-
-                self.logger.info(f"[CONFIG-API] ✅ Configuration update completed successfully. Changes made: {len(changes_made)} items")
-                for key, change in changes_made.items():
-                    self.logger.info(f"[CONFIG-API] 📋 Final {key}: {change['new']}")
-                
-                return jsonify({
-                    'status': 'success',
-                    'message': 'Configuration updated successfully',
-                    'config': current_config,
-                    'changes_made': changes_made
-                })
+                self.monitor.start()
+                if not self.is_monitor_running:
+                    break
+                self.monitor_last_error = 'Monitor loop exited unexpectedly'
             except Exception as e:
-                self.logger.error(f"[CONFIG-API] ❌ Error updating configuration: {str(e)}")
-                return jsonify({
-                    'error': f'Failed to update configuration: {str(e)}'
-                }), 500
+                self.monitor_last_error = str(e)
+                self.logger.error(f"Monitor thread failed: {e}")
 
-        # Monitor control endpoints
-        @self.app.route('/api/monitor/start', methods=['POST'])
-        def start_monitor():
-            """Start the monitoring service"""
-            try:
-                if not self.monitor:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Monitor not configured. Please restart the API with monitor configuration.'
-                    }), 400
+            if not self.is_monitor_running:
+                break
 
-                if self.monitor.is_running:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Monitor is already running'
-                    }, 400)
+            self.monitor_restart_count += 1
+            self.logger.warning(f"Restarting monitor in {backoff:.0f}s (restart #{self.monitor_restart_count}): {self.monitor_last_error}")
+            self.monitor.notify_state_change()
+            if self._monitor_stop_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, max_backoff)
 
-                # Start monitor in a separate thread to avoid blocking the API
-                def start_monitor_thread():
-                    try:
-                        self.monitor.start()
-                    except Exception as e:
-                        self.logger.error(f"Monitor thread failed: {e}")
+        self.is_monitor_running = False
+        self.monitor.notify_state_change()
+
+    def _build_config_dict(self) -> Dict[str, Any]:
+        """Build the GET /api/config payload from Settings and the monitor config (without epic_ids)"""
+        return {
+            'platform_type': self.settings.PLATFORM_TYPE,
+            'ado_organization': self.settings.ADO_ORGANIZATION,
+            'ado_project': self.settings.ADO_PROJECT,
+            'ado_pat': '***hidden***',  # Don't expose the actual PAT
+            'jira_base_url': getattr(self.settings, 'JIRA_BASE_URL', ''),
+            'jira_username': getattr(self.settings, 'JIRA_USERNAME', ''),
+            'jira_token': '***hidden***',  # Don't expose the actual token
+            'jira_project_key': getattr(self.settings, 'JIRA_PROJECT_KEY', ''),
+            'ai_service_provider': getattr(self.settings, 'AI_SERVICE_PROVIDER', 'OPENAI'),
+            'openai_api_key': '***hidden***',  # Don't expose the actual API key
+            'openai_model': self.settings.OPENAI_MODEL,
+            'azure_openai_endpoint': getattr(self.settings, 'AZURE_OPENAI_ENDPOINT', ''),
+            'azure_openai_api_key': '***hidden***',  # Don't expose the actual API key
+            'azure_openai_deployment_name': getattr(self.settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', ''),
+            'azure_openai_api_version': getattr(self.settings, 'AZURE_OPENAI_API_VERSION', '2024-02-15-preview'),
+            'github_token': '***hidden***',  # Don't expose the actual token
+            'github_model': getattr(self.settings, 'GITHUB_MODEL', 'gpt-4o-mini'),
+            'openai_max_retries': self.settings.OPENAI_MAX_RETRIES,
+            'openai_retry_delay': self.settings.OPENAI_RETRY_DELAY,
+            'requirement_type': self.settings.REQUIREMENT_TYPE,
+            'user_story_type': self.settings.USER_STORY_TYPE,
+            'story_extraction_type': self.settings.STORY_EXTRACTION_TYPE,
+            'test_case_extraction_type': self.settings.TEST_CASE_EXTRACTION_TYPE,
+            'auto_test_case_extraction': self.settings.AUTO_TEST_CASE_EXTRACTION,
+            'check_interval_minutes': self.monitor.config.poll_interval_seconds // 60 if self.monitor.config.poll_interval_seconds else 5,
+            'auto_sync': self.monitor.config.auto_sync if hasattr(self.monitor.config, 'auto_sync') else True,
+            'auto_extract_new_epics': self.monitor.config.auto_extract_new_epics if hasattr(self.monitor.config, 'auto_extract_new_epics') else True,
+            'log_level': getattr(self.monitor.config, 'log_level', 'INFO'),
+            'max_concurrent_syncs': getattr(self.monitor.config, 'max_concurrent_syncs', 3),
+            'retry_attempts': getattr(self.monitor.config, 'retry_attempts', 3),
+            'retry_delay_seconds': getattr(self.monitor.config, 'retry_delay_seconds', 60)
+        }
+
+    def _get_config_snapshot(self) -> Dict[str, Any]:
+        """Return the cached config payload, rebuilding it after an invalidation"""
+        with self._config_snapshot_lock:
+            if self._config_snapshot is None:
+                self._config_snapshot = self._build_config_dict()
+            return self._config_snapshot
+
+    def _invalidate_config_snapshot(self):
+        """Drop the cached config payload after Settings or the monitor config change"""
+        with self._config_snapshot_lock:
+            self._config_snapshot = None
+            self._config_snapshot_version += 1
+
+    def _reload_settings(self):
+        """Reload Settings from .env, sharing one reload between requests that arrive while another is running"""
+        with self._config_snapshot_lock:
+            self._settings_reload_requests += 1
+            ticket = self._settings_reload_requests
+
+        with self._settings_reload_lock:
+            if self._settings_reloaded_through >= ticket:
+                return
+            with self._config_snapshot_lock:
+                covered = self._settings_reload_requests
+            Settings.reload_config()
+            self._settings_reloaded_through = covered
+            self._invalidate_config_snapshot()
+
+    def _submit_force_check(self, epic_id: Optional[str] = None) -> Future:
+        """Start a manual check, or join the identical one that is already running"""
+        key = epic_id or '__all__'
+        with self._inflight_lock:
+            future = self._inflight_checks.get(key)
+            if future is not None and not future.done():
+                return future
+            future = self._executor.submit(self.monitor.force_check, epic_id)
+            self._inflight_checks[key] = future
+
+        # Registered outside the lock: the callback runs inline if the check has already finished
+        future.add_done_callback(lambda _: self._forget_force_check(key, future))
+        return future
+
+    def _forget_force_check(self, key: str, future: Future):
+        """Drop a finished manual check so the next request starts a fresh one"""
+        with self._inflight_lock:
+            if self._inflight_checks.get(key) is future:
+                del self._inflight_checks[key]
+
+    def _submit_job(self, func, *args) -> str:
+        """Run func in the background and return the ID to poll its result under"""
+        job_id = uuid.uuid4().hex
+        future = self._job_pool.submit(func, *args)
+        with self._jobs_lock:
+            self._jobs[job_id] = future
+            while len(self._jobs) > MAX_TRACKED_JOBS:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    @staticmethod
+    def _wants_async() -> bool:
+        """Whether the client asked for a 202 + job ID instead of waiting for the result"""
+        if request.args.get('async', '').lower() in ('1', 'true'):
+            return True
+        return 'respond-async' in request.headers.get('Prefer', '')
+
+    @staticmethod
+    def _json_stream_response(chunks) -> Response:
+        """Stream JSON text chunks, gzipped on the fly when the client accepts it"""
+        if not request.accept_encodings['gzip']:
+            return Response(chunks, mimetype='application/json')
+        response = Response(_gzip_chunks(chunks), mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def _get_monitor_status_data(self) -> Dict[str, Any]:
+        """Build the monitor status payload shared by the status endpoint and event stream"""
+        return {
+            'status': 'running' if self.is_monitor_running else 'stopped',
+            'is_running': bool(self.is_monitor_running),  # Ensure boolean
+            'epic_count': len(self.monitor.monitored_epics),
+            'last_check': self.monitor.last_check.isoformat() if hasattr(self.monitor, 'last_check') and self.monitor.last_check else None,
+            'restart_count': self.monitor_restart_count,
+            'last_error': self.monitor_last_error
+        }
+
+    def _get_cached_monitor_status(self) -> Dict[str, Any]:
+        """Return the status payload, rebuilding it only when monitor state changed or the TTL lapsed"""
+        return self._get_cached_monitor_status_entry()[2]
+
+    def _get_cached_monitor_status_entry(self) -> tuple:
+        """Return the cached (key, expiry, payload, body, etag) status entry, rebuilding it when stale"""
+        key = (id(self.monitor), self.monitor.state_version, self.is_monitor_running,
+               self.monitor_restart_count, self.monitor_last_error)
+        now = time.monotonic()
+        cached = self._status_cache
+        if cached is not None and cached[0] == key and now < cached[1]:
+            return cached
+
+        data = self._get_monitor_status_data()
+        self.logger.debug(f"Monitor status: {data}")
+        body = self.app.json.dumps(data)
+        self._status_cache = (key, now + STATUS_CACHE_TTL_SECONDS, data, body, _json_etag(body))
+        return self._status_cache
+
+    @staticmethod
+    def _conditional_json_response(body: str, etag: str) -> Response:
+        """Send pre-encoded JSON, or a bodiless 304 when the client already holds this ETag"""
+        if _etag_matches(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
 
-                self.monitor_thread = threading.Thread(target=start_monitor_thread, daemon=True)
-                self.monitor_thread.start()
-                self.is_monitor_running = True
+    def _setup_routes(self):
+        """Register the Flask routes declared in _ROUTES"""
+        for rule, endpoint, methods in self._ROUTES:
+            self.app.add_url_rule(rule, endpoint, getattr(self, endpoint), methods=methods)
+        self.app.register_error_handler(Exception, self._handle_unexpected_error)
+
+    def _handle_unexpected_error(self, e: Exception):
+        """Turn exceptions escaping a route into the API's JSON error envelope"""
+        if isinstance(e, HTTPException):
+            return e
+        message = _ROUTE_ERROR_MESSAGES.get(request.endpoint, 'Internal server error')
+        self.logger.error(f"Error in {request.endpoint} endpoint: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'{message}: {str(e)}'
+        }), 500
+
+    def _render_dashboard(self):
+        """Serve the dashboard page, rendered and gzipped once and revalidated by ETag (re-rendered each hit in debug mode)"""
+        if self.app.debug:
+            return render_template('dashboard.html')
 
-                return jsonify({
-                    'success': True,
-                    'message': 'Monitor started successfully',
-                    'status': 'running'
-                })
+        if self._dashboard_page is None:
+            html = render_template('dashboard.html').encode('utf-8')
+            etag = hashlib.blake2b(html, digest_size=8).hexdigest()
+            self._dashboard_page = (html, etag, gzip.compress(html, COMPRESS_LEVEL), f'{etag}-gz')
 
-            except Exception as e:
-                self.logger.error(f"Error starting monitor: {str(e)}")
+        html, etag, gzipped, gzipped_etag = self._dashboard_page
+        if request.accept_encodings['gzip']:
+            response = Response(gzipped, mimetype='text/html')
+            response.headers['Content-Encoding'] = 'gzip'
+            response.set_etag(gzipped_etag)
+        else:
+            response = Response(html, mimetype='text/html')
+            response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+        return response.make_conditional(request)
+
+    def dashboard(self):
+        """Main dashboard page"""
+        return self._render_dashboard()
+
+    def dashboard_route(self):
+        """Dashboard page accessible via /dashboard"""
+        return self._render_dashboard()
+
+    def health_check(self):
+        """Health check endpoint"""
+        return jsonify({
+            'status': 'healthy',
+            'timestamp': datetime.now().isoformat(),
+            'service': 'STAX API'
+        })
+
+    # Config endpoints
+    def update_config(self):
+        """Update the monitor configuration"""
+        self.logger.info("[CONFIG-API] 🔄 Configuration update request received")
+        if not self.monitor:
+            self.logger.error("[CONFIG-API] ❌ Monitor not configured")
+            return jsonify({
+                'error': 'Monitor not configured'
+            }), 500
+        
+        try:
+            config_data = request.get_json(silent=True)
+            if not config_data or not isinstance(config_data, dict):
+                self.logger.error("[CONFIG-API] ❌ No configuration data provided")
                 return jsonify({
-                    'success': False,
-                    'error': f'Failed to start monitor: {str(e)}'
-                }), 500
+                    'error': 'No configuration data provided'
+                }), 400
 
-        @self.app.route('/api/monitor/stop', methods=['POST'])
-        def stop_monitor():
-            """Stop the monitoring service"""
-            try:
-                if not self.monitor:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Monitor not configured'
-                    }), 400
+            self.logger.info(f"[CONFIG-API] 📥 Received configuration data: {config_data}")
 
-                # Get current status before stopping
-                current_status = self.monitor.get_status()
-                was_running = current_status.get('is_running', False)
-
-                # Even if monitor reports not running, try to stop it to ensure cleanup
-                try:
-                    self.monitor.stop()
-                    self.is_monitor_running = False
-                except Exception as stop_error:
-                    self.logger.error(f"Error during monitor stop: {stop_error}")
-
-                # Stop the monitor thread if it exists
-                if self.monitor_thread and self.monitor_thread.is_alive():
-                    try:
-                        self.monitor_thread.join(timeout=5)  # Wait up to 5 seconds
-                    except Exception as thread_error:
-                        self.logger.error(f"Error stopping monitor thread: {thread_error}")
-                    self.monitor_thread = None
+            # Coerce every value to its MonitorConfig field type in one pass
+            unknown_keys = sorted(set(config_data) - _MONITOR_CONFIG_COERCERS.keys())
+            if unknown_keys:
+                return jsonify({'error': f"Unknown configuration keys: {', '.join(unknown_keys)}"}), 400
+            try:
+                config_data = {key: _MONITOR_CONFIG_COERCERS[key](value) for key, value in config_data.items()}
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': f'Invalid configuration value: {e}'}), 400
+
+            # Get current config from monitor
+            current_config = asdict(self.monitor.config)
+            self.logger.info(f"[CONFIG-API] 📋 Current configuration: {current_config}")
+
+            # Track changes for logging
+            changes_made = {}
+
+            # Update with new values
+            if 'epic_ids' in config_data:
+                # Handle epic_ids specially since they drive the monitored EPIC set
+                old_epic_ids = current_config.get('epic_ids', [])
+                new_epic_ids = config_data.pop('epic_ids')  # Removed from config_data to prevent double processing
+                current_config['epic_ids'] = new_epic_ids
+                changes_made['epic_ids'] = {'old': old_epic_ids, 'new': new_epic_ids}
+                self.logger.info(f"[CONFIG-API] 🔄 Epic IDs changed: {old_epic_ids} → {new_epic_ids}")
+            
+            # Log each configuration change
+            for key, new_value in config_data.items():
+                old_value = current_config.get(key)
+                if old_value != new_value:
+                    changes_made[key] = {'old': old_value, 'new': new_value}
+                    self.logger.info(f"[CONFIG-API] 🔄 {key} changed: {old_value} → {new_value}")
+                else:
+                    self.logger.info(f"[CONFIG-API] ➡️ {key} unchanged: {new_value}")
 
-                # Get final status
-                final_status = self.monitor.get_status()
-                final_status['is_running'] = False  # Ensure this is set
+            current_config.update(config_data)
+            
+            # Create new config object
+            self.logger.info("[CONFIG-API] 🔨 Creating new MonitorConfig object")
+            new_config = MonitorConfig(**current_config)
+            
+            # Save the updated config to file
+            self.logger.info("[CONFIG-API] 💾 Saving updated config to config/monitor_config.json")
+            if write_json_if_changed('config/monitor_config.json', current_config, indent=4):
+                self.logger.info("[CONFIG-API] ✅ Configuration file saved successfully")
+            else:
+                self.logger.info("[CONFIG-API] ➡️ Configuration file unchanged, write skipped")
+            
+            # Update monitor with new config
+            self.logger.info("[CONFIG-API] 🔄 Updating monitor with new configuration")
+            self.monitor.config = new_config
+            self._invalidate_config_snapshot()
+            
+            # If epic_ids were updated, refresh the monitored epics
+            if 'epic_ids' in changes_made:
+                self.logger.info("[CONFIG-API] 🎯 Refreshing monitored epics based on updated epic_ids")
+                current_epics = set(self.monitor.monitored_epics.keys())
+                new_epics = set(changes_made['epic_ids']['new'])
+                
+                # Remove epics that are no longer in the config
+                removed_epics = current_epics - new_epics
+                for epic_id in removed_epics:
+                    # pop() is atomic, so a concurrent removal cannot raise KeyError between check and delete
+                    if self.monitor.monitored_epics.pop(epic_id, None) is not None:
+                        self.logger.info(f"[CONFIG-API] ➖ Removed epic {epic_id} from monitoring")
+                if removed_epics:
+                    self.monitor.notify_state_change()
+                
+                # Add new epics
+                added_epics = new_epics - current_epics
+                for epic_id in added_epics:
+                    self.logger.info(f"[CONFIG-API] ➕ Adding epic {epic_id} to monitoring")
+                    self.monitor.add_epic(str(epic_id))
+
+            self.logger.info(f"[CONFIG-API] ✅ Configuration update completed successfully. Changes made: {len(changes_made)} items")
+            for key, change in changes_made.items():
+                self.logger.info(f"[CONFIG-API] 📋 Final {key}: {change['new']}")
+            
+            return jsonify({
+                'status': 'success',
+                'message': 'Configuration updated successfully',
+                'config': current_config,
+                'changes_made': changes_made
+            })
+        except Exception as e:
+            self.logger.error(f"[CONFIG-API] ❌ Error updating configuration: {str(e)}")
+            return jsonify({
+                'error': f'Failed to update configuration: {str(e)}'
+            }), 500
 
-                return jsonify({
-                    'success': True,
-                    'message': 'Monitor stopped successfully' if was_running else 'Monitor was already stopped',
-                    'status': final_status
-                })
+    # Monitor control endpoints
+    def start_monitor(self):
+        """Start the monitoring service"""
+        if not self.monitor:
+            return jsonify({
+                'success': False,
+                'error': 'Monitor not configured. Please restart the API with monitor configuration.'
+            }), 400
 
-            except Exception as e:
-                self.logger.error(f"Error stopping monitor: {str(e)}")
+        # Check-and-start under the lock so concurrent requests cannot spawn two supervisors
+        with self._monitor_lock:
+            if self.monitor.is_running or (self.monitor_thread and self.monitor_thread.is_alive()):
                 return jsonify({
                     'success': False,
-                    'error': f'Failed to stop monitor: {str(e)}'
-                }), 500
+                    'error': 'Monitor is already running'
+                }), 400
+
+            # Run the monitor under a supervisor thread so crashes are recorded and restarted
+            self.is_monitor_running = True
+            self.monitor_restart_count = 0
+            self.monitor_last_error = None
+            self._monitor_stop_event.clear()
+            self.monitor_thread = threading.Thread(target=self._supervise_monitor, name='monitor-supervisor', daemon=True)
+            self.monitor_thread.start()
+        self.monitor.notify_state_change()
+
+        return jsonify({
+            'success': True,
+            'message': 'Monitor started successfully',
+            'status': 'running'
+        })
+
+    def stop_monitor(self):
+        """Stop the monitoring service"""
+        if not self.monitor:
+            return jsonify({
+                'success': False,
+                'error': 'Monitor not configured'
+            }), 400
 
-        # Rest of the route handlers follow...
+        # Only the running flag is needed before stopping; the full status is built once afterwards
+        was_running = self.monitor.is_running
 
-        def shutdown_server():
-            """Shutdown function for the Flask server"""
-            # First try the development server shutdown function
-            success = False
-            
-            # Try the development server shutdown function
-            func = request.environ.get('werkzeug.server.shutdown')
-            if func is not None:
-                try:
-                    self.logger.info("Using Werkzeug shutdown function")
-                    func()
-                    success = True
-                except Exception as e:
-                    self.logger.warning(f"Werkzeug shutdown failed: {e}")
+        self._stop_monitor_worker()
 
-            # Try the production server shutdown if previous method failed
-            if not success:
-                try:
-                    from werkzeug.serving import shutdown as werkzeug_shutdown
-                    self.logger.info("Using Werkzeug production shutdown")
-                    werkzeug_shutdown()
-                    success = True
-                except Exception as e:
-                    self.logger.warning(f"Production server shutdown failed: {e}")
+        # Get final status
+        final_status = self.monitor.get_status()
+        final_status['is_running'] = False  # Ensure this is set
 
-            # Try process termination if previous methods failed
-            if not success:
-                try:
-                    import signal
-                    pid = os.getpid()
-                    self.logger.info(f"Sending SIGTERM to process {pid}")
-                    os.kill(pid, signal.SIGTERM)
-                    success = True
-                except Exception as e:
-                    self.logger.warning(f"SIGTERM failed: {e}")
+        return jsonify({
+            'success': True,
+            'message': 'Monitor stopped successfully' if was_running else 'Monitor was already stopped',
+            'status': final_status
+        })
 
-            # Try sys.exit() as a last resort
-            if not success:
-                try:
-                    import sys
-                    self.logger.info("Using sys.exit()")
-                    sys.exit(0)
-                    success = True
-                except Exception as e:
-                    self.logger.warning(f"sys.exit() failed: {e}")
-            
-            return success
-
-        @self.app.route('/api/shutdown', methods=['POST'])
-        def shutdown():
-            """Shutdown the API server"""
-            # Stop the monitor if it's running
-            if self.monitor and self.monitor.is_running:
-                self.logger.info("Stopping monitor service before shutdown...")
-                try:
-                    self.monitor.stop()
-                except Exception as e:
-                    self.logger.warning(f"Error stopping monitor during shutdown: {e}")
-            
-            # Save any pending state
-            if self.monitor:
-                try:
-                    self.monitor._save_processed_epics()
-                except Exception as e:
-                    self.logger.warning(f"Error saving state during shutdown: {e}")
-            
-            # Attempt server shutdown using multiple methods
-            self.logger.info("Initiating API server shutdown...")
-            
-            # 1. Try development server shutdown
-            func = request.environ.get('werkzeug.server.shutdown')
-            if func is not None:
+    def _stop_monitor_worker(self, timeout: float = 5.0):
+        """Stop the monitor loop and its supervisor thread so the supervisor does not restart it"""
+        with self._monitor_lock:
+            # Even if monitor reports not running, try to stop it to ensure cleanup
+            try:
+                self.is_monitor_running = False
+                self._monitor_stop_event.set()
+                self.monitor.stop()
+                self.monitor.notify_state_change()
+            except Exception as stop_error:
+                self.logger.error(f"Error during monitor stop: {stop_error}")
+
+            # Stop the monitor thread if it exists
+            if self.monitor_thread and self.monitor_thread.is_alive():
                 try:
-                    self.logger.info("Using Werkzeug shutdown function")
-                    func()
-                    return jsonify({
-                        'success': True,
-                        'message': 'Server shutdown initiated'
-                    })
-                except Exception as e:
-                    self.logger.warning(f"Development server shutdown failed: {e}")
+                    self.monitor_thread.join(timeout=timeout)
+                except Exception as thread_error:
+                    self.logger.error(f"Error stopping monitor thread: {thread_error}")
+                self.monitor_thread = None
+
+    def _shutdown_server(self):
+        """Shutdown function for the Flask server"""
+        # First try the development server shutdown function
+        success = False
+        
+        # Try the development server shutdown function
+        func = request.environ.get('werkzeug.server.shutdown')
+        if func is not None:
+            try:
+                self.logger.info("Using Werkzeug shutdown function")
+                func()
+                success = True
+            except Exception as e:
+                self.logger.warning(f"Werkzeug shutdown failed: {e}")
 
-            # 2. Try production server shutdown
+        # Try the production server shutdown if previous method failed
+        if not success:
             try:
                 from werkzeug.serving import shutdown as werkzeug_shutdown
                 self.logger.info("Using Werkzeug production shutdown")
                 werkzeug_shutdown()
-                return jsonify({
-                    'success': True,
-                    'message': 'Server shutdown initiated'
-                })
+                success = True
             except Exception as e:
                 self.logger.warning(f"Production server shutdown failed: {e}")
 
-            # 3. Try process termination
+        # Try process termination if previous methods failed
+        if not success:
             try:
-                import signal
                 pid = os.getpid()
                 self.logger.info(f"Sending SIGTERM to process {pid}")
                 os.kill(pid, signal.SIGTERM)
-                return jsonify({
-                    'success': True,
-                    'message': 'Server shutdown initiated via SIGTERM'
-                })
+                success = True
             except Exception as e:
                 self.logger.warning(f"SIGTERM failed: {e}")
 
-            # 4. Last resort: sys.exit()
+        # Try sys.exit() as a last resort
+        if not success:
             try:
-                import sys
                 self.logger.info("Using sys.exit()")
                 sys.exit(0)
+                success = True
             except Exception as e:
-                self.logger.error(f"All shutdown methods failed: {e}")
-                return jsonify({
-                    'success': False,
-                    'error': 'All shutdown methods failed'
-                }), 500
-
-        @self.app.route('/api/monitor/status')
-        def get_monitor_status():
-            """Get the current status of the monitor"""
+                self.logger.warning(f"sys.exit() failed: {e}")
+        
+        return success
+
+    def shutdown(self):
+        """Shutdown the API server"""
+        # Stop the monitor through its supervisor so it is not restarted while the server exits
+        if self.monitor and (self.monitor.is_running or self.is_monitor_running):
+            self.logger.info("Stopping monitor service before shutdown...")
+            self._stop_monitor_worker()
+        
+        # Save any pending state
+        if self.monitor:
             try:
-                if not self.monitor:
-                    return jsonify({
-                        'error': 'Monitor not configured'
-                    }), 500
-                
-                response_data = {
-                    'status': 'running' if self.is_monitor_running else 'stopped',
-                    'is_running': bool(self.is_monitor_running),  # Ensure boolean
-                    'epic_count': len(self.monitor.monitored_epics) if self.monitor.monitored_epics else 0,
-                    'last_check': self.monitor.last_check.isoformat() if hasattr(self.monitor, 'last_check') and self.monitor.last_check else None
-                }
-                self.logger.debug(f"Monitor status: {response_data}")  # Debug log
-                return jsonify(response_data)
+                self.monitor._save_processed_epics()
             except Exception as e:
-                self.logger.error(f"Error getting monitor status: {e}")
-                return jsonify({
-                    'error': f'Failed to get monitor status: {str(e)}'
-                }), 500
-
-        @self.app.route('/api/epics/<epic_id>', methods=['DELETE'])
-        def remove_epic(epic_id):
-            """Remove an EPIC from monitoring"""
+                self.logger.warning(f"Error saving state during shutdown: {e}")
+        
+        # Attempt server shutdown using multiple methods
+        self.logger.info("Initiating API server shutdown...")
+        
+        # 1. Try development server shutdown
+        func = request.environ.get('werkzeug.server.shutdown')
+        if func is not None:
             try:
-                if not self.monitor:
-                    return jsonify({'error': 'Monitor not running'}), 400
-
-                if epic_id not in self.monitor.monitored_epics:
-                    return jsonify({'error': f'EPIC {epic_id} not found in monitored EPICs'}), 404
+                self.logger.info("Using Werkzeug shutdown function")
+                func()
+                return jsonify({
+                    'success': True,
+                    'message': 'Server shutdown initiated'
+                })
+            except Exception as e:
+                self.logger.warning(f"Development server shutdown failed: {e}")
 
-                success = self.monitor.remove_epic(epic_id)
-                if success:
-                    return jsonify({'message': f'Successfully removed EPIC {epic_id} from monitoring'})
-                else:
-                    return jsonify({'error': f'Failed to remove EPIC {epic_id}'}), 500
+        # 2. Try production server shutdown
+        try:
+            from werkzeug.serving import shutdown as werkzeug_shutdown
+            self.logger.info("Using Werkzeug production shutdown")
+            werkzeug_shutdown()
+            return jsonify({
+                'success': True,
+                'message': 'Server shutdown initiated'
+            })
+        except Exception as e:
+            self.logger.warning(f"Production server shutdown failed: {e}")
+
+        # 3. Try process termination
+        try:
+            pid = os.getpid()
+            self.logger.info(f"Sending SIGTERM to process {pid}")
+            os.kill(pid, signal.SIGTERM)
+            return jsonify({
+                'success': True,
+                'message': 'Server shutdown initiated via SIGTERM'
+            })
+        except Exception as e:
+            self.logger.warning(f"SIGTERM failed: {e}")
+
+        # 4. Last resort: sys.exit()
+        try:
+            self.logger.info("Using sys.exit()")
+            sys.exit(0)
+        except Exception as e:
+            self.logger.error(f"All shutdown methods failed: {e}")
+            return jsonify({
+                'success': False,
+                'error': 'All shutdown methods failed'
+            }), 500
 
-            except Exception as e:
-                self.logger.error(f"Error removing EPIC {epic_id}: {str(e)}")
-                return jsonify({'error': f'Failed to remove EPIC: {str(e)}'}), 500
+    def get_monitor_status(self):
+        """Get the current status of the monitor"""
+        if not self.monitor:
+            return jsonify({
+                'error': 'Monitor not configured'
+            }), 500
+        
+        entry = self._get_cached_monitor_status_entry()
+        return self._conditional_json_response(entry[3], entry[4])
 
-        @self.app.route('/api/epics', methods=['GET'])
-        def get_epics():
-            """Get list of monitored EPICs with details"""
+    def stream_events(self):
+        """Push monitor status to the dashboard via Server-Sent Events"""
+        if not self.monitor:
+            return jsonify({
+                'error': 'Monitor not configured'
+            }), 500
+
+        def status_event() -> str:
+            return f"data: {self.app.json.dumps(self._get_monitor_status_data())}\n\n"
+
+        def event_stream():
+            # The slot is taken when streaming starts so an unstarted response cannot leak it
+            if not self._sse_slots.acquire(blocking=False):
+                # Every slot is taken: send one snapshot and let EventSource reconnect later, i.e. poll
+                yield f"retry: {SSE_OVERFLOW_RETRY_MS}\n\n"
+                yield status_event()
+                return
             try:
-                if not self.monitor:
-                    return jsonify([])
-
-                epics_data = []
-                for epic_id, epic_state in self.monitor.monitored_epics.items():
+                version = -1
+                deadline = time.monotonic() + SSE_STREAM_MAX_SECONDS
+                while time.monotonic() < deadline:
+                    new_version = self.monitor.wait_for_state_change(version, timeout=15)
+                    if new_version == version:
+                        # Comment line keeps proxies from closing an idle connection
+                        yield ": keep-alive\n\n"
+                        continue
+                    version = new_version
                     try:
-                        # Get EPIC details from Azure DevOps
-                        epic_info = self.agent.ado_client.get_work_item(int(epic_id))
-                        if epic_info:
-                            # Count stories for this EPIC
-                            story_count = 0
+                        yield status_event()
+                    except Exception as e:
+                        self.logger.error(f"Error building monitor status event: {e}")
+            finally:
+                self._sse_slots.release()
+
+        return Response(event_stream(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+
+    def remove_epic(self, epic_id):
+        """Remove an EPIC from monitoring"""
+        if not self.monitor:
+            return jsonify({'error': 'Monitor not running'}), 400
+
+        if epic_id not in self.monitor.monitored_epics:
+            return jsonify({'error': f'EPIC {epic_id} not found in monitored EPICs'}), 404
+
+        success = self.monitor.remove_epic(epic_id)
+        if success:
+            return jsonify({'message': f'Successfully removed EPIC {epic_id} from monitoring'})
+        else:
+            return jsonify({'error': f'Failed to remove EPIC {epic_id}'}), 500
+
+    def _get_epic_summary(self, epic_id: str, epic_state) -> Optional[Dict[str, Any]]:
+        """Fetch ADO details for one monitored EPIC and build its dashboard entry"""
+        try:
+            # Get EPIC details from Azure DevOps
+            epic_info = self.agent.ado_client.get_work_item(int(epic_id))
+            if not epic_info:
+                return None
+
+            # Count stories for this EPIC
+            story_count = 0
+            try:
+                stories = self.agent.ado_client.get_child_work_items(int(epic_id))
+                story_count = len(stories) if stories else 0
+            except:
+                pass
+
+            # Determine processing status based on epic state
+            processing_status = self._get_epic_processing_status(epic_state, story_count)
+
+            return {
+                'id': epic_id,
+                'title': epic_info.fields.get('System.Title', f'Epic {epic_id}'),
+                'state': epic_info.fields.get('System.State', 'Unknown'),
+                'processing_status': processing_status,  # New field for processing status
+                'story_count': story_count,
+                'last_changed': epic_state.last_check.isoformat() if epic_state.last_check else None,
+                'consecutive_errors': epic_state.consecutive_errors,
+                'has_snapshot': epic_state.last_snapshot is not None,
+                'stories_extracted': epic_state.stories_extracted if hasattr(epic_state, 'stories_extracted') else False
+            }
+        except Exception as e:
+            self.logger.error(f"Error fetching details for EPIC {epic_id}: {e}")
+            # Still include the EPIC even if we can't get details
+            processing_status = self._get_epic_processing_status(epic_state, 0)
+            return {
+                'id': epic_id,
+                'title': f'Epic {epic_id}',
+                'state': 'Unknown',
+                'processing_status': processing_status,  # New field for processing status
+                'story_count': 0,
+                'last_changed': epic_state.last_check.isoformat() if epic_state.last_check else None,
+                'consecutive_errors': epic_state.consecutive_errors,
+                'has_snapshot': epic_state.last_snapshot is not None,
+                'stories_extracted': False
+            }
+
+    def _get_epic_stats(self, epic_id: str, epic_state) -> Tuple[int, int, int]:
+        """Count (changed, stories, test cases) for one monitored EPIC"""
+        changed_epics = 0
+        total_stories = 0
+        total_test_cases = 0
+        try:
+            # Count as changed if it has been processed recently
+            if epic_state.last_check and epic_state.consecutive_errors == 0:
+                # Get stories for this EPIC
+                try:
+                    stories = self.agent.ado_client.get_child_work_items(int(epic_id))
+                    if stories:
+                        total_stories += len(stories)
+                        # Check if any of these stories have already been extracted
+                        if epic_state.stories_extracted if hasattr(epic_state, 'stories_extracted') else False:
+                            changed_epics += 1
+
+                        # Count test cases (child items of stories)
+                        for story in stories:
                             try:
-                                stories = self.agent.ado_client.get_child_work_items(int(epic_id))
-                                story_count = len(stories) if stories else 0
+                                test_cases = self.agent.ado_client.get_child_work_items(story['id'])
+                                if test_cases:
+                                    total_test_cases += len(test_cases)
                             except:
                                 pass
+                except Exception as e:
+                    self.logger.debug(f"Could not get stories for EPIC {epic_id}: {e}")
+        except Exception as e:
+            self.logger.debug(f"Error processing stats for EPIC {epic_id}: {e}")
+        return changed_epics, total_stories, total_test_cases
+
+    def _epic_data_cache_key(self) -> tuple:
+        """Identify the monitor state that cached EPIC payloads were built from"""
+        return (id(self.monitor), self.monitor.state_version)
+
+    def _get_cached_epic_entry(self, name: str, cache_key: tuple) -> Optional[tuple]:
+        """Return the cached (key, expiry, payload, body, etag) entry for name if it is still current"""
+        cached = self._epic_data_cache.get(name)
+        if cached is not None and cached[0] == cache_key and time.monotonic() < cached[1]:
+            return cached
+        return None
+
+    def _get_cached_epic_data(self, name: str, cache_key: tuple):
+        """Return the cached payload for name if it was built for cache_key and has not expired"""
+        cached = self._get_cached_epic_entry(name, cache_key)
+        return cached[2] if cached is not None else None
+
+    def _store_epic_data(self, name: str, cache_key: tuple, payload, body: Optional[str] = None) -> tuple:
+        """Cache a payload built from per-EPIC ADO lookups, with its JSON body, for EPIC_DATA_CACHE_TTL_SECONDS"""
+        if body is None:
+            body = self.app.json.dumps(payload)
+        entry = (cache_key, time.monotonic() + EPIC_DATA_CACHE_TTL_SECONDS, payload, body, _json_etag(body))
+        self._epic_data_cache[name] = entry
+        return entry
+
+    def get_epics(self):
+        """Get list of monitored EPICs with details"""
+        try:
+            if not self.monitor:
+                return jsonify([])
 
-                            # Determine processing status based on epic state
-                            processing_status = self._get_epic_processing_status(epic_state, story_count)
-                            
-                            epics_data.append({
-                                'id': epic_id,
-                                'title': epic_info.fields.get('System.Title', f'Epic {epic_id}'),
-                                'state': epic_info.fields.get('System.State', 'Unknown'),
-                                'processing_status': processing_status,  # New field for processing status
-                                'story_count': story_count,
-                                'last_changed': epic_state.last_check.isoformat() if epic_state.last_check else None,
-                                'consecutive_errors': epic_state.consecutive_errors,
-                                'has_snapshot': epic_state.last_snapshot is not None,
-                                'stories_extracted': epic_state.stories_extracted if hasattr(epic_state, 'stories_extracted') else False
-                            })
-                    except Exception as e:
-                        self.logger.error(f"Error fetching details for EPIC {epic_id}: {e}")
-                        # Still include the EPIC even if we can't get details
-                        processing_status = self._get_epic_processing_status(epic_state, 0)
-                        epics_data.append({
-                            'id': epic_id,
-                            'title': f'Epic {epic_id}',
-                            'state': 'Unknown',
-                            'processing_status': processing_status,  # New field for processing status
-                            'story_count': 0,
-                            'last_changed': epic_state.last_check.isoformat() if epic_state.last_check else None,
-                            'consecutive_errors': epic_state.consecutive_errors,
-                            'has_snapshot': epic_state.last_snapshot is not None,
-                            'stories_extracted': False
-                        })
-
-                return jsonify(epics_data)
-
-            except Exception as e:
-                self.logger.error(f"Error getting EPICs: {str(e)}")
-                return jsonify([])  # Return empty list instead of error to prevent UI issues
-        
-        @self.app.route('/api/stats', methods=['GET'])
-        def get_stats():
-            """Get statistics about monitored EPICs and stories"""
-            try:
-                if not self.monitor:
-                    return jsonify({
-                        'total_epics': 0,
-                        'changed_epics': 0,
-                        'total_stories': 0,
-                        'total_test_cases': 0
-                    })
+            cache_key = self._epic_data_cache_key()
+            cached = self._get_cached_epic_entry('epics', cache_key)
+            if cached is not None:
+                return self._conditional_json_response(cached[3], cached[4])
 
-                total_epics = len(self.monitor.monitored_epics)
-                changed_epics = 0
-                total_stories = 0
-                total_test_cases = 0
+            # Each EPIC costs several ADO round trips, so fetch them concurrently on the I/O pool
+            epic_items = list(self.monitor.monitored_epics.items())
+            summaries = self.io_pool.map(lambda item: self._get_epic_summary(*item), epic_items)
 
-                # Count changed EPICs and stories
-                for epic_id, epic_state in self.monitor.monitored_epics.items():
-                    try:
-                        # Count as changed if it has been processed recently
-                        if epic_state.last_check and epic_state.consecutive_errors == 0:
-                            # Get stories for this EPIC
-                            try:
-                                stories = self.agent.ado_client.get_child_work_items(int(epic_id))
-                                if stories:
-                                    total_stories += len(stories)
-                                    # Check if any of these stories have already been extracted
-                                    if epic_state.stories_extracted if hasattr(epic_state, 'stories_extracted') else False:
-                                        changed_epics += 1
-                                    
-                                    # Count test cases (child items of stories)
-                                    for story in stories:
-                                        try:
-                                            test_cases = self.agent.ado_client.get_child_work_items(story['id'])
-                                            if test_cases:
-                                                total_test_cases += len(test_cases)
-                                        except:
-                                            pass
-                            except Exception as e:
-                                self.logger.debug(f"Could not get stories for EPIC {epic_id}: {e}")
-                    except Exception as e:
-                        self.logger.debug(f"Error processing stats for EPIC {epic_id}: {e}")
-
-                return jsonify({
-                    'total_epics': total_epics,
-                    'changed_epics': changed_epics,
-                    'total_stories': total_stories,
-                    'total_test_cases': total_test_cases
-                })
-
-            except Exception as e:
-                self.logger.error(f"Error getting stats: {str(e)}")
+            def generate():
+                # Write each EPIC as soon as it is ready instead of buffering the whole array
+                epics_data = []
+                encoded = []
+                yield '['
+                separator = ''
+                for summary in summaries:
+                    if summary is not None:
+                        epics_data.append(summary)
+                        encoded.append(self.app.json.dumps(summary))
+                        yield separator + encoded[-1]
+                        separator = ','
+                yield ']'
+                # Keep the encoded array so cached polls are answered without re-serializing
+                self._store_epic_data('epics', cache_key, epics_data, '[' + ','.join(encoded) + ']')
+
+            return self._json_stream_response(generate())
+
+        except Exception as e:
+            self.logger.error(f"Error getting EPICs: {str(e)}")
+            return jsonify([])  # Return empty list instead of error to prevent UI issues
+    
+    def get_stats(self):
+        """Get statistics about monitored EPICs and stories"""
+        try:
+            if not self.monitor:
                 return jsonify({
                     'total_epics': 0,
                     'changed_epics': 0,
@@ -602,890 +1207,862 @@ class MonitorAPI:
                     'total_test_cases': 0
                 })
 
-        @self.app.route('/api/token-stats', methods=['GET'])
-        def get_token_stats():
-            """Get TOON token usage statistics"""
-            try:
-                from src.token_stats_manager import get_token_stats_manager
+            cache_key = self._epic_data_cache_key()
+            cached = self._get_cached_epic_entry('stats', cache_key)
+            if cached is not None:
+                return self._conditional_json_response(cached[3], cached[4])
+
+            epic_items = list(self.monitor.monitored_epics.items())
+            total_epics = len(epic_items)
+            changed_epics = 0
+            total_stories = 0
+            total_test_cases = 0
+
+            # Count changed EPICs and stories, querying ADO for all EPICs concurrently
+            for changed, stories, test_cases in self.io_pool.map(lambda item: self._get_epic_stats(*item), epic_items):
+                changed_epics += changed
+                total_stories += stories
+                total_test_cases += test_cases
+
+            stats = {
+                'total_epics': total_epics,
+                'changed_epics': changed_epics,
+                'total_stories': total_stories,
+                'total_test_cases': total_test_cases
+            }
+            entry = self._store_epic_data('stats', cache_key, stats)
+            return self._conditional_json_response(entry[3], entry[4])
+
+        except Exception as e:
+            self.logger.error(f"Error getting stats: {str(e)}")
+            return jsonify({
+                'total_epics': 0,
+                'changed_epics': 0,
+                'total_stories': 0,
+                'total_test_cases': 0
+            })
+
+    def get_token_stats(self):
+        """Get TOON token usage statistics"""
+        try:
+            token_manager = get_token_stats_manager()
+            stats = token_manager.get_stats()
+            
+            # Convert records to dict format
+            records_data = []
+            for record in token_manager.get_recent_records(limit=50):
+                records_data.append({
+                    'timestamp': record.timestamp.isoformat(),
+                    'story_id': record.story_id,
+                    'story_title': record.story_title,
+                    'estimated_tokens': record.estimated_tokens,
+                    'actual_tokens': record.actual_tokens,
+                    'tokens_saved': record.tokens_saved,
+                    'savings_percentage': round((record.tokens_saved / record.estimated_tokens * 100) if record.estimated_tokens > 0 else 0, 2),
+                    'toon_enabled': record.toon_enabled
+                })
+            
+            return jsonify({
+                'summary': token_manager.get_summary(),
+                'records': records_data
+            })
+        except Exception as e:
+            self.logger.error(f"Error getting token stats: {str(e)}")
+            return jsonify({
+                'summary': {
+                    'total_api_calls': 0,
+                    'total_estimated_tokens': 0,
+                    'total_actual_tokens': 0,
+                    'total_tokens_saved': 0,
+                    'average_savings_percentage': 0,
+                    'last_updated': None
+                },
+                'records': []
+            }), 200
+
+    def get_config(self):
+        """Get current configuration"""
+        if not self.monitor:
+            return jsonify({'error': 'Monitor not configured'}), 400
+
+        config_dict = dict(self._get_config_snapshot())
+        # Monitored EPICs change with every poll cycle, so they are never cached
+        config_dict['epic_ids'] = list(self.monitor.monitored_epics)
+        # A content hash stays valid across restarts and between workers, unlike in-process counters
+        body = self.app.json.dumps(config_dict)
+        return self._conditional_json_response(body, _json_etag(body))
+
+    def update_config_put(self):
+        """Update configuration using PUT method"""
+        self.logger.info("[CONFIG-PUT] 🔄 Configuration PUT request received")
+        try:
+            if not self.monitor:
+                self.logger.error("[CONFIG-PUT] ❌ Monitor not configured")
+                return jsonify({'error': 'Monitor not configured'}), 400
+
+            data = request.get_json(silent=True)
+            if not data:
+                self.logger.error("[CONFIG-PUT] ❌ No configuration data provided")
+                return jsonify({'error': 'No configuration data provided'}), 400
+
+            self.logger.info(f"[CONFIG-PUT] 📥 Received {len(data)} configuration parameters")
+            # Log each parameter (hide sensitive values)
+            for key, value in data.items():
+                if key in _SENSITIVE_CONFIG_KEYS:
+                    self.logger.info(f"[CONFIG-PUT] 📋 {key}: ***hidden***")
+                else:
+                    self.logger.info(f"[CONFIG-PUT] 📋 {key}: {value}")
+
+            # Update monitor configuration
+            config_changes = {}
+            if 'check_interval_minutes' in data:
+                old_interval = self.monitor.config.poll_interval_seconds
+                new_interval = data['check_interval_minutes'] * 60
+                self.monitor.config.poll_interval_seconds = new_interval
+                config_changes['poll_interval_seconds'] = {'old': old_interval, 'new': new_interval}
+                self.logger.info(f"[CONFIG-PUT] 🔄 Poll interval changed: {old_interval}s → {new_interval}s")
+
+            for field_name, caster in _MONITOR_CONFIG_FIELDS:
+                if field_name in data:
+                    old_value = getattr(self.monitor.config, field_name)
+                    new_value = caster(data[field_name])
+                    setattr(self.monitor.config, field_name, new_value)
+                    config_changes[field_name] = {'old': old_value, 'new': new_value}
+                    self.logger.info(f"[CONFIG-PUT] 🔄 {field_name} changed: {old_value} → {new_value}")
+            self._invalidate_config_snapshot()
+
+            # Handle EPIC IDs
+            if 'epic_ids' in data and isinstance(data['epic_ids'], list):
+                self.logger.info("[CONFIG-PUT] 🎯 Processing epic IDs update")
+                # Clear current EPICs and add new ones
+                current_epics = set(self.monitor.monitored_epics.keys())
+                new_epics = set(str(eid) for eid in data['epic_ids'])
                 
-                token_manager = get_token_stats_manager()
-                stats = token_manager.get_stats()
+                self.logger.info(f"[CONFIG-PUT] 📊 Current epics: {current_epics}")
+                self.logger.info(f"[CONFIG-PUT] 📊 New epics: {new_epics}")
                 
-                # Convert records to dict format
-                records_data = []
-                for record in token_manager.get_recent_records(limit=50):
-                    records_data.append({
-                        'timestamp': record.timestamp.isoformat(),
-                        'story_id': record.story_id,
-                        'story_title': record.story_title,
-                        'estimated_tokens': record.estimated_tokens,
-                        'actual_tokens': record.actual_tokens,
-                        'tokens_saved': record.tokens_saved,
-                        'savings_percentage': round((record.tokens_saved / record.estimated_tokens * 100) if record.estimated_tokens > 0 else 0, 2),
-                        'toon_enabled': record.toon_enabled
-                    })
+                # Remove EPICs not in the new list
+                removed_epics = current_epics - new_epics
+                for epic_id in removed_epics:
+                    # pop() is atomic, so a concurrent removal cannot raise KeyError between check and delete
+                    if self.monitor.monitored_epics.pop(epic_id, None) is not None:
+                        self.logger.info(f"[CONFIG-PUT] ➖ Removed epic {epic_id} from monitoring")
+                if removed_epics:
+                    self.monitor.notify_state_change()
                 
-                return jsonify({
-                    'summary': token_manager.get_summary(),
-                    'records': records_data
-                })
-            except Exception as e:
-                self.logger.error(f"Error getting token stats: {str(e)}")
-                return jsonify({
-                    'summary': {
-                        'total_api_calls': 0,
-                        'total_estimated_tokens': 0,
-                        'total_actual_tokens': 0,
-                        'total_tokens_saved': 0,
-                        'average_savings_percentage': 0,
-                        'last_updated': None
-                    },
-                    'records': []
-                }), 200
-
-        @self.app.route('/api/config', methods=['GET'])
-        def get_config():
-            """Get current configuration"""
-            try:
-                if not self.monitor:
-                    return jsonify({'error': 'Monitor not configured'}), 400
-
-                config_dict = {
-                    'platform_type': self.settings.PLATFORM_TYPE,
-                    'ado_organization': self.settings.ADO_ORGANIZATION,
-                    'ado_project': self.settings.ADO_PROJECT,
-                    'ado_pat': '***hidden***',  # Don't expose the actual PAT
-                    'jira_base_url': getattr(self.settings, 'JIRA_BASE_URL', ''),
-                    'jira_username': getattr(self.settings, 'JIRA_USERNAME', ''),
-                    'jira_token': '***hidden***',  # Don't expose the actual token
-                    'jira_project_key': getattr(self.settings, 'JIRA_PROJECT_KEY', ''),
-                    'ai_service_provider': getattr(self.settings, 'AI_SERVICE_PROVIDER', 'OPENAI'),
-                    'openai_api_key': '***hidden***',  # Don't expose the actual API key
-                    'openai_model': self.settings.OPENAI_MODEL,
-                    'azure_openai_endpoint': getattr(self.settings, 'AZURE_OPENAI_ENDPOINT', ''),
-                    'azure_openai_api_key': '***hidden***',  # Don't expose the actual API key
-                    'azure_openai_deployment_name': getattr(self.settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', ''),
-                    'azure_openai_api_version': getattr(self.settings, 'AZURE_OPENAI_API_VERSION', '2024-02-15-preview'),
-                    'github_token': '***hidden***',  # Don't expose the actual token
-                    'github_model': getattr(self.settings, 'GITHUB_MODEL', 'gpt-4o-mini'),
-                    'openai_max_retries': self.settings.OPENAI_MAX_RETRIES,
-                    'openai_retry_delay': self.settings.OPENAI_RETRY_DELAY,
-                    'requirement_type': self.settings.REQUIREMENT_TYPE,
-                    'user_story_type': self.settings.USER_STORY_TYPE,
-                    'story_extraction_type': self.settings.STORY_EXTRACTION_TYPE,
-                    'test_case_extraction_type': self.settings.TEST_CASE_EXTRACTION_TYPE,
-                    'auto_test_case_extraction': self.settings.AUTO_TEST_CASE_EXTRACTION,
-                    'check_interval_minutes': self.monitor.config.poll_interval_seconds // 60 if self.monitor.config.poll_interval_seconds else 5,
-                    'epic_ids': list(self.monitor.monitored_epics.keys()) if self.monitor.monitored_epics else [],
-                    'auto_sync': self.monitor.config.auto_sync if hasattr(self.monitor.config, 'auto_sync') else True,
-                    'auto_extract_new_epics': self.monitor.config.auto_extract_new_epics if hasattr(self.monitor.config, 'auto_extract_new_epics') else True,
-                    'log_level': getattr(self.monitor.config, 'log_level', 'INFO'),
-                    'max_concurrent_syncs': getattr(self.monitor.config, 'max_concurrent_syncs', 3),
-                    'retry_attempts': getattr(self.monitor.config, 'retry_attempts', 3),
-                    'retry_delay_seconds': getattr(self.monitor.config, 'retry_delay_seconds', 60)
-                }
-
-                return jsonify(config_dict)
-
-            except Exception as e:
-                self.logger.error(f"Error getting config: {str(e)}")
-                return jsonify({'error': f'Failed to get configuration: {str(e)}'}), 500
+                # Add new EPICs
+                added_epics = new_epics - current_epics
+                for epic_id in added_epics:
+                    self.logger.info(f"[CONFIG-PUT] ➕ Adding epic {epic_id} to monitoring")
+                    self.monitor.add_epic(str(epic_id))
+                
+                config_changes['epic_ids'] = {'old': list(current_epics), 'new': list(new_epics)}
 
-        @self.app.route('/api/config', methods=['PUT'])
-        def update_config_put():
-            """Update configuration using PUT method"""
-            self.logger.info("[CONFIG-PUT] 🔄 Configuration PUT request received")
+            # Save configuration to file
             try:
-                if not self.monitor:
-                    self.logger.error("[CONFIG-PUT] ❌ Monitor not configured")
-                    return jsonify({'error': 'Monitor not configured'}), 400
-
-                data = request.get_json()
-                if not data:
-                    self.logger.error("[CONFIG-PUT] ❌ No configuration data provided")
-                    return jsonify({'error': 'No configuration data provided'}), 400
-
-                self.logger.info(f"[CONFIG-PUT] 📥 Received {len(data)} configuration parameters")
-                # Log each parameter (hide sensitive values)
-                for key, value in data.items():
-                    if key in ['ado_pat', 'openai_api_key', 'azure_openai_api_key', 'jira_token', 'github_token']:
-                        self.logger.info(f"[CONFIG-PUT] 📋 {key}: ***hidden***")
+                self.logger.info(f"[CONFIG-PUT] 💾 Starting environment file updates for {len(data)} parameters")
+                
+                # Log AI service provider changes
+                if 'ai_service_provider' in data:
+                    current_provider = getattr(self.settings, 'AI_SERVICE_PROVIDER', 'OPENAI')
+                    new_provider = data['ai_service_provider']
+                    if current_provider != new_provider:
+                        self.logger.info(f"[CONFIG-PUT] 🔄 AI Service Provider changing: '{current_provider}' → '{new_provider}'")
                     else:
-                        self.logger.info(f"[CONFIG-PUT] 📋 {key}: {value}")
-
-                # Update monitor configuration
-                config_changes = {}
-                if 'check_interval_minutes' in data:
-                    old_interval = self.monitor.config.poll_interval_seconds
-                    new_interval = data['check_interval_minutes'] * 60
-                    self.monitor.config.poll_interval_seconds = new_interval
-                    config_changes['poll_interval_seconds'] = {'old': old_interval, 'new': new_interval}
-                    self.logger.info(f"[CONFIG-PUT] 🔄 Poll interval changed: {old_interval}s → {new_interval}s")
-
-                if 'auto_sync' in data:
-                    old_auto_sync = getattr(self.monitor.config, 'auto_sync', True)
-                    new_auto_sync = bool(data['auto_sync'])
-                    self.monitor.config.auto_sync = new_auto_sync
-                    config_changes['auto_sync'] = {'old': old_auto_sync, 'new': new_auto_sync}
-                    self.logger.info(f"[CONFIG-PUT] 🔄 Auto sync changed: {old_auto_sync} → {new_auto_sync}")
-
-                if 'auto_extract_new_epics' in data:
-                    old_auto_extract = getattr(self.monitor.config, 'auto_extract_new_epics', True)
-                    new_auto_extract = bool(data['auto_extract_new_epics'])
-                    self.monitor.config.auto_extract_new_epics = new_auto_extract
-                    config_changes['auto_extract_new_epics'] = {'old': old_auto_extract, 'new': new_auto_extract}
-                    self.logger.info(f"[CONFIG-PUT] 🔄 Auto extract new epics changed: {old_auto_extract} → {new_auto_extract}")
-
-                # Handle EPIC IDs
-                if 'epic_ids' in data and isinstance(data['epic_ids'], list):
-                    self.logger.info("[CONFIG-PUT] 🎯 Processing epic IDs update")
-                    # Clear current EPICs and add new ones
-                    current_epics = set(self.monitor.monitored_epics.keys())
-                    new_epics = set(str(eid) for eid in data['epic_ids'])
-                    
-                    self.logger.info(f"[CONFIG-PUT] 📊 Current epics: {current_epics}")
-                    self.logger.info(f"[CONFIG-PUT] 📊 New epics: {new_epics}")
-                    
-                    # Remove EPICs not in the new list
-                    removed_epics = current_epics - new_epics
-                    for epic_id in removed_epics:
-                        if epic_id in self.monitor.monitored_epics:
-                            self.logger.info(f"[CONFIG-PUT] ➖ Removing epic {epic_id} from monitoring")
-                            del self.monitor.monitored_epics[epic_id]
-                    
-                    # Add new EPICs
-                    added_epics = new_epics - current_epics
-                    for epic_id in added_epics:
-                        self.logger.info(f"[CONFIG-PUT] ➕ Adding epic {epic_id} to monitoring")
-                        self.monitor.add_epic(str(epic_id))
-                    
-                    config_changes['epic_ids'] = {'old': list(current_epics), 'new': list(new_epics)}
+                        self.logger.info(f"[CONFIG-PUT] ✅ AI Service Provider unchanged: '{new_provider}'")
 
-                # Save configuration to file
-                try:
-                    self.logger.info(f"[CONFIG-PUT] 💾 Starting environment file updates for {len(data)} parameters")
-                    
-                    # Dictionary mapping config keys to their environment variable names
-                    config_mapping = {
-                        'ado_organization': 'ADO_ORGANIZATION',
-                        'ado_project': 'ADO_PROJECT',
-                        'ado_pat': 'ADO_PAT',
-                        'jira_base_url': 'JIRA_BASE_URL',
-                        'jira_username': 'JIRA_USERNAME',
-                        'jira_token': 'JIRA_TOKEN',
-                        'jira_project_key': 'JIRA_PROJECT_KEY',
-                        'ai_service_provider': 'AI_SERVICE_PROVIDER',
-                        'openai_api_key': 'OPENAI_API_KEY',
-                        'openai_model': 'OPENAI_MODEL',
-                        'azure_openai_endpoint': 'AZURE_OPENAI_ENDPOINT',
-                        'azure_openai_api_key': 'AZURE_OPENAI_API_KEY',
-                        'azure_openai_deployment_name': 'AZURE_OPENAI_DEPLOYMENT_NAME',
-                        'azure_openai_api_version': 'AZURE_OPENAI_API_VERSION',
-                        'github_token': 'GITHUB_TOKEN',
-                        'github_model': 'GITHUB_MODEL',
-                        'story_extraction_type': 'ADO_STORY_EXTRACTION_TYPE',
-                        'test_case_extraction_type': 'ADO_TEST_CASE_EXTRACTION_TYPE',
-                        'auto_test_case_extraction': 'ADO_AUTO_TEST_CASE_EXTRACTION',
-                        'openai_max_retries': 'OPENAI_MAX_RETRIES',
-                        'openai_retry_delay': 'OPENAI_RETRY_DELAY',
-                        'requirement_type': 'ADO_REQUIREMENT_TYPE',
-                        'user_story_type': 'ADO_USER_STORY_TYPE'
-                    }
+                # Track environment variable updates
+                env_updates = {}
+                env_file_updates = {}
 
-                    # Log AI service provider changes
-                    if 'ai_service_provider' in data:
-                        current_provider = getattr(self.settings, 'AI_SERVICE_PROVIDER', 'OPENAI')
-                        new_provider = data['ai_service_provider']
-                        if current_provider != new_provider:
-                            self.logger.info(f"[CONFIG-PUT] 🔄 AI Service Provider changing: '{current_provider}' → '{new_provider}'")
-                        else:
-                            self.logger.info(f"[CONFIG-PUT] ✅ AI Service Provider unchanged: '{new_provider}'")
-
-                    # Track environment variable updates
-                    env_updates = {}
-
-                    # Process each config setting
-                    for config_key, env_var in config_mapping.items():
-                        if config_key in data:
-                            value = data[config_key]
-                            
-                            # Get current value for comparison
-                            current_value = getattr(self.settings, env_var.replace('ADO_', '').replace('OPENAI_', '').replace('AZURE_OPENAI_', '').replace('GITHUB_', ''), None)
-                            
-                            # Log configuration updates (with proper masking for sensitive data)
-                            if config_key in ['ado_pat', 'openai_api_key', 'azure_openai_api_key', 'jira_token', 'github_token']:
-                                if value:
-                                    self.logger.info(f"[CONFIG-PUT] 🔒 Updating {config_key} (env: {env_var}) = ***hidden***")
-                                else:
-                                    self.logger.info(f"[CONFIG-PUT] ⚠️ Skipping empty sensitive value for {config_key}")
-                                    continue
+                # Process each config setting
+                for config_key, env_var in _ENV_CONFIG_MAPPING.items():
+                    if config_key in data:
+                        value = data[config_key]
+                        
+                        # Get current value for comparison
+                        current_value = getattr(self.settings, env_var.replace('ADO_', '').replace('OPENAI_', '').replace('AZURE_OPENAI_', '').replace('GITHUB_', ''), None)
+                        
+                        # Log configuration updates (with proper masking for sensitive data)
+                        if config_key in _SENSITIVE_CONFIG_KEYS:
+                            if value:
+                                self.logger.info(f"[CONFIG-PUT] 🔒 Updating {config_key} (env: {env_var}) = ***hidden***")
                             else:
-                                self.logger.info(f"[CONFIG-PUT] 🔄 Updating {config_key} (env: {env_var}): '{current_value}' → '{value}'")
-                            
-                            # Handle boolean values
-                            if config_key == 'auto_test_case_extraction':
-                                old_value = value
-                                value = str(str(value).lower() == 'true').lower()
-                                self.logger.info(f"[CONFIG-PUT] 🔢 Boolean conversion for {config_key}: {old_value} → {value}")
-                            # Handle numeric values
-                            elif config_key in ['openai_max_retries', 'openai_retry_delay']:
-                                old_value = value
-                                value = str(value)
-                                self.logger.info(f"[CONFIG-PUT] 🔢 String conversion for {config_key}: {old_value} → {value}")
-                            # Skip empty sensitive values to prevent accidental clearing
-                            elif config_key in ['ado_pat', 'openai_api_key', 'azure_openai_api_key', 'jira_token', 'github_token'] and not value:
-                                self.logger.warning(f"[CONFIG-PUT] ⚠️ Skipping empty sensitive value for {config_key}")
+                                self.logger.info(f"[CONFIG-PUT] ⚠️ Skipping empty sensitive value for {config_key}")
                                 continue
-                            else:
-                                value = str(value)
-
-                            # Track the update
-                            env_updates[env_var] = {'old': current_value, 'new': value}
-
-                            # Update .env file
-                            self.logger.info(f"[CONFIG-PUT] 📝 Updating .env file: {env_var}={value if config_key not in ['ado_pat', 'openai_api_key', 'azure_openai_api_key', 'jira_token'] else '***hidden***'}")
-                            self._update_env_file(env_var, value)
-                            
-                            # Update environment variable
-                            os.environ[env_var] = value
-                            self.logger.info(f"[CONFIG-PUT] 🌐 Environment variable updated: {env_var}")
-
-                    self.logger.info(f"[CONFIG-PUT] ✅ Completed {len(env_updates)} environment variable updates")
-
-                    # Reload all settings
-                    self.logger.info("[CONFIG-PUT] 🔄 Reloading Settings configuration...")
-                    Settings.reload_config()
-                    self.logger.info("[CONFIG-PUT] ✅ Settings configuration reloaded")
-                    
-                    # Log the current AI service configuration after reload
-                    current_ai_provider = getattr(Settings, 'AI_SERVICE_PROVIDER', 'OPENAI')
-                    self.logger.info(f"[CONFIG-PUT] 🤖 Active AI Service Provider: '{current_ai_provider}'")
-                    
-                    if current_ai_provider == 'AZURE_OPENAI':
-                        endpoint = getattr(Settings, 'AZURE_OPENAI_ENDPOINT', 'Not configured')
-                        deployment = getattr(Settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', 'Not configured')
-                        api_version = getattr(Settings, 'AZURE_OPENAI_API_VERSION', 'Not configured')
-                        self.logger.info(f"[CONFIG-PUT] 🔷 Azure OpenAI Endpoint: {endpoint}")
-                        self.logger.info(f"[CONFIG-PUT] 🔷 Azure OpenAI Deployment: {deployment}")
-                        self.logger.info(f"[CONFIG-PUT] 🔷 Azure OpenAI API Version: {api_version}")
-                    elif current_ai_provider == 'GITHUB':
-                        github_model = getattr(Settings, 'GITHUB_MODEL', 'Not configured')
-                        self.logger.info(f"[CONFIG-PUT] 🔶 GitHub Model: {github_model}")
-                    else:
-                        openai_model = getattr(Settings, 'OPENAI_MODEL', 'Not configured')
-                        self.logger.info(f"[CONFIG-PUT] 🔶 OpenAI Model: {openai_model}")
-                    
-                    # Log key application settings
-                    self.logger.info(f"[CONFIG-PUT] 📋 Story Extraction Type: {Settings.STORY_EXTRACTION_TYPE}")
-                    self.logger.info(f"[CONFIG-PUT] 🧪 Test Case Extraction Type: {Settings.TEST_CASE_EXTRACTION_TYPE}")
-                    self.logger.info(f"[CONFIG-PUT] ⚙️ Auto Test Case Extraction: {Settings.AUTO_TEST_CASE_EXTRACTION}")
-                    
-                    config_data = {
-                        'ado_organization': Settings.ADO_ORGANIZATION,
-                        'ado_project': Settings.ADO_PROJECT,
-                        'ado_pat': '***hidden***',  # Don't expose the actual PAT
-                        'poll_interval_seconds': self.monitor.config.poll_interval_seconds,
-                        'epic_ids': data.get('epic_ids', []),
-                        'auto_sync': self.monitor.config.auto_sync,
-                        'story_extraction_type': Settings.STORY_EXTRACTION_TYPE,
-                        'test_case_extraction_type': Settings.TEST_CASE_EXTRACTION_TYPE,
-                        'auto_test_case_extraction': Settings.AUTO_TEST_CASE_EXTRACTION,
-                        'requirement_type': Settings.REQUIREMENT_TYPE,
-                        'user_story_type': Settings.USER_STORY_TYPE,
-                        'openai_model': Settings.OPENAI_MODEL,
-                        'openai_max_retries': Settings.OPENAI_MAX_RETRIES,
-                        'openai_retry_delay': Settings.OPENAI_RETRY_DELAY,
-                        'auto_extract_new_epics': getattr(self.monitor.config, 'auto_extract_new_epics', True),
-                        'log_level': getattr(self.monitor.config, 'log_level', 'INFO'),
-                        'max_concurrent_syncs': getattr(self.monitor.config, 'max_concurrent_syncs', 3),
-                        'retry_attempts': getattr(self.monitor.config, 'retry_attempts', 3),
-                        'retry_delay_seconds': getattr(self.monitor.config, 'retry_delay_seconds', 60)
-                    }
-                    
-                    self.logger.info("[CONFIG-PUT] 💾 Saving configuration to config/monitor_config.json")
-                    with open('config/monitor_config.json', 'w') as f:
-                        json.dump(config_data, f, indent=2)
-                    self.logger.info("[CONFIG-PUT] ✅ Configuration file saved successfully")
-                    
-                    self.logger.info("[CONFIG-PUT] ✅ Configuration update completed successfully")
-                except Exception as e:
-                    self.logger.error(f"[CONFIG-PUT] ❌ Failed to save configuration: {e}")
-                    return jsonify({'error': f'Failed to save configuration: {str(e)}'}), 500
-
-                self.logger.info(f"[CONFIG-PUT] 📊 Configuration update summary:")
-                self.logger.info(f"[CONFIG-PUT] 📊 - Monitor config changes: {len(config_changes)}")
-                if 'env_updates' in locals():
-                    self.logger.info(f"[CONFIG-PUT] 📊 - Environment updates: {len(env_updates)}")
-                    for env_var, change in env_updates.items():
-                        if env_var in ['ADO_PAT', 'OPENAI_API_KEY', 'AZURE_OPENAI_API_KEY', 'JIRA_TOKEN', 'GITHUB_TOKEN']:
-                            self.logger.info(f"[CONFIG-PUT] 📊   {env_var}: ***hidden***")
                         else:
-                            self.logger.info(f"[CONFIG-PUT] 📊   {env_var}: {change['old']} → {change['new']}")
-
-                # Check if running in Docker and trigger restart
-                import signal
-                import time
-                
-                is_docker = os.path.exists('/.dockerenv') or os.environ.get('RUNNING_IN_DOCKER', 'false').lower() == 'true'
-                
-                if is_docker:
-                    self.logger.info("[CONFIG-PUT] 🐳 Detected running in Docker container")
-                    self.logger.info("[CONFIG-PUT] 🔄 Triggering container restart to apply configuration changes...")
-                    
-                    try:
-                        # Create a restart marker file that can be monitored by docker-compose
-                        restart_marker = '/tmp/restart_required'
-                        with open(restart_marker, 'w') as f:
-                            f.write('restart')
-                        
-                        # Schedule graceful restart - give Flask time to send response
-                        def delayed_restart():
-                            time.sleep(2)
-                            os.kill(os.getpid(), signal.SIGTERM)
+                            self.logger.info(f"[CONFIG-PUT] 🔄 Updating {config_key} (env: {env_var}): '{current_value}' → '{value}'")
                         
-                        restart_thread = threading.Thread(target=delayed_restart)
-                        restart_thread.daemon = True
-                        restart_thread.start()
-                        
-                        self.logger.info("[CONFIG-PUT] ✅ Restart scheduled - container will restart in 2 seconds")
-                        
-                        return jsonify({
-                            'success': True,
-                            'message': 'Configuration updated successfully. Docker container will restart to apply changes.',
-                            'docker_restart': True,
-                            'changes_made': {**config_changes, **({f"env_{k}": v for k, v in env_updates.items()} if 'env_updates' in locals() else {})}
-                        })
-                    except Exception as restart_error:
-                        self.logger.warning(f"[CONFIG-PUT] ⚠️ Failed to trigger Docker restart: {restart_error}")
-                        return jsonify({
-                            'success': True,
-                            'message': 'Configuration updated successfully (restart failed - please restart manually)',
-                            'changes_made': {**config_changes, **({f"env_{k}": v for k, v in env_updates.items()} if 'env_updates' in locals() else {})}
-                        })
-                else:
-                    self.logger.info("[CONFIG-PUT] 💻 Running locally (not in Docker) - no restart needed")
-                    
-                    return jsonify({
-                        'success': True,
-                        'message': 'Configuration updated successfully',
-                        'changes_made': {**config_changes, **({f"env_{k}": v for k, v in env_updates.items()} if 'env_updates' in locals() else {})}
-                    })
-
-            except Exception as e:
-                self.logger.error(f"Error updating config: {str(e)}")
-                return jsonify({'error': f'Failed to update configuration: {str(e)}'}), 500
-
-        @self.app.route('/api/platform/switch', methods=['POST'])
-        def switch_platform():
-            """Switch between ADO and JIRA platforms"""
-            try:
-                data = request.get_json()
-                if not data or 'platform_type' not in data:
-                    return jsonify({'error': 'Platform type is required'}), 400
+                        # Handle boolean values
+                        if config_key == 'auto_test_case_extraction':
+                            old_value = value
+                            value = str(str(value).lower() == 'true').lower()
+                            self.logger.info(f"[CONFIG-PUT] 🔢 Boolean conversion for {config_key}: {old_value} → {value}")
+                        # Handle numeric values
+                        elif config_key in _NUMERIC_ENV_CONFIG_KEYS:
+                            old_value = value
+                            value = str(value)
+                            self.logger.info(f"[CONFIG-PUT] 🔢 String conversion for {config_key}: {old_value} → {value}")
+                        # Skip empty sensitive values to prevent accidental clearing
+                        elif config_key in _SENSITIVE_CONFIG_KEYS and not value:
+                            self.logger.warning(f"[CONFIG-PUT] ⚠️ Skipping empty sensitive value for {config_key}")
+                            continue
+                        else:
+                            value = str(value)
 
-                platform_type = data['platform_type'].upper()
-                if platform_type not in ['ADO', 'JIRA']:
-                    return jsonify({'error': 'Platform type must be ADO or JIRA'}), 400
+                        # Track the update
+                        env_updates[env_var] = {'old': current_value, 'new': value}
 
-                # Update .env file
-                self._update_env_file('PLATFORM_TYPE', platform_type)
+                        # Update .env file
+                        self.logger.info(f"[CONFIG-PUT] 📝 Updating .env file: {env_var}={value if config_key not in _SENSITIVE_CONFIG_KEYS else '***hidden***'}")
+                        env_file_updates[env_var] = value
+                        
+                        # Update environment variable
+                        os.environ[env_var] = value
+                        self.logger.info(f"[CONFIG-PUT] 🌐 Environment variable updated: {env_var}")
+
+                # Write every changed key to the .env files in one pass
+                self._update_env_file(env_file_updates)
+                self.logger.info(f"[CONFIG-PUT] ✅ Completed {len(env_updates)} environment variable updates")
+
+                # Reload all settings
+                self.logger.info("[CONFIG-PUT] 🔄 Reloading Settings configuration...")
+                self._reload_settings()
+                self.logger.info("[CONFIG-PUT] ✅ Settings configuration reloaded")
                 
-                # Reload settings
-                Settings.reload_config()
+                # Log the current AI service configuration after reload
+                current_ai_provider = getattr(Settings, 'AI_SERVICE_PROVIDER', 'OPENAI')
+                self.logger.info(f"[CONFIG-PUT] 🤖 Active AI Service Provider: '{current_ai_provider}'")
                 
-                self.logger.info(f"Platform switched to: {platform_type}")
+                if current_ai_provider == 'AZURE_OPENAI':
+                    endpoint = getattr(Settings, 'AZURE_OPENAI_ENDPOINT', 'Not configured')
+                    deployment = getattr(Settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', 'Not configured')
+                    api_version = getattr(Settings, 'AZURE_OPENAI_API_VERSION', 'Not configured')
+                    self.logger.info(f"[CONFIG-PUT] 🔷 Azure OpenAI Endpoint: {endpoint}")
+                    self.logger.info(f"[CONFIG-PUT] 🔷 Azure OpenAI Deployment: {deployment}")
+                    self.logger.info(f"[CONFIG-PUT] 🔷 Azure OpenAI API Version: {api_version}")
+                elif current_ai_provider == 'GITHUB':
+                    github_model = getattr(Settings, 'GITHUB_MODEL', 'Not configured')
+                    self.logger.info(f"[CONFIG-PUT] 🔶 GitHub Model: {github_model}")
+                else:
+                    openai_model = getattr(Settings, 'OPENAI_MODEL', 'Not configured')
+                    self.logger.info(f"[CONFIG-PUT] 🔶 OpenAI Model: {openai_model}")
                 
-                return jsonify({
-                    'success': True,
-                    'message': f'Platform switched to {platform_type}',
-                    'platform_type': platform_type,
+                # Log key application settings
+                self.logger.info(f"[CONFIG-PUT] 📋 Story Extraction Type: {Settings.STORY_EXTRACTION_TYPE}")
+                self.logger.info(f"[CONFIG-PUT] 🧪 Test Case Extraction Type: {Settings.TEST_CASE_EXTRACTION_TYPE}")
+                self.logger.info(f"[CONFIG-PUT] ⚙️ Auto Test Case Extraction: {Settings.AUTO_TEST_CASE_EXTRACTION}")
+                
+                # Persist the full monitor config, overlaid with the Settings-backed values
+                config_data = asdict(self.monitor.config)
+                config_data.update({
+                    'ado_organization': Settings.ADO_ORGANIZATION,
+                    'ado_project': Settings.ADO_PROJECT,
+                    'ado_pat': '***hidden***',  # Don't expose the actual PAT
+                    'epic_ids': data.get('epic_ids', config_data.get('epic_ids') or []),
+                    'story_extraction_type': Settings.STORY_EXTRACTION_TYPE,
+                    'test_case_extraction_type': Settings.TEST_CASE_EXTRACTION_TYPE,
+                    'auto_test_case_extraction': Settings.AUTO_TEST_CASE_EXTRACTION,
                     'requirement_type': Settings.REQUIREMENT_TYPE,
                     'user_story_type': Settings.USER_STORY_TYPE,
-                    'story_extraction_type': Settings.STORY_EXTRACTION_TYPE,
-                    'test_case_extraction_type': Settings.TEST_CASE_EXTRACTION_TYPE
+                    'openai_model': Settings.OPENAI_MODEL,
+                    'openai_max_retries': Settings.OPENAI_MAX_RETRIES,
+                    'openai_retry_delay': Settings.OPENAI_RETRY_DELAY
                 })
-
+                
+                self.logger.info("[CONFIG-PUT] 💾 Saving configuration to config/monitor_config.json")
+                if write_json_if_changed('config/monitor_config.json', config_data):
+                    self.logger.info("[CONFIG-PUT] ✅ Configuration file saved successfully")
+                else:
+                    self.logger.info("[CONFIG-PUT] ➡️ Configuration file unchanged, write skipped")
+                
+                self.logger.info("[CONFIG-PUT] ✅ Configuration update completed successfully")
             except Exception as e:
-                self.logger.error(f"Error switching platform: {str(e)}")
-                return jsonify({'error': f'Failed to switch platform: {str(e)}'}), 500
+                self.logger.error(f"[CONFIG-PUT] ❌ Failed to save configuration: {e}")
+                return jsonify({'error': f'Failed to save configuration: {str(e)}'}), 500
+
+            self.logger.info(f"[CONFIG-PUT] 📊 Configuration update summary:")
+            self.logger.info(f"[CONFIG-PUT] 📊 - Monitor config changes: {len(config_changes)}")
+            if 'env_updates' in locals():
+                self.logger.info(f"[CONFIG-PUT] 📊 - Environment updates: {len(env_updates)}")
+                for env_var, change in env_updates.items():
+                    if env_var in ['ADO_PAT', 'OPENAI_API_KEY', 'AZURE_OPENAI_API_KEY', 'JIRA_TOKEN', 'GITHUB_TOKEN']:
+                        self.logger.info(f"[CONFIG-PUT] 📊   {env_var}: ***hidden***")
+                    else:
+                        self.logger.info(f"[CONFIG-PUT] 📊   {env_var}: {change['old']} → {change['new']}")
 
-        @self.app.route('/api/platform/test-connection', methods=['POST'])
-        def test_platform_connection():
-            """Test connection to the selected platform"""
-            try:
-                if Settings.PLATFORM_TYPE == 'JIRA':
-                    from src.jira_client import JiraClient
-                    jira_client = JiraClient()
-                    success = jira_client.test_connection()
+            # Check if running in Docker and trigger restart
+            is_docker = os.path.exists('/.dockerenv') or os.environ.get('RUNNING_IN_DOCKER', 'false').lower() == 'true'
+            
+            if is_docker:
+                self.logger.info("[CONFIG-PUT] 🐳 Detected running in Docker container")
+                self.logger.info("[CONFIG-PUT] 🔄 Triggering container restart to apply configuration changes...")
+                
+                try:
+                    # Create a restart marker file that can be monitored by docker-compose
+                    restart_marker = '/tmp/restart_required'
+                    with open(restart_marker, 'w') as f:
+                        f.write('restart')
                     
-                    if success:
-                        project_info = jira_client.get_project_info()
-                        return jsonify({
-                            'success': True,
-                            'platform': 'JIRA',
-                            'message': 'JIRA connection successful',
-                            'project_info': project_info
-                        })
-                    else:
-                        return jsonify({
-                            'success': False,
-                            'platform': 'JIRA',
-                            'error': 'JIRA connection failed'
-                        }), 400
-                else:
-                    # Test ADO connection
-                    from src.ado_client import ADOClient
-                    ado_client = ADOClient()
+                    # Schedule graceful restart - give Flask time to send response
+                    def delayed_restart():
+                        time.sleep(2)
+                        os.kill(os.getpid(), signal.SIGTERM)
                     
-                    # Try to get work item types as a connection test
-                    try:
-                        # This will raise an exception if connection fails
-                        work_item_types = ado_client.get_work_item_types()
-                        return jsonify({
-                            'success': True,
-                            'platform': 'ADO',
-                            'message': 'ADO connection successful',
-                            'project_info': {
-                                'name': Settings.ADO_PROJECT,
-                                'organization': Settings.ADO_ORGANIZATION,
-                                'work_item_types': work_item_types[:5]  # Return first 5 types
-                            }
-                        })
-                    except Exception as e:
-                        return jsonify({
-                            'success': False,
-                            'platform': 'ADO',
-                            'error': f'ADO connection failed: {str(e)}'
-                        }), 400
-
-            except Exception as e:
-                self.logger.error(f"Error testing platform connection: {str(e)}")
-                return jsonify({'error': f'Failed to test connection: {str(e)}'}), 500
-
-        @self.app.route('/api/monitor/check', methods=['POST'])
-        def force_check():
-            """Force a manual check for changes"""
-            try:
-                if not self.monitor:
-                    return jsonify({'error': 'Monitor not configured'}), 400
-
-                # Perform a manual check
-                results = self.monitor.force_check()
-                changes_detected = sum(1 for r in results.values() if r.get('has_changes', False))
+                    restart_thread = threading.Thread(target=delayed_restart)
+                    restart_thread.daemon = True
+                    restart_thread.start()
+                    
+                    self.logger.info("[CONFIG-PUT] ✅ Restart scheduled - container will restart in 2 seconds")
+                    
+                    return jsonify({
+                        'success': True,
+                        'message': 'Configuration updated successfully. Docker container will restart to apply changes.',
+                        'docker_restart': True,
+                        'changes_made': {**config_changes, **({f"env_{k}": v for k, v in env_updates.items()} if 'env_updates' in locals() else {})}
+                    })
+                except Exception as restart_error:
+                    self.logger.warning(f"[CONFIG-PUT] ⚠️ Failed to trigger Docker restart: {restart_error}")
+                    return jsonify({
+                        'success': True,
+                        'message': 'Configuration updated successfully (restart failed - please restart manually)',
+                        'changes_made': {**config_changes, **({f"env_{k}": v for k, v in env_updates.items()} if 'env_updates' in locals() else {})}
+                    })
+            else:
+                self.logger.info("[CONFIG-PUT] 💻 Running locally (not in Docker) - no restart needed")
                 
                 return jsonify({
                     'success': True,
-                    'message': f'Manual check completed',
-                    'changes_detected': changes_detected,
-                    'results': results
+                    'message': 'Configuration updated successfully',
+                    'changes_made': {**config_changes, **({f"env_{k}": v for k, v in env_updates.items()} if 'env_updates' in locals() else {})}
                 })
 
-            except Exception as e:
-                self.logger.error(f"Error in force check: {str(e)}")
-                return jsonify({'error': f'Force check failed: {str(e)}'}), 500
-
-        @self.app.route('/api/stories/<story_id>/test-cases', methods=['POST'])
-        def extract_test_cases_for_story(story_id):
-            """Extract test cases for a specific story"""
-            try:
-                # Extract test cases using the agent
-                result = self.agent.extract_test_cases_for_story(story_id)
-                
-                return jsonify({
-                    'success': result.extraction_successful,
-                    'story_id': result.story_id,
-                    'story_title': result.story_title,
-                    'test_cases': [tc.dict() for tc in result.test_cases],
-                    'total_test_cases': len(result.test_cases),
-                    'error': result.error_message if not result.extraction_successful else None
-                })
+        except Exception as e:
+            self.logger.error(f"Error updating config: {str(e)}")
+            return jsonify({'error': f'Failed to update configuration: {str(e)}'}), 500
 
-            except Exception as e:
-                self.logger.error(f"Error extracting test cases for story {story_id}: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Failed to extract test cases: {str(e)}'
-                }), 500
+    def switch_platform(self):
+        """Switch between ADO and JIRA platforms"""
+        data = request.get_json(silent=True)
+        if not data or 'platform_type' not in data:
+            return jsonify({'error': 'Platform type is required'}), 400
 
-        @self.app.route('/api/stories/<story_id>/test-cases/upload', methods=['POST'])
-        def upload_test_cases_for_story(story_id):
-            """Upload test cases for a specific story to Azure DevOps"""
-            try:
-                data = request.get_json()
-                test_cases = data.get('test_cases', [])
-                work_item_type = data.get('work_item_type', 'Issue')
-                
-                if not test_cases:
-                    return jsonify({
-                        'success': False,
-                        'error': 'No test cases provided for upload'
-                    }), 400
+        platform_type = data['platform_type'].upper()
+        if platform_type not in ['ADO', 'JIRA']:
+            return jsonify({'error': 'Platform type must be ADO or JIRA'}), 400
 
-                # Upload test cases to ADO
-                uploaded_test_cases = []
-                successful_uploads = 0
-                
-                for i, test_case in enumerate(test_cases):
-                    try:
-                        # Create the test case in ADO as a child of the story
-                        work_item_data = {
-                            'System.Title': test_case.get('title', f'Test Case {i+1}'),
-                            'System.Description': test_case.get('description', ''),
-                            'System.WorkItemType': work_item_type,
-                        }
-                        
-                        # Add test steps and expected result as additional fields for Test Case work items
-                        if work_item_type == 'Test Case':
-                            # Pass test_steps as additional field for proper formatting
-                            if test_case.get('steps') or test_case.get('test_steps'):
-                                work_item_data['test_steps'] = test_case.get('test_steps') or test_case.get('steps')
-                            
-                            if test_case.get('expected_result'):
-                                work_item_data['expected_result'] = test_case.get('expected_result')
-                        else:
-                            # For other work item types (like Issue), add to description
-                            if test_case.get('steps') or test_case.get('test_steps'):
-                                steps = test_case.get('test_steps') or test_case.get('steps')
-                                steps_html = '<ol>' + ''.join(f'<li>{step}</li>' for step in steps) + '</ol>'
-                                work_item_data['System.Description'] += f'<br/><strong>Test Steps:</strong><br/>{steps_html}'
-                            
-                            if test_case.get('expected_result'):
-                                work_item_data['System.Description'] += f'<br/><strong>Expected Result:</strong><br/>{test_case["expected_result"]}'
-                        
-                        # Create the work item
-                        created_item = self.agent.ado_client.create_work_item(
-                            work_item_type=work_item_type,
-                            fields=work_item_data,
-                            parent_id=int(story_id)
-                        )
-                        
-                        if created_item and 'id' in created_item:
-                            uploaded_test_cases.append({
-                                'success': True,
-                                'id': created_item['id'],
-                                'title': test_case.get('title', f'Test Case {i+1}')
-                            })
-                            successful_uploads += 1
-                        else:
-                            uploaded_test_cases.append({
-                                'success': False,
-                                'error': 'Failed to create work item',
-                                'title': test_case.get('title', f'Test Case {i+1}')
-                            })
-                    except Exception as e:
-                        self.logger.error(f"Exception during test case upload for story {story_id}: {str(e)}")
-                        uploaded_test_cases.append({
-                            'success': False,
-                            'error': str(e),
-                            'title': test_case.get('title', f'Test Case {i+1}')
-                        })
-                
+        # Update .env file
+        self._update_env_file({'PLATFORM_TYPE': platform_type})
+        
+        # Reload settings
+        self._reload_settings()
+        
+        self.logger.info(f"Platform switched to: {platform_type}")
+        
+        return jsonify({
+            'success': True,
+            'message': f'Platform switched to {platform_type}',
+            'platform_type': platform_type,
+            'requirement_type': Settings.REQUIREMENT_TYPE,
+            'user_story_type': Settings.USER_STORY_TYPE,
+            'story_extraction_type': Settings.STORY_EXTRACTION_TYPE,
+            'test_case_extraction_type': Settings.TEST_CASE_EXTRACTION_TYPE
+        })
+
+    def _get_platform_client(self, client_cls: type, *credentials):
+        """Return a cached platform client, constructing a new one only when credentials change"""
+        with self._platform_clients_lock:
+            cached = self._platform_clients.get(client_cls)
+            if cached is None or cached[0] != credentials:
+                cached = (credentials, client_cls())
+                self._platform_clients[client_cls] = cached
+            return cached[1]
+
+    def test_platform_connection(self):
+        """Test connection to the selected platform"""
+        if Settings.PLATFORM_TYPE == 'JIRA':
+            jira_client = self._get_platform_client(
+                JiraClient, Settings.JIRA_BASE_URL, Settings.JIRA_USERNAME, Settings.JIRA_TOKEN, Settings.JIRA_PROJECT_KEY
+            )
+            success = jira_client.test_connection()
+            
+            if success:
+                project_info = jira_client.get_project_info()
                 return jsonify({
-                    'success': successful_uploads > 0,
-                    'story_id': story_id,
-                    'uploaded_test_cases': uploaded_test_cases,
-                    'successful_uploads': successful_uploads,
-                    'total_test_cases': len(test_cases)
+                    'success': True,
+                    'platform': 'JIRA',
+                    'message': 'JIRA connection successful',
+                    'project_info': project_info
                 })
-
-            except Exception as e:
-                self.logger.error(f"Error uploading test cases for story {story_id}: {str(e)}")
+            else:
                 return jsonify({
                     'success': False,
-                    'error': f'Failed to upload test cases: {str(e)}'
-                }), 500
-
-        @self.app.route('/api/logs', methods=['GET'])
-        def get_logs():
-            """Get recent log entries"""
-            try:
-                lines = int(request.args.get('lines', 50))
-                lines = min(lines, 1000)  # Cap at 1000 lines
-                
-                log_file = 'logs/epic_monitor.log'
-                if not os.path.exists(log_file):
-                    return jsonify([])
-                
-                # Read the last N lines from the log file
-                logs = []
-                try:
-                    with open(log_file, 'r') as f:
-                        all_lines = f.readlines()
-                        recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
-                        
-                        for line in recent_lines:
-                            line = line.strip()
-                            if line:
-                                # Parse log line format: "2025-08-09 07:12:03,405 - MonitorAPI - INFO - Message"
-                                try:
-                                    parts = line.split(' - ', 3)
-                                    if len(parts) >= 4:
-                                        timestamp_str = parts[0]
-                                        component = parts[1]
-                                        level = parts[2].lower()
-                                        message = parts[3]
-                                        
-                                        # Convert timestamp to ISO format
-                                        try:
-                                            from datetime import datetime
-                                            timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S,%f')
-                                            iso_timestamp = timestamp.isoformat()
-                                        except:
-                                            iso_timestamp = timestamp_str
-                                        
-                                        logs.append({
-                                            'timestamp': iso_timestamp,
-                                            'level': level,
-                                            'component': component,
-                                            'message': message
-                                        })
-                                    else:
-                                        # Fallback for malformed lines
-                                        logs.append({
-                                            'timestamp': datetime.now().isoformat(),
-                                            'level': 'info',
-                                            'component': 'System',
-                                            'message': line
-                                        })
-                                except Exception as e:
-                                    # If parsing fails, add as a raw message
-                                    logs.append({
-                                        'timestamp': datetime.now().isoformat(),
-                                        'level': 'info',
-                                        'component': 'System',
-                                        'message': line
-                                    })
-                except Exception as e:
-                    self.logger.error(f"Error reading log file: {e}")
-                    return jsonify([])
-                
-                return jsonify(logs)
-                
-            except Exception as e:
-                self.logger.error(f"Error getting logs: {str(e)}")
-                return jsonify([])
-
-        @self.app.route('/api/logs/clear', methods=['POST'])
-        def clear_logs_display():
-            """Clear logs from UI display only (preserves actual log files)"""
+                    'platform': 'JIRA',
+                    'error': 'JIRA connection failed'
+                }), 400
+        else:
+            # Test ADO connection
+            ado_client = self._get_platform_client(
+                ADOClient, Settings.ADO_ORGANIZATION, Settings.ADO_PROJECT, Settings.ADO_PAT
+            )
+            
+            # Try to get work item types as a connection test
             try:
-                # This endpoint is for UI-only log clearing
-                # We don't actually delete the log files, just return success
-                # The frontend will clear its display
-                
+                # This will raise an exception if connection fails
+                work_item_types = ado_client.get_work_item_types()
                 return jsonify({
                     'success': True,
-                    'message': 'Log display cleared (files preserved)'
+                    'platform': 'ADO',
+                    'message': 'ADO connection successful',
+                    'project_info': {
+                        'name': Settings.ADO_PROJECT,
+                        'organization': Settings.ADO_ORGANIZATION,
+                        'work_item_types': work_item_types[:5]  # Return first 5 types
+                    }
                 })
-                
             except Exception as e:
-                self.logger.error(f"Error clearing log display: {str(e)}")
                 return jsonify({
                     'success': False,
-                    'error': f'Failed to clear log display: {str(e)}'
-                }), 500
+                    'platform': 'ADO',
+                    'error': f'ADO connection failed: {str(e)}'
+                }), 400
+
+    def force_check(self):
+        """Force a manual check for changes"""
+        if not self.monitor:
+            return jsonify({'error': 'Monitor not configured'}), 400
+
+        data = request.get_json(silent=True) or {}
+        epic_id = str(data['epic_id']) if data.get('epic_id') else None
+
+        if self._wants_async():
+            future = self._submit_force_check(epic_id)
+            job_id = self._submit_job(lambda: self._force_check_payload(future.result()))
+            return jsonify({'success': True, 'job_id': job_id, 'status_url': f'/api/jobs/{job_id}'}), 202
+
+        # Perform a manual check on the monitor pool so a slow ADO call cannot wedge this worker
+        try:
+            results = self._submit_force_check(epic_id).result(timeout=FORCE_CHECK_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            return jsonify({'error': f'Force check did not finish within {FORCE_CHECK_TIMEOUT_SECONDS} seconds'}), 504
+
+        return jsonify(self._force_check_payload(results))
+
+    @staticmethod
+    def _force_check_payload(results: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the manual check response body from the monitor's per-EPIC results"""
+        return {
+            'success': True,
+            'message': 'Manual check completed',
+            'changes_detected': sum(1 for r in results.values() if r.get('has_changes', False)),
+            'results': results
+        }
+
+    def get_job(self, job_id):
+        """Report the state of a background job started with ?async=1"""
+        with self._jobs_lock:
+            future = self._jobs.get(job_id)
+        if future is None:
+            return jsonify({'error': f'Job {job_id} not found'}), 404
+        if not future.done():
+            return jsonify({'job_id': job_id, 'state': 'pending'})
+
+        error = future.exception()
+        if error is not None:
+            return jsonify({'job_id': job_id, 'state': 'error', 'error': str(error)})
+        return jsonify({'job_id': job_id, 'state': 'done', 'result': future.result()})
+
+    def _extraction_response(self, story_id: str, build_payload) -> Response:
+        """Answer with build_payload(result) once the story's extraction finishes
         
-        @self.app.route('/api/test-cases/extract', methods=['POST'])
-        def extract_test_cases():
-            """Extract test cases for a story"""
-            try:
-                data = request.get_json()
-                story_id = data.get('story_id', '').strip()
-                upload_to_ado = data.get('upload_to_ado', True)
-
-                if not story_id:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Story ID is required'
-                    }), 400
-
-                # Extract test cases using the agent
-                result = self.agent.extract_test_cases_for_story(story_id)
-
-                # If upload is requested and extraction was successful, upload to ADO
-                if upload_to_ado and result.extraction_successful and result.test_cases:
-                    try:
-                        # Upload test cases as Issues (this functionality exists in the agent)
-                        upload_result = self.agent.extract_test_cases_as_issues(story_id, upload_to_ado=True)
-                        if upload_result.extraction_successful:
-                            result = upload_result  # Use the upload result instead
-                    except Exception as upload_error:
-                        self.logger.error(f"Failed to upload test cases: {upload_error}")
-                        # Continue with the extraction result even if upload fails
+        An extraction still running after TEST_CASE_EXTRACTION_WAIT_SECONDS is handed to a background job
+        and answered with 202 and the job ID, so the worker thread is freed without losing the result.
+        """
+        future = self._extraction_batcher.submit(story_id)
+        try:
+            result = future.result(timeout=Settings.TEST_CASE_EXTRACTION_WAIT_SECONDS)
+        except FutureTimeoutError:
+            job_id = self._submit_job(lambda: build_payload(future.result()))
+            return jsonify({'success': True, 'job_id': job_id, 'status_url': f'/api/jobs/{job_id}'}), 202
+        return jsonify(build_payload(result))
+
+    def extract_test_cases_for_story(self, story_id):
+        """Extract test cases for a specific story"""
+        return self._extraction_response(story_id, lambda result: {
+            'success': result.extraction_successful,
+            'story_id': result.story_id,
+            'story_title': result.story_title,
+            'test_cases': [tc.dict() for tc in result.test_cases],
+            'total_test_cases': len(result.test_cases),
+            'error': result.error_message if not result.extraction_successful else None
+        })
+
+    def upload_test_cases_for_story(self, story_id):
+        """Upload test cases for a specific story to Azure DevOps"""
+        data = request.get_json(silent=True) or {}
+        test_cases = data.get('test_cases', [])
+        work_item_type = data.get('work_item_type', 'Issue')
+        
+        if not test_cases:
+            return jsonify({
+                'success': False,
+                'error': 'No test cases provided for upload'
+            }), 400
 
-                return jsonify({
-                    'success': result.extraction_successful,
-                    'story_id': result.story_id,
-                    'story_title': result.story_title,
-                    'test_cases': [tc.dict() for tc in result.test_cases],
-                    'total_test_cases': len(result.test_cases),
-                    'error': result.error_message if not result.extraction_successful else None,
-                    'uploaded_to_ado': upload_to_ado and result.extraction_successful
-                })
+        # Upload test cases to ADO
+        uploaded_test_cases = []
+        successful_uploads = 0
 
-            except Exception as e:
-                self.logger.error(f"Error in extract_test_cases endpoint: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Internal server error: {str(e)}'
-                }), 500
-
-        @self.app.route('/api/test-cases/preview', methods=['POST'])
-        def preview_test_cases():
-            """Preview test cases for a story without uploading to ADO"""
+        # Values shared by every test case in this upload
+        parent_id = int(story_id)
+        is_test_case_type = work_item_type == 'Test Case'
+        
+        for i, test_case in enumerate(test_cases):
+            title = test_case.get('title', f'Test Case {i+1}')
             try:
-                data = request.get_json()
-                story_id = data.get('story_id', '').strip()
-
-                if not story_id:
-                    return jsonify({
+                # Create the test case in ADO as a child of the story
+                work_item_data = {
+                    'System.Title': title,
+                    'System.Description': test_case.get('description', ''),
+                    'System.WorkItemType': work_item_type,
+                }
+                
+                # Add test steps and expected result as additional fields for Test Case work items
+                if is_test_case_type:
+                    # Pass test_steps as additional field for proper formatting
+                    if test_case.get('steps') or test_case.get('test_steps'):
+                        work_item_data['test_steps'] = test_case.get('test_steps') or test_case.get('steps')
+                    
+                    if test_case.get('expected_result'):
+                        work_item_data['expected_result'] = test_case.get('expected_result')
+                else:
+                    # For other work item types (like Issue), add to description
+                    if test_case.get('steps') or test_case.get('test_steps'):
+                        steps = test_case.get('test_steps') or test_case.get('steps')
+                        steps_html = '<ol>' + ''.join(f'<li>{step}</li>' for step in steps) + '</ol>'
+                        work_item_data['System.Description'] += f'<br/><strong>Test Steps:</strong><br/>{steps_html}'
+                    
+                    if test_case.get('expected_result'):
+                        work_item_data['System.Description'] += f'<br/><strong>Expected Result:</strong><br/>{test_case["expected_result"]}'
+                
+                # Create the work item
+                created_item = self.agent.ado_client.create_work_item(
+                    work_item_type=work_item_type,
+                    fields=work_item_data,
+                    parent_id=parent_id
+                )
+                
+                if created_item and 'id' in created_item:
+                    uploaded_test_cases.append({
+                        'success': True,
+                        'id': created_item['id'],
+                        'title': title
+                    })
+                    successful_uploads += 1
+                else:
+                    uploaded_test_cases.append({
                         'success': False,
-                        'error': 'Story ID is required'
-                    }), 400
-
-                # Extract test cases without uploading
-                result = self.agent.extract_test_cases_for_story(story_id)
-
-                return jsonify({
-                    'success': result.extraction_successful,
-                    'story_id': result.story_id,
-                    'story_title': result.story_title,
-                    'test_cases': [tc.dict() for tc in result.test_cases],
-                    'total_test_cases': len(result.test_cases),
-                    'error': result.error_message if not result.extraction_successful else None,
-                    'preview_mode': True
-                })
-
+                        'error': 'Failed to create work item',
+                        'title': title
+                    })
             except Exception as e:
-                self.logger.error(f"Error in preview_test_cases endpoint: {str(e)}")
-                return jsonify({
+                self.logger.warning("Exception during test case upload for story %s: %s", story_id, e)
+                uploaded_test_cases.append({
                     'success': False,
-                    'error': f'Internal server error: {str(e)}'
-                }), 500
+                    'error': str(e),
+                    'title': title
+                })
+        
+        return jsonify({
+            'success': successful_uploads > 0,
+            'story_id': story_id,
+            'uploaded_test_cases': uploaded_test_cases,
+            'successful_uploads': successful_uploads,
+            'total_test_cases': len(test_cases)
+        })
+
+    def _get_log_handle(self, log_file: str, st: os.stat_result):
+        """Return the open log handle, reopening it only when the file was rotated or replaced"""
+        file_id = (st.st_dev, st.st_ino)
+        if self._log_handle is None or self._log_handle_id != file_id:
+            if self._log_handle is not None:
+                self._log_handle.close()
+                self._log_handle = None
+            self._log_handle = open(log_file, 'rb')
+            self._log_handle_id = file_id
+        return self._log_handle
+
+    def get_logs(self):
+        """Get recent log entries"""
+        try:
+            lines = int(request.args.get('lines', 50))
+            lines = min(lines, 1000)  # Cap at 1000 lines
+            
+            log_file = 'logs/epic_monitor.log'
+            try:
+                st = os.stat(log_file)
+            except FileNotFoundError:
+                return jsonify([])
 
-        @self.app.route('/api/test-cases/bulk-extract', methods=['POST'])
-        def bulk_extract_test_cases():
-            """Extract test cases for multiple stories in an epic"""
+            # Dashboard polls repeat the same request; reuse the parsed tail while the file is unchanged
+            cache_key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, lines)
+            cached = self._logs_cache
+            if cached is not None and cached[0] == cache_key:
+                return jsonify(cached[1])
+            
+            # Read the last N lines from the log file
             try:
-                data = request.get_json()
-                epic_id = data.get('epic_id', '').strip()
-                upload_to_ado = data.get('upload_to_ado', True)
+                # Seek from the end of a long-lived handle instead of reopening or reading the whole file
+                with self._log_handle_lock:
+                    recent_lines = _tail_lines_from(self._get_log_handle(log_file, st), lines)
+            except FileNotFoundError:
+                # Rotated or removed since the stat above
+                return jsonify([])
+            except Exception as e:
+                self.logger.error(f"Error reading log file: {e}")
+                return jsonify([])
 
-                if not epic_id:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Epic ID is required'
-                    }), 400
+            def generate():
+                # Encode entries as they are parsed instead of building and serializing the whole list at once
+                logs = []
+                yield '['
+                separator = ''
+                for line in recent_lines:
+                    line = line.strip()
+                    if line:
+                        entry = _parse_log_line(line)
+                        logs.append(entry)
+                        yield separator + self.app.json.dumps(entry)
+                        separator = ','
+                yield ']'
+                self._logs_cache = (cache_key, logs)
+
+            return self._json_stream_response(generate())
+            
+        except Exception as e:
+            self.logger.error(f"Error getting logs: {str(e)}")
+            return jsonify([])
+
+    def clear_logs_display(self):
+        """Clear logs from UI display only (preserves actual log files)"""
+        # This endpoint is for UI-only log clearing
+        # We don't actually delete the log files, just return success
+        # The frontend will clear its display
+        return jsonify({
+            'success': True,
+            'message': 'Log display cleared (files preserved)'
+        })
+            
+    def extract_test_cases(self):
+        """Extract test cases for a story"""
+        data = request.get_json(silent=True) or {}
+        story_id = data.get('story_id', '').strip()
+        upload_to_ado = data.get('upload_to_ado', True)
 
-                # Extract test cases for all stories in the epic
-                results = self.agent.extract_test_cases_for_epic_stories(epic_id, upload_to_ado)
+        if not story_id:
+            return jsonify({
+                'success': False,
+                'error': 'Story ID is required'
+            }), 400
+
+        if self._wants_async():
+            job_id = self._submit_job(self._extract_test_cases_payload, story_id, upload_to_ado)
+            return jsonify({'success': True, 'job_id': job_id, 'status_url': f'/api/jobs/{job_id}'}), 202
+
+        return self._extraction_response(
+            story_id, lambda result: self._upload_test_cases_payload(story_id, upload_to_ado, result)
+        )
+
+    def _extract_test_cases_payload(self, story_id: str, upload_to_ado: bool) -> Dict[str, Any]:
+        """Extract (and optionally upload) test cases for a story and build the response body"""
+        # Background jobs wait for the extraction however long it takes
+        result = self._extraction_batcher.submit(story_id).result()
+        return self._upload_test_cases_payload(story_id, upload_to_ado, result)
+
+    def _upload_test_cases_payload(self, story_id: str, upload_to_ado: bool, result: TestCaseExtractionResult) -> Dict[str, Any]:
+        """Optionally upload the extracted test cases to ADO and build the response body"""
+        # If upload is requested and extraction was successful, upload the extracted test cases to ADO
+        if upload_to_ado and result.extraction_successful and result.test_cases:
+            try:
+                result.created_issue_ids, upload_errors = self._run_io(self.agent.upload_test_cases, story_id, result.test_cases)
+                for upload_error in upload_errors:
+                    self.logger.error(f"Failed to upload test case for story {story_id}: {upload_error}")
+            except Exception as upload_error:
+                self.logger.error(f"Failed to upload test cases: {upload_error}")
+                # Continue with the extraction result even if upload fails
+
+        return {
+            'success': result.extraction_successful,
+            'story_id': result.story_id,
+            'story_title': result.story_title,
+            'test_cases': [tc.dict() for tc in result.test_cases],
+            'total_test_cases': len(result.test_cases),
+            'error': result.error_message if not result.extraction_successful else None,
+            'uploaded_to_ado': upload_to_ado and result.extraction_successful
+        }
+
+    def preview_test_cases(self):
+        """Preview test cases for a story without uploading to ADO"""
+        data = request.get_json(silent=True) or {}
+        story_id = data.get('story_id', '').strip()
+
+        if not story_id:
+            return jsonify({
+                'success': False,
+                'error': 'Story ID is required'
+            }), 400
+
+        # Extract test cases without uploading
+        return self._extraction_response(story_id, lambda result: {
+            'success': result.extraction_successful,
+            'story_id': result.story_id,
+            'story_title': result.story_title,
+            'test_cases': [tc.dict() for tc in result.test_cases],
+            'total_test_cases': len(result.test_cases),
+            'error': result.error_message if not result.extraction_successful else None,
+            'preview_mode': True
+        })
+
+    def bulk_extract_test_cases(self):
+        """Extract test cases for multiple stories in an epic"""
+        data = request.get_json(silent=True) or {}
+        epic_id = data.get('epic_id', '').strip()
+        upload_to_ado = data.get('upload_to_ado', True)
+
+        if not epic_id:
+            return jsonify({
+                'success': False,
+                'error': 'Epic ID is required'
+            }), 400
 
-                # Process results
-                successful_extractions = 0
-                total_test_cases = 0
-                story_results = []
+        def generate():
+            # Emit one NDJSON line per story as soon as it finishes, then a summary line
+            total_stories = 0
+            successful_extractions = 0
+            total_test_cases = 0
 
-                for story_id, result in results.items():
+            try:
+                for story_id, result in self.agent.iter_test_cases_for_epic_stories(epic_id, upload_to_ado):
+                    total_stories += 1
                     if result.extraction_successful:
                         successful_extractions += 1
                         total_test_cases += len(result.test_cases)
 
-                    story_results.append({
+                    yield self.app.json.dumps({
+                        'type': 'story_result',
                         'story_id': result.story_id,
                         'story_title': result.story_title,
                         'success': result.extraction_successful,
                         'test_case_count': len(result.test_cases),
                         'error': result.error_message if not result.extraction_successful else None
-                    })
-
-                return jsonify({
-                    'success': successful_extractions > 0,
-                    'epic_id': epic_id,
-                    'total_stories': len(results),
-                    'successful_extractions': successful_extractions,
-                    'total_test_cases': total_test_cases,
-                    'story_results': story_results,
-                    'uploaded_to_ado': upload_to_ado
-                })
-
-            except Exception as e:
-                self.logger.error(f"Error in bulk_extract_test_cases endpoint: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Internal server error: {str(e)}'
-                }), 500
-
-        @self.app.route('/api/stories/extract', methods=['POST'])
-        def extract_stories():
-            """Extract user stories from requirements"""
-            try:
-                data = request.get_json()
-                requirement_id = data.get('requirement_id', '').strip()
-                upload_to_ado = data.get('upload_to_ado', True)
-
-                if not requirement_id:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Requirement ID is required'
-                    }), 400
-
-                # Extract stories using the agent
-                result = self.agent.process_requirement_by_id(requirement_id, upload_to_ado)
-
-                return jsonify({
-                    'success': result.extraction_successful,
-                    'requirement_id': result.requirement_id,
-                    'requirement_title': result.requirement_title,
-                    'stories': [story.dict() for story in result.stories],
-                    'total_stories': len(result.stories),
-                    'error': result.error_message if not result.extraction_successful else None,
-                    'uploaded_to_ado': upload_to_ado and result.extraction_successful
-                })
-
+                    }) + '\n'
             except Exception as e:
-                self.logger.error(f"Error in extract_stories endpoint: {str(e)}")
-                return jsonify({
-                    'success': False,
+                self.logger.error(f"Error streaming bulk test case extraction for epic {epic_id}: {str(e)}")
+                yield self.app.json.dumps({
+                    'type': 'error',
                     'error': f'Internal server error: {str(e)}'
-                }), 500
-
-        @self.app.route('/api/stories/preview', methods=['POST'])
-        def preview_stories():
-            """Preview user stories from requirements without uploading"""
-            try:
-                data = request.get_json()
-                requirement_id = data.get('requirement_id', '').strip()
-
-                if not requirement_id:
-                    return jsonify({
-                        'success': False,
-                        'error': 'Requirement ID is required'
-                    }), 400
-
-                # Preview stories without uploading
-                result = self.agent.preview_stories(requirement_id)
-
-                return jsonify({
-                    'success': result.extraction_successful,
-                    'requirement_id': result.requirement_id,
-                    'requirement_title': result.requirement_title,
-                    'stories': [story.dict() for story in result.stories],
-                    'total_stories': len(result.stories),
-                    'error': result.error_message if not result.extraction_successful else None,
-                    'preview_mode': True
-                })
-
-            except Exception as e:
-                self.logger.error(f"Error in preview_stories endpoint: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Internal server error: {str(e)}'
-                }), 500
-
-    def run(self, host='0.0.0.0', debug=False):
-        """Run the Flask application"""
-        self.logger.info(f"Starting Monitor API server on {host}:{self.port}")
-        self.app.run(host=host, port=self.port, debug=debug)
+                }) + '\n'
+
+            yield self.app.json.dumps({
+                'type': 'summary',
+                'success': successful_extractions > 0,
+                'epic_id': epic_id,
+                'total_stories': total_stories,
+                'successful_extractions': successful_extractions,
+                'total_test_cases': total_test_cases,
+                'uploaded_to_ado': upload_to_ado
+            }) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    def extract_stories(self):
+        """Extract user stories from requirements"""
+        data = request.get_json(silent=True) or {}
+        requirement_id = data.get('requirement_id', '').strip()
+        upload_to_ado = data.get('upload_to_ado', True)
+
+        if not requirement_id:
+            return jsonify({
+                'success': False,
+                'error': 'Requirement ID is required'
+            }), 400
+
+        # Extract stories using the agent
+        result = self._run_io(self.agent.process_requirement_by_id, requirement_id, upload_to_ado)
+
+        return jsonify({
+            'success': result.extraction_successful,
+            'requirement_id': result.requirement_id,
+            'requirement_title': result.requirement_title,
+            'stories': [story.dict() for story in result.stories],
+            'total_stories': len(result.stories),
+            'error': result.error_message if not result.extraction_successful else None,
+            'uploaded_to_ado': upload_to_ado and result.extraction_successful
+        })
+
+    def preview_stories(self):
+        """Preview user stories from requirements without uploading"""
+        data = request.get_json(silent=True) or {}
+        requirement_id = data.get('requirement_id', '').strip()
+
+        if not requirement_id:
+            return jsonify({
+                'success': False,
+                'error': 'Requirement ID is required'
+            }), 400
+
+        # Preview stories without uploading
+        result = self._run_io(self.agent.preview_stories, requirement_id)
+
+        return jsonify({
+            'success': result.extraction_successful,
+            'requirement_id': result.requirement_id,
+            'requirement_title': result.requirement_title,
+            'stories': [story.dict() for story in result.stories],
+            'total_stories': len(result.stories),
+            'error': result.error_message if not result.extraction_successful else None,
+            'preview_mode': True
+        })
+
+    def run(self, host='0.0.0.0', debug=False, server: Optional[str] = None):
+        """Run the Flask application on WSGI_SERVER (waitress or gevent); debug mode uses the Werkzeug dev server"""
+        server = (server or WSGI_SERVER).lower()
+        if not debug and server == 'gevent' and self._run_gevent(host):
+            return
+
+        if debug or waitress_serve is None:
+            self.logger.info(f"Starting Monitor API development server on {host}:{self.port}")
+            self.app.run(host=host, port=self.port, debug=debug, threaded=True)
+            return
+
+        self.logger.info(f"Starting Monitor API server (waitress) on {host}:{self.port}")
+        waitress_serve(
+            self.app,
+            host=host,
+            port=self.port,
+            threads=WSGI_THREADS,
+            connection_limit=200,
+            channel_timeout=60,
+        )
+
+    def _run_gevent(self, host: str) -> bool:
+        """Serve with gevent's WSGIServer; returns False if gevent is unavailable or was not patched in at startup"""
+        try:
+            from gevent import monkey
+            from gevent.pywsgi import WSGIServer
+        except ImportError:
+            self.logger.warning("WSGI_SERVER=gevent but gevent is not installed; falling back")
+            return False
+
+        # Patching after threading and sockets are in use is unsafe, so it must happen before this module loads
+        if not monkey.is_module_patched('socket'):
+            self.logger.warning("gevent needs monkey patching at startup: "
+                                "run 'python -m gevent.monkey --module src.monitor_api'; falling back")
+            return False
+
+        self.logger.info(f"Starting Monitor API server (gevent) on {host}:{self.port}")
+        WSGIServer((host, self.port), self.app).serve_forever()
+        return True
 
 
 def create_app(port=5001):
@@ -1495,12 +2072,15 @@ def create_app(port=5001):
 
 
 if __name__ == '__main__':
-    # Setup logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    # Setup logging; records are written by a background listener so request threads never block on I/O
+    log_queue = queue.Queue(-1)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    log_listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), handlers=[QueueHandler(log_queue)])
+    log_listener.start()
+    atexit.register(log_listener.stop)
 
     # Create and run the API
     api = MonitorAPI(port=5001)
-    api.run(debug=True)
+    api.run(debug=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true'))
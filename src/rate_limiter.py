@@ -0,0 +1,75 @@
+"""
+Client-side rate limiting for AI requests
+Token buckets that pace requests and tokens under the provider's per-minute limits
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTokenBucket:
+    """Token bucket refilled continuously at rate_per_sec, holding at most burst tokens"""
+
+    def __init__(self, rate_per_sec: float, burst: float):
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """asyncio locks bind to one event loop, so keep one per running loop"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_sec)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        """Wait until the bucket holds enough tokens, then take them"""
+        # A single request larger than the bucket waits for a full bucket rather than forever
+        tokens = min(tokens, self.burst)
+        async with self._get_lock():
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate_per_sec)
+                self._refill()
+            self._tokens -= tokens
+
+
+class LLMRateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for AI calls; a limit of 0 disables it"""
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.request_bucket = AsyncTokenBucket(requests_per_minute / 60, requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = AsyncTokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute > 0 else None
+
+    @classmethod
+    def from_settings(cls) -> "LLMRateLimiter":
+        return cls(
+            requests_per_minute=getattr(Settings, 'LLM_REQUESTS_PER_MINUTE', 0),
+            tokens_per_minute=getattr(Settings, 'LLM_TOKENS_PER_MINUTE', 0)
+        )
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait for one request slot and estimated_tokens of token budget"""
+        started = time.monotonic()
+        if self.request_bucket is not None:
+            await self.request_bucket.acquire(1)
+        if self.token_bucket is not None:
+            await self.token_bucket.acquire(estimated_tokens)
+        waited = time.monotonic() - started
+        if waited > 0.5:
+            logger.debug("Rate limiter delayed AI request by %.2fs", waited)
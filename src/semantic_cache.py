@@ -0,0 +1,100 @@
+"""
+Semantic cache of AI responses for near-duplicate requirements
+Requirements whose title and description embed close to an earlier one reuse that requirement's response
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config.settings import Settings
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional: semantic caching is skipped without sentence-transformers
+    np = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """Nearest-neighbour lookup of raw responses by cosine similarity of requirement embeddings"""
+
+    def __init__(self, cache_dir: str, model_name: str, threshold: float, name: str = 'semantic'):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.threshold = threshold
+        self._model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, f'{name}.sqlite3'), check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries (model TEXT NOT NULL, embedding BLOB NOT NULL, content TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+        # Flat inner-product index over normalized embeddings; backlogs are small enough that exact search is cheap
+        rows = self._conn.execute('SELECT embedding, content FROM entries WHERE model = ?', (model_name,)).fetchall()
+        self._contents = [content for _, content in rows]
+        self._embeddings = np.array([np.frombuffer(blob, dtype=np.float32) for blob, _ in rows]) if rows else None
+
+    def _embed(self, text: str):
+        if self._model is None:
+            logger.info("Loading sentence embedding model '%s' for the semantic cache", self._model_name)
+            self._model = SentenceTransformer(self._model_name)
+        return self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def get(self, text: str) -> Optional[str]:
+        """Return the response cached for the most similar text, if it clears the threshold"""
+        with self._lock:
+            if self._embeddings is None:
+                return None
+            similarities = self._embeddings @ self._embed(text)
+            best = int(similarities.argmax())
+            if similarities[best] < self.threshold:
+                return None
+            logger.debug("Semantic cache hit with similarity %.3f", similarities[best])
+            return self._contents[best]
+
+    def set(self, text: str, content: str):
+        with self._lock:
+            embedding = self._embed(text)
+            self._conn.execute(
+                'INSERT INTO entries (model, embedding, content, created_at) VALUES (?, ?, ?, ?)',
+                (self._model_name, embedding.tobytes(), content, time.time())
+            )
+            self._conn.commit()
+            self._contents.append(content)
+            row = embedding[np.newaxis, :]
+            self._embeddings = row if self._embeddings is None else np.vstack([self._embeddings, row])
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(name: str = 'semantic') -> Optional[SemanticResponseCache]:
+    """Shared semantic cache for Settings.LLM_CACHE_DIR, or None when disabled or unavailable
+    
+    Each name is a separate store, so responses of different prompt kinds never answer each other.
+    """
+    if not getattr(Settings, 'SEMANTIC_CACHE_ENABLED', False):
+        return None
+    if SentenceTransformer is None:
+        logger.warning("SEMANTIC_CACHE_ENABLED is set but sentence-transformers is not installed; semantic cache disabled")
+        return None
+    cache_dir = Settings.LLM_CACHE_DIR
+    with _caches_lock:
+        if (cache_dir, name) not in _caches:
+            try:
+                _caches[cache_dir, name] = SemanticResponseCache(
+                    cache_dir, Settings.SEMANTIC_CACHE_MODEL, Settings.SEMANTIC_CACHE_THRESHOLD, name
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Semantic cache unavailable at %s: %s", cache_dir, e)
+                return None
+        return _caches[cache_dir, name]
@@ -1,14 +1,272 @@
+import asyncio
 import json
 import re
 import time
 import logging
-from typing import List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Annotated, Dict, Iterator, List, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter, ValidationError
 
 from config.settings import Settings
 from src.models import Requirement, StoryExtractionResult, UserStory
 from src.models_enhanced import EnhancedUserStory
 from src.enhanced_story_creator import EnhancedStoryCreator
-from src.ai_client import get_ai_client
+from src.ai_client import get_ai_client, count_message_tokens, estimate_tokens
+from src.rate_limiter import LLMRateLimiter
+from src.llm_cache import LLMResponseCache, get_llm_cache
+from src.semantic_cache import get_semantic_cache
+from src.streamed_json import StreamedArrayParser
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib parser
+    orjson = None
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # Optional: only exact duplicates are filtered without datasketch
+    MinHash = None
+    MinHashLSH = None
+
+# AI responses are parsed with orjson when available; its JSONDecodeError subclasses json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Story-writing instructions shared by the single and batched extraction prompts
+_STORY_GUIDELINES = """
+**Instructions:**
+1. Break down this requirement into 2-6 logical user stories based on complexity and scope
+2. Each story should be focused on a single piece of functionality
+3. Ensure stories are independent and deliverable
+4. Consider the domain context and stakeholders when crafting stories
+5. Write clear acceptance criteria that are testable and specific
+6. Include edge cases and error scenarios where relevant
+7. Consider non-functional requirements (performance, security, usability)
+
+**Story Quality Guidelines:**
+- Headlines should be specific and action-oriented
+- Descriptions should include both user value and technical context
+- Acceptance criteria should cover happy path, edge cases, and error scenarios
+- Stories should be sized for 1-3 day development efforts
+- Include relevant business rules and constraints
+
+"""
+
+# Static opening of the system prompt; domain and complexity sections are appended per requirement
+_SYSTEM_PROMPT_BASE = """You are a senior business analyst and product owner with deep expertise in agile development, user story creation, and domain-driven design.
+
+Your expertise includes:
+- Breaking down complex requirements into implementable user stories
+- Understanding user journeys and personas across different domains
+- Identifying dependencies and story relationships
+- Ensuring stories are testable, valuable, and appropriately sized
+- Incorporating non-functional requirements and business rules
+- Risk-based story prioritization
+
+**CORE PRINCIPLES:**
+1. **User-Centric**: Every story should deliver clear value to a specific user type
+2. **INVEST Criteria**: Stories should be Independent, Negotiable, Valuable, Estimable, Small, Testable
+3. **Definition of Ready**: Stories should have clear acceptance criteria and dependencies
+4. **Business Value**: Each story should articulate its business impact
+5. **Technical Feasibility**: Consider implementation complexity and constraints
+
+**STORY STRUCTURE REQUIREMENTS:**
+- **Heading**: Action-oriented, specific, under 80 characters
+- **Description**: Follow "As a [specific persona], I want [specific capability] so that [business value]" format
+- **Technical Context**: Separate field with technical details, implementation requirements, and system interactions
+- **Business Requirements**: Separate field with business rules, constraints, and domain-specific requirements
+- **Acceptance Criteria**: Use Given/When/Then format, cover positive, negative, and edge cases
+- **Priority**: Based on business value, risk, and dependencies
+- **Story Points**: Relative sizing (1=simple, 2=straightforward, 3=moderate, 5=complex, 8=very complex)
+"""
+
+# Shape of one story object in the AI response
+_STORY_JSON_FORMAT = """        {
+            "heading": "Specific, action-oriented title",
+            "description": "As a [specific user type], I want [specific goal] so that [clear benefit]",
+            "technical_context": "Technical details and implementation requirements",
+            "business_requirements": "Business rules, constraints, and requirements",
+            "acceptance_criteria": [
+                "Given [specific context/state] When [specific action] Then [specific outcome] And [additional outcomes]",
+                "Given [error condition] When [action] Then [error handling behavior]",
+                "Given [edge case] When [action] Then [expected behavior]"
+            ],
+            "priority": "High|Medium|Low",
+            "story_points": "1|2|3|5|8",
+            "dependencies": ["Other stories this depends on"],
+            "business_value": "Clear statement of business value"
+        }"""
+
+# JSON schema of one story object, enforced server-side when structured outputs are enabled.
+# Strict mode needs every property listed as required and no additional properties.
+_STORY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "heading": {"type": "string"},
+        "description": {"type": "string"},
+        "technical_context": {"type": "string"},
+        "business_requirements": {"type": "string"},
+        "acceptance_criteria": {"type": "array", "items": {"type": "string"}},
+        "priority": {"type": "string", "enum": ["High", "Medium", "Low"]},
+        "story_points": {"type": "string", "enum": ["1", "2", "3", "5", "8"]},
+        "dependencies": {"type": "array", "items": {"type": "string"}},
+        "business_value": {"type": "string"}
+    },
+    "required": [
+        "heading", "description", "technical_context", "business_requirements", "acceptance_criteria",
+        "priority", "story_points", "dependencies", "business_value"
+    ],
+    "additionalProperties": False
+}
+
+_STORIES_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "stories",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"stories": {"type": "array", "items": _STORY_SCHEMA}},
+            "required": ["stories"],
+            "additionalProperties": False
+        }
+    }
+}
+
+_BATCH_STORIES_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "stories_by_requirement",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "stories": {"type": "array", "items": _STORY_SCHEMA}
+                        },
+                        "required": ["id", "stories"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["results"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Markdown code fence wrapped around a JSON response, at either end
+_CODE_FENCE_RE = re.compile(r'\A```(?:json)?|```\Z')
+
+# Blank line between paragraphs, where an oversized requirement description is split
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+# Near-duplicate detection: character shingle size and MinHash permutations
+_SHINGLE_SIZE = 5
+_MINHASH_PERMUTATIONS = 128
+
+# Response budget per requirement; a batched call scales it, capped by STORY_EXTRACTION_BATCH_MAX_TOKENS
+_MAX_TOKENS_PER_REQUIREMENT = 3000
+
+
+@lru_cache(maxsize=None)
+def _system_prompt(domain: str, high_complexity: bool) -> str:
+    """Story-extraction system prompt; it only varies by domain and high complexity, so each variant is built once"""
+    base_prompt = _SYSTEM_PROMPT_BASE
+    
+    # Add domain-specific context
+    if domain != 'general':
+        base_prompt += f"""
+**DOMAIN EXPERTISE - {domain.upper()}:**
+You have specialized knowledge in {domain} domain including:
+- Industry-specific workflows and user journeys
+- Regulatory requirements and compliance needs
+- Common integration patterns and technical constraints
+- Domain-specific security and performance requirements
+- Typical user personas and their goals
+"""
+    
+    # Add complexity awareness
+    if high_complexity:
+        base_prompt += """
+**COMPLEXITY AWARENESS:**
+This is a high-complexity requirement. Focus on:
+- Breaking down into smaller, manageable stories
+- Identifying technical risks and dependencies
+- Including infrastructure and non-functional stories
+- Planning for integration and testing complexity
+"""
+    
+    base_prompt += """
+**OUTPUT FORMAT:**
+Provide response as valid JSON only. Ensure all stories are well-formed and follow the specified structure.
+"""
+    
+    return base_prompt
+
+
+@lru_cache(maxsize=None)
+def _system_message(domain: str, high_complexity: bool) -> dict:
+    """Shared system message for a prompt variant; callers must treat it as read-only"""
+    return {"role": "system", "content": _system_prompt(domain, high_complexity)}
+
+
+def _system_prompt_variant(context: dict = None) -> tuple:
+    """The (domain, high_complexity) pair that selects a system prompt for a requirement context"""
+    if not context:
+        return 'general', False
+    return context.get('domain'), context.get('complexity') == 'high'
+
+
+def _response_format(response_format: dict):
+    """The structured-output response format to request, or None when structured outputs are disabled"""
+    return response_format if getattr(Settings, 'STORY_STRUCTURED_OUTPUTS_ENABLED', False) else None
+
+
+class _StoryValidationSchema(BaseModel):
+    """Completeness rules for a generated story, checked by pydantic-core instead of Python branches"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    heading: Annotated[str, StringConstraints(strip_whitespace=True, min_length=5, max_length=100)]
+    description: Annotated[str, StringConstraints(strip_whitespace=True, min_length=10)]
+    acceptance_criteria: Annotated[List[Annotated[str, StringConstraints(strip_whitespace=True, min_length=5)]], Field(min_length=1)]
+
+
+# Validates a whole list of stories in one call
+_STORY_LIST_VALIDATOR = TypeAdapter(List[_StoryValidationSchema])
+
+
+def _story_validation_issue(error: dict) -> str:
+    """Turn one pydantic error for a story list into the extractor's issue message"""
+    loc = error['loc']
+    story_num = loc[0] + 1
+    if len(loc) == 1:
+        return f"Story {story_num}: Not a valid story"
+    field = loc[1]
+    if field == 'heading':
+        if error['type'] == 'string_too_long':
+            return f"Story {story_num}: Heading too long (over 100 characters)"
+        return f"Story {story_num}: Heading too short or missing"
+    if field == 'description':
+        return f"Story {story_num}: Description too short or missing"
+    if len(loc) == 2:
+        return f"Story {story_num}: No acceptance criteria provided"
+    return f"Story {story_num}, Criteria {loc[2] + 1}: Too short or empty"
+
+
+class _StreamedStoryParser(StreamedArrayParser):
+    """Pulls each complete object out of a streamed response's "stories" array as soon as it closes"""
+    
+    def __init__(self):
+        super().__init__('stories')
+
 
 class StoryExtractor:
     """AI-powered extractor that analyzes requirements and creates enhanced user stories"""
@@ -17,8 +275,12 @@ class StoryExtractor:
         Settings.validate()
         self.ai_client = get_ai_client()
         self.story_creator = EnhancedStoryCreator()
+        self.rate_limiter = LLMRateLimiter.from_settings()
+        self.llm_cache = get_llm_cache()
+        self.semantic_cache = get_semantic_cache()
+        self._near_duplicate_index = None  # (fingerprint of existing stories, MinHashLSH)
         self.logger = logging.getLogger("StoryExtractor")
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
         
         # Log which AI service is being used
         ai_provider = getattr(Settings, 'AI_SERVICE_PROVIDER', 'OPENAI')
@@ -33,139 +295,508 @@ class StoryExtractor:
     def extract_stories(self, requirement: Requirement, existing_stories: List[dict] = None) -> StoryExtractionResult:
         """Extract enhanced user stories from a requirement using AI, avoiding duplicates"""
         self.logger.info(f"Starting story extraction for requirement: {requirement.id}")
-        self.logger.debug(f"Requirement details: {json.dumps(requirement.__dict__, indent=2)}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Requirement details: %s", orjson.dumps(requirement.__dict__).decode() if orjson is not None else json.dumps(requirement.__dict__))
         
         try:
-            # Enhanced requirement analysis
-            requirement_context = self._analyze_requirement_context(requirement)
-            self.logger.debug(f"Requirement context: {requirement_context}")
-            
-            # Get domain-specific guidelines
-            domain_guidelines = self._get_domain_guidelines(requirement_context.get('domain', 'general'))
-            
-            # Analyze stakeholders and user personas
-            stakeholders = self._identify_stakeholders(requirement)
-            self.logger.debug(f"Identified stakeholders: {stakeholders}")
+            requirement_context, domain_guidelines, stakeholders = self._prepare_extraction(requirement)
             
             self.logger.debug("Analyzing requirement with AI...")
-            stories = self._analyze_requirement_with_ai(requirement, requirement_context, domain_guidelines, stakeholders)
+            stories, salvaged = self._analyze_requirement_with_ai(requirement, requirement_context, domain_guidelines, stakeholders)
             self.logger.info(f"Found {len(stories)} potential stories")
             
-            # Enhanced story validation and refinement
-            stories = self._refine_and_validate_stories(stories, requirement_context)
-            
-            # Filter out duplicates and convert EnhancedUserStory to UserStory
-            filtered_stories = self._filter_duplicate_stories(stories, existing_stories or [])
+            return self._finalize_extraction(requirement, stories, requirement_context, existing_stories, salvaged)
+        except Exception as e:
+            return self._failed_result(requirement, e)
+    
+    async def extract_stories_async(self, requirement: Requirement, existing_stories: List[dict] = None) -> StoryExtractionResult:
+        """Async variant of extract_stories that awaits the AI call instead of blocking on it"""
+        self.logger.info(f"Starting async story extraction for requirement: {requirement.id}")
+        
+        try:
+            requirement_context, domain_guidelines, stakeholders = self._prepare_extraction(requirement)
             
-            # Add story prioritization and dependencies
-            prioritized_stories = self._prioritize_stories(filtered_stories, requirement_context)
+            stories, salvaged = await self._analyze_requirement_with_ai_async(requirement, requirement_context, domain_guidelines, stakeholders)
+            self.logger.info(f"Found {len(stories)} potential stories")
             
-            return StoryExtractionResult(
-                requirement_id=str(requirement.id),
-                requirement_title=requirement.title,
-                stories=prioritized_stories,
-                extraction_successful=True
-            )
+            return self._finalize_extraction(requirement, stories, requirement_context, existing_stories, salvaged)
         except Exception as e:
-            self.logger.error(f"Story extraction failed: {str(e)}")
-            return StoryExtractionResult(
-                requirement_id=str(requirement.id),
-                requirement_title=requirement.title,
-                stories=[],
-                extraction_successful=False,
-                error_message=str(e)
-            )
+            return self._failed_result(requirement, e)
+    
+    async def extract_stories_many(self, requirements: List[Requirement], existing_stories: List[dict] = None, max_concurrency: int = None) -> List[StoryExtractionResult]:
+        """Extract stories for several requirements with at most max_concurrency AI calls in flight"""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or getattr(Settings, 'LLM_MAX_CONCURRENCY', 4)))
+        
+        async def _extract(requirement: Requirement) -> StoryExtractionResult:
+            async with semaphore:
+                return await self.extract_stories_async(requirement, existing_stories)
+        
+        return await asyncio.gather(*(_extract(requirement) for requirement in requirements))
     
-    def _analyze_requirement_with_ai(self, requirement: Requirement, context: dict = None, domain_guidelines: dict = None, stakeholders: List[str] = None) -> List[EnhancedUserStory]:
-        """Use AI to analyze requirement and extract enhanced user stories with context awareness"""
+    def extract_stories_many_sync(self, requirements: List[Requirement], existing_stories: List[dict] = None, max_concurrency: int = None) -> List[StoryExtractionResult]:
+        """Blocking wrapper around extract_stories_many for callers without an event loop"""
+        async def _run():
+            try:
+                return await self.extract_stories_many(requirements, existing_stories, max_concurrency)
+            finally:
+                # asyncio.run closes the loop on return, so the AI client's connections on it are released first
+                await self.ai_client.aclose_async_client()
+        
+        return asyncio.run(_run())
+    
+    def extract_stories_batch_offline(self, requirements: List[Requirement], existing_stories: List[dict] = None) -> List[StoryExtractionResult]:
+        """Extract stories for a bulk, non-interactive run through the provider's Batch API
+        
+        Requirements with a cached response skip the batch. Any requirement the batch does not answer,
+        including all of them when it fails or misses AI_BATCH_TIMEOUT_SECONDS, is extracted directly.
+        """
+        prepared = []
+        for requirement in requirements:
+            context, domain_guidelines, stakeholders = self._prepare_extraction(requirement)
+            messages = self._build_extraction_messages(requirement, context, domain_guidelines, stakeholders)
+            prepared.append((requirement, context, messages, self._response_cache_key(messages, 0.3)))
+        
+        contents = {}
+        pending = []
+        for i, (requirement, _, messages, cache_key) in enumerate(prepared):
+            cached = self._cached_response(cache_key, requirement)
+            if cached is not None:
+                contents[i] = (cached, True)
+            else:
+                pending.append((str(i), messages))
+        
+        if pending:
+            try:
+                batch_contents = self.ai_client.run_batch(
+                    pending,
+                    temperature=0.3,
+                    max_tokens=_MAX_TOKENS_PER_REQUIREMENT,
+                    poll_interval=getattr(Settings, 'AI_BATCH_POLL_SECONDS', 60),
+                    timeout=getattr(Settings, 'AI_BATCH_TIMEOUT_SECONDS', None),
+                    response_format=_response_format(_STORIES_RESPONSE_FORMAT)
+                )
+            except Exception as e:
+                self.logger.warning(f"Batch API run failed, extracting directly: {str(e)}")
+                batch_contents = {}
+            for custom_id, content in batch_contents.items():
+                contents[int(custom_id)] = (content, False)
+        
+        results = [None] * len(prepared)
+        direct = []
+        for i, (requirement, context, _, cache_key) in enumerate(prepared):
+            if i not in contents:
+                direct.append(i)
+                continue
+            content, from_cache = contents[i]
+            try:
+                stories_data, salvaged = self._parse_stories_response(content)
+                stories = self._create_stories(stories_data)
+                if not from_cache and not salvaged:
+                    self._store_response(cache_key, requirement, content)
+                results[i] = self._finalize_extraction(requirement, stories, context, existing_stories, salvaged)
+            except Exception as e:
+                results[i] = self._failed_result(requirement, Exception(f"AI analysis failed: {str(e)}"))
+        
+        if direct:
+            self.logger.info(f"Extracting {len(direct)} requirements directly after the batch run")
+            direct_results = self.extract_stories_many_sync([prepared[i][0] for i in direct], existing_stories)
+            for i, result in zip(direct, direct_results):
+                results[i] = result
+        return results
+    
+    def _failed_result(self, requirement: Requirement, error: Exception) -> StoryExtractionResult:
+        """Log a failed extraction and wrap it in an unsuccessful result"""
+        self.logger.error(f"Story extraction failed: {str(error)}")
+        return StoryExtractionResult(
+            requirement_id=str(requirement.id),
+            requirement_title=requirement.title,
+            stories=[],
+            extraction_successful=False,
+            error_message=str(error)
+        )
+    
+    def _prepare_extraction(self, requirement: Requirement) -> tuple:
+        """Gather the context, domain guidelines and stakeholders that shape the AI prompt"""
+        # Enhanced requirement analysis
+        requirement_context = self._analyze_requirement_context(requirement)
+        self.logger.debug("Requirement context: %s", requirement_context)
+        
+        # Get domain-specific guidelines
+        domain_guidelines = self._get_domain_guidelines(requirement_context.get('domain', 'general'))
         
-        prompt = self._build_extraction_prompt(requirement, context, domain_guidelines, stakeholders)
+        # Analyze stakeholders and user personas
+        stakeholders = self._identify_stakeholders(requirement)
+        self.logger.debug("Identified stakeholders: %s", stakeholders)
         
+        return requirement_context, domain_guidelines, stakeholders
+    
+    def extract_stories_batch(self, requirements: List[Requirement], existing_stories: List[dict] = None) -> List[StoryExtractionResult]:
+        """Extract stories for several requirements, sending up to STORY_EXTRACTION_BATCH_SIZE of them per AI call"""
+        batch_size = max(1, getattr(Settings, 'STORY_EXTRACTION_BATCH_SIZE', 5))
+        results = []
+        for start in range(0, len(requirements), batch_size):
+            results.extend(self._extract_stories_chunk(requirements[start:start + batch_size], existing_stories))
+        return results
+    
+    def _extract_stories_chunk(self, requirements: List[Requirement], existing_stories: List[dict] = None) -> List[StoryExtractionResult]:
+        """Run one batched AI call for a chunk of requirements, falling back to single extraction on failure"""
+        if len(requirements) == 1:
+            return [self.extract_stories(requirements[0], existing_stories)]
+        
+        self.logger.info(f"Starting batched story extraction for {len(requirements)} requirements")
+        contexts = [self._analyze_requirement_context(requirement) for requirement in requirements]
         try:
-            # Use the unified AI client for chat completion with enhanced system prompt
-            content = self.ai_client.chat_completion(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_enhanced_system_prompt(context, domain_guidelines)
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=3000  # Increased token limit for more detailed stories
-            )
-            
-            # Log the raw AI response for debugging
-            self.logger.debug(f"Raw AI response: {repr(content)}")
-            self.logger.debug(f"AI response length: {len(content)} characters")
-            
-            # Check if response is empty
-            if not content or not content.strip():
-                raise Exception("AI returned empty response")
-            
-            # Clean up the response (remove markdown code blocks if present)
-            content = content.strip()
-            if content.startswith('```json'):
-                content = content[7:]  # Remove ```json
-            if content.startswith('```'):
-                content = content[3:]   # Remove ```
-            if content.endswith('```'):
-                content = content[:-3]  # Remove trailing ```
-            content = content.strip()
+            stories_by_id = self._analyze_requirements_with_ai_batch(requirements, contexts)
+        except Exception as e:
+            self.logger.warning(f"Batched story extraction failed, extracting individually: {str(e)}")
+            return [self.extract_stories(requirement, existing_stories) for requirement in requirements]
+        
+        results = []
+        for requirement, context in zip(requirements, contexts):
+            stories = stories_by_id.get(str(requirement.id))
+            if stories is None:
+                self.logger.warning(f"Batched response had no stories for requirement {requirement.id}, extracting individually")
+                results.append(self.extract_stories(requirement, existing_stories))
+                continue
+            try:
+                results.append(self._finalize_extraction(requirement, stories, context, existing_stories))
+            except Exception as e:
+                results.append(self._failed_result(requirement, e))
+        return results
+    
+    def _finalize_extraction(self, requirement: Requirement, stories: List[EnhancedUserStory], context: dict, existing_stories: List[dict] = None, salvaged: bool = False) -> StoryExtractionResult:
+        """Refine, de-duplicate and prioritize the AI stories for a requirement"""
+        # Enhanced story validation and refinement
+        stories = self._refine_and_validate_stories(stories, context)
+        
+        # Filter out duplicates and convert EnhancedUserStory to UserStory
+        filtered_stories = self._filter_duplicate_stories(stories, existing_stories or [])
+        
+        # Add story prioritization and dependencies
+        prioritized_stories = self._prioritize_stories(filtered_stories, context)
+        
+        return StoryExtractionResult(
+            requirement_id=str(requirement.id),
+            requirement_title=requirement.title,
+            stories=prioritized_stories,
+            extraction_successful=True,
+            salvaged=salvaged
+        )
+    
+    def _analyze_requirements_with_ai_batch(self, requirements: List[Requirement], contexts: List[dict]) -> Dict[str, List[EnhancedUserStory]]:
+        """Use one AI call to extract stories for several requirements, keyed by requirement id"""
+        prompt = self._build_batch_extraction_prompt(requirements, contexts)
+        max_tokens = min(
+            _MAX_TOKENS_PER_REQUIREMENT * len(requirements),
+            getattr(Settings, 'STORY_EXTRACTION_BATCH_MAX_TOKENS', 16000)
+        )
+        
+        content = self.ai_client.chat_completion(
+            messages=[
+                {
+                    "role": "system",
+                    "content": self._get_enhanced_system_prompt()
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=0.3,
+            max_tokens=max_tokens,
+            response_format=_response_format(_BATCH_STORIES_RESPONSE_FORMAT)
+        )
+        
+        stories_by_id = {}
+        for result in self._parse_ai_json(content).get("results", []):
+            stories_by_id[str(result.get("id"))] = self._create_stories(result.get("stories", []))
+        
+        self.logger.info(f"Batched AI call returned stories for {len(stories_by_id)} of {len(requirements)} requirements")
+        return stories_by_id
+    
+    def _analyze_requirement_with_ai(self, requirement: Requirement, context: dict = None, domain_guidelines: dict = None, stakeholders: List[str] = None) -> Tuple[List[EnhancedUserStory], bool]:
+        """Use AI to analyze requirement and extract enhanced user stories with context awareness
+        
+        Returns the stories and whether they were salvaged from a truncated or malformed response.
+        """
+        
+        messages = self._build_extraction_messages(requirement, context, domain_guidelines, stakeholders)
+        
+        parts = self._split_oversized_requirement(requirement, count_message_tokens(messages))
+        if parts:
+            results = [self._analyze_requirement_with_ai(part, context, domain_guidelines, stakeholders) for part in parts]
+            return [story for stories, _ in results for story in stories], any(salvaged for _, salvaged in results)
+        
+        cache_key = self._response_cache_key(messages, 0.3)
+        
+        try:
+            content = self._cached_response(cache_key, requirement)
+            from_cache = content is not None
+            stories = []
+            salvaged = False
+            if not from_cache and getattr(Settings, 'STORY_STREAMING_ENABLED', False):
+                # Build each story (and run its complexity analysis) while the rest of the response generates
+                parser = _StreamedStoryParser()
+                stories = list(self._iter_streamed_stories(messages, parser))
+                content = parser.content
+                if stories:
+                    # The streamed stories are exactly what a salvage would recover, so only the flag is needed
+                    salvaged = self._parse_stories_response(content)[1]
+            elif not from_cache:
+                # Use the unified AI client for chat completion with enhanced system prompt
+                content = self.ai_client.chat_completion(
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=_MAX_TOKENS_PER_REQUIREMENT,  # Increased token limit for more detailed stories
+                    response_format=_response_format(_STORIES_RESPONSE_FORMAT)
+                )
             
-            self.logger.debug(f"Cleaned AI response: {repr(content[:200])}...")
+            if not stories:
+                stories_data, salvaged = self._parse_stories_response(content)
+                stories = self._create_stories(stories_data)
+            if not from_cache and not salvaged:
+                self._store_response(cache_key, requirement, content)
             
-            # Parse JSON response
-            try:
-                stories_data = json.loads(content)
-            except json.JSONDecodeError as e:
-                self.logger.error(f"JSON parse error: {e}")
-                self.logger.error(f"Failed to parse response: {content[:500]}...")  # Log first 500 chars
-                raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
+            self.logger.info(f"Successfully created {len(stories)} enhanced user stories")
+            return stories, salvaged
             
-            # Convert to EnhancedUserStory objects
-            stories = []
-            for story_data in stories_data.get("stories", []):
-                # Handle acceptance criteria format
-                acceptance_criteria = story_data.get("acceptance_criteria", [])
-                if isinstance(acceptance_criteria, str):
-                    acceptance_criteria = acceptance_criteria.split("\n")
-                
-                # Combine description, technical_context, and business_requirements
-                description = story_data.get("description", "")
-                technical_context = story_data.get("technical_context", "")
-                business_requirements = story_data.get("business_requirements", "")
-                
-                # Format the complete description with HTML formatting
-                full_description = description
-                if technical_context:
-                    full_description += f"<br><br><strong>Technical Context:</strong><br>{technical_context}"
-                if business_requirements:
-                    full_description += f"<br><br><strong>Business Requirements:</strong><br>{business_requirements}"
-                
-                # Create an enhanced story with complexity analysis and additional metadata
-                story = self.story_creator.create_enhanced_story(
-                    heading=story_data["heading"],
-                    description=full_description,
-                    acceptance_criteria=acceptance_criteria
+        except Exception as e:
+            raise Exception(f"AI analysis failed: {str(e)}")
+    
+    def _split_oversized_requirement(self, requirement: Requirement, prompt_tokens: int) -> List[Requirement]:
+        """Split a requirement whose prompt plus response budget overflows LLM_CONTEXT_WINDOW; [] when it fits
+        
+        The description is cut at paragraph breaks into parts that each fit alongside the rest of the prompt.
+        """
+        context_window = getattr(Settings, 'LLM_CONTEXT_WINDOW', 0)
+        if context_window <= 0 or prompt_tokens + _MAX_TOKENS_PER_REQUIREMENT <= context_window:
+            return []
+        
+        budget = context_window - _MAX_TOKENS_PER_REQUIREMENT - (prompt_tokens - estimate_tokens(requirement.description))
+        if budget <= 0:
+            raise Exception(f"Prompt exceeds the {context_window}-token context window even without the requirement description")
+        
+        chunks = []
+        current, current_tokens = [], 0
+        for paragraph in _PARAGRAPH_BREAK_RE.split(requirement.description):
+            paragraph_tokens = estimate_tokens(paragraph)
+            if current and current_tokens + paragraph_tokens > budget:
+                chunks.append('\n\n'.join(current))
+                current, current_tokens = [], 0
+            if paragraph_tokens > budget:
+                # A single paragraph over budget is cut into slices of proportional length
+                step = max(1, len(paragraph) * budget // paragraph_tokens)
+                chunks.extend(paragraph[i:i + step] for i in range(0, len(paragraph), step))
+                continue
+            current.append(paragraph)
+            current_tokens += paragraph_tokens
+        if current:
+            chunks.append('\n\n'.join(current))
+        
+        self.logger.warning(
+            f"Requirement {requirement.id} needs {prompt_tokens} prompt tokens, over the {context_window}-token context window; "
+            f"extracting it in {len(chunks)} parts"
+        )
+        return [requirement.model_copy(update={'description': chunk}) for chunk in chunks]
+    
+    def _iter_streamed_stories(self, messages: List[dict], parser: _StreamedStoryParser) -> Iterator[EnhancedUserStory]:
+        """Stream the completion and yield each enhanced story as soon as its JSON object is complete"""
+        for delta in self.ai_client.chat_completion_stream(
+            messages=messages,
+            temperature=0.3,
+            max_tokens=_MAX_TOKENS_PER_REQUIREMENT,
+            response_format=_response_format(_STORIES_RESPONSE_FORMAT)
+        ):
+            for story_data in parser.feed(delta):
+                yield from self._create_stories([story_data])
+    
+    async def _analyze_requirement_with_ai_async(self, requirement: Requirement, context: dict = None, domain_guidelines: dict = None, stakeholders: List[str] = None) -> Tuple[List[EnhancedUserStory], bool]:
+        """Async variant of _analyze_requirement_with_ai using the AI client's async chat completion"""
+        messages = self._build_extraction_messages(requirement, context, domain_guidelines, stakeholders)
+        prompt_tokens = count_message_tokens(messages)
+        
+        parts = self._split_oversized_requirement(requirement, prompt_tokens)
+        if parts:
+            results = [await self._analyze_requirement_with_ai_async(part, context, domain_guidelines, stakeholders) for part in parts]
+            return [story for stories, _ in results for story in stories], any(salvaged for _, salvaged in results)
+        
+        cache_key = self._response_cache_key(messages, 0.3)
+        
+        try:
+            content = self._cached_response(cache_key, requirement)
+            from_cache = content is not None
+            if not from_cache:
+                # Pace against the provider's RPM/TPM quota; the token budget counts the completion allowance too
+                await self.rate_limiter.acquire(prompt_tokens + _MAX_TOKENS_PER_REQUIREMENT)
+                content = await self.ai_client.chat_completion_async(
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=_MAX_TOKENS_PER_REQUIREMENT,
+                    response_format=_response_format(_STORIES_RESPONSE_FORMAT)
                 )
-                
-                # Note: story_points is automatically calculated and stored in story.complexity_analysis.story_points
-                # by the enhanced_story_creator during complexity analysis
-                
-                stories.append(story)
+            
+            stories_data, salvaged = self._parse_stories_response(content)
+            stories = self._create_stories(stories_data)
+            if not from_cache and not salvaged:
+                self._store_response(cache_key, requirement, content)
             
             self.logger.info(f"Successfully created {len(stories)} enhanced user stories")
-            return stories
+            return stories, salvaged
             
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
         except Exception as e:
             raise Exception(f"AI analysis failed: {str(e)}")
     
+    def _response_cache_key(self, messages: List[dict], temperature: float) -> str:
+        """Cache key for a prompt, or None when the response cache is disabled"""
+        if self.llm_cache is None:
+            return None
+        return LLMResponseCache.make_key(messages, getattr(self.ai_client, 'request_model', ''), temperature)
+    
+    def _cached_response(self, cache_key: str, requirement: Requirement) -> str:
+        """Return a cached raw response for an identical prompt, or failing that a near-duplicate requirement"""
+        if cache_key is not None:
+            content = self.llm_cache.get(cache_key)
+            if content is not None:
+                self.logger.info("Using cached AI response for identical prompt")
+                return content
+        if self.semantic_cache is not None:
+            content = self.semantic_cache.get(self._semantic_cache_text(requirement))
+            if content is not None:
+                self.logger.info(f"Using cached AI response from a near-duplicate of requirement {requirement.id}")
+                return content
+        return None
+    
+    def _store_response(self, cache_key: str, requirement: Requirement, content: str):
+        """Remember a raw response that parsed into stories so identical or similar requirements can reuse it"""
+        if cache_key is not None:
+            self.llm_cache.set(cache_key, content)
+        if self.semantic_cache is not None:
+            self.semantic_cache.set(self._semantic_cache_text(requirement), content)
+    
+    @staticmethod
+    def _semantic_cache_text(requirement: Requirement) -> str:
+        return f"{requirement.title}\n{requirement.description}"
+    
+    def _build_extraction_messages(self, requirement: Requirement, context: dict = None, domain_guidelines: dict = None, stakeholders: List[str] = None) -> List[dict]:
+        """Build the system and user messages for a single-requirement extraction"""
+        return [
+            _system_message(*_system_prompt_variant(context)),
+            {
+                "role": "user", 
+                "content": self._build_extraction_prompt(requirement, context, domain_guidelines, stakeholders)
+            }
+        ]
+    
+    def _parse_ai_json(self, content: str) -> dict:
+        """Strip markdown code fences from an AI response and parse it as JSON"""
+        # Log the raw AI response for debugging
+        self.logger.debug("Raw AI response: %r", content)
+        self.logger.debug("AI response length: %d characters", len(content))
+        
+        # Check if response is empty
+        if not content or not content.strip():
+            raise Exception("AI returned empty response")
+        
+        # Clean up the response (remove markdown code blocks if present)
+        content = _CODE_FENCE_RE.sub('', content.strip()).strip()
+        
+        self.logger.debug("Cleaned AI response: %r...", content[:200])
+        
+        # Parse JSON response
+        try:
+            return _json_loads(content)
+        except json.JSONDecodeError as e:
+            self.logger.error(f"JSON parse error: {e}")
+            self.logger.error(f"Failed to parse response: {content[:500]}...")  # Log first 500 chars
+            raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
+
+    def _parse_stories_response(self, content: str) -> Tuple[List[dict], bool]:
+        """Parse the "stories" array, salvaging the complete stories when the JSON is cut off or malformed"""
+        try:
+            return self._parse_ai_json(content).get("stories", []), False
+        except Exception:
+            salvaged = _StreamedStoryParser().feed(content or '')
+            if not salvaged:
+                raise
+            self.logger.warning(f"Salvaged {len(salvaged)} complete stories from a truncated or malformed AI response")
+            return salvaged, True
+    
+    def _create_stories(self, stories_data: List[dict]) -> List[EnhancedUserStory]:
+        """Turn the story objects from an AI response into enhanced user stories"""
+        if len(stories_data) <= 1:
+            return [self._create_story(story_data) for story_data in stories_data]
+        
+        # Each story's complexity analysis is its own AI call, so run them side by side; map keeps story order
+        max_workers = min(getattr(Settings, 'LLM_MAX_CONCURRENCY', 4), len(stories_data))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='story-creator') as executor:
+            return list(executor.map(self._create_story, stories_data))
+    
+    def _create_story(self, story_data: dict) -> EnhancedUserStory:
+        """Turn one story object from an AI response into an enhanced user story"""
+        # Handle acceptance criteria format
+        acceptance_criteria = story_data.get("acceptance_criteria", [])
+        if isinstance(acceptance_criteria, str):
+            acceptance_criteria = acceptance_criteria.split("\n")
+        
+        # Combine description, technical_context, and business_requirements
+        description = story_data.get("description", "")
+        technical_context = story_data.get("technical_context", "")
+        business_requirements = story_data.get("business_requirements", "")
+        
+        # Format the complete description with HTML formatting
+        full_description = description
+        if technical_context:
+            full_description += f"<br><br><strong>Technical Context:</strong><br>{technical_context}"
+        if business_requirements:
+            full_description += f"<br><br><strong>Business Requirements:</strong><br>{business_requirements}"
+        
+        # Create an enhanced story with complexity analysis and additional metadata
+        # Note: story_points is automatically calculated and stored in story.complexity_analysis.story_points
+        # by the enhanced_story_creator during complexity analysis
+        return self.story_creator.create_enhanced_story(
+            heading=story_data["heading"],
+            description=full_description,
+            acceptance_criteria=acceptance_criteria
+        )
+
+    def _build_batch_extraction_prompt(self, requirements: List[Requirement], contexts: List[dict]) -> str:
+        """Build one prompt asking for stories for each of several requirements"""
+        batch = {
+            "requirements": [
+                {
+                    "id": str(requirement.id),
+                    "title": requirement.title,
+                    "description": requirement.description,
+                    "domain": context.get('domain', 'general'),
+                    "complexity": context.get('complexity', 'medium'),
+                    "stakeholders": self._identify_stakeholders(requirement)
+                }
+                for requirement, context in zip(requirements, contexts)
+            ]
+        }
+        
+        return f"""
+Please analyze each of the following requirements and extract user stories from it.
+Keep each requirement's stories separate and return them under that requirement's id.
+
+**Requirements:**
+{json.dumps(batch, indent=2)}
+""" + _STORY_GUIDELINES + """
+**Required JSON Response Format:**
+{
+    "results": [
+        {
+            "id": "Requirement id exactly as given",
+            "stories": [
+""" + _STORY_JSON_FORMAT + """
+            ]
+        }
+    ]
+}
+
+Return one entry in "results" for every requirement. Return only valid JSON, no additional text.
+"""
+    
     def _build_extraction_prompt(self, requirement: Requirement, context: dict = None, domain_guidelines: dict = None, stakeholders: List[str] = None) -> str:
         """Build the prompt for AI analysis with enhanced context"""
         
@@ -206,41 +837,11 @@ Please analyze the following requirement and extract user stories from it.
 **Identified Stakeholders:** {', '.join(stakeholders)}
 """
         
-        base_prompt += """
-**Instructions:**
-1. Break down this requirement into 2-6 logical user stories based on complexity and scope
-2. Each story should be focused on a single piece of functionality
-3. Ensure stories are independent and deliverable
-4. Consider the domain context and stakeholders when crafting stories
-5. Write clear acceptance criteria that are testable and specific
-6. Include edge cases and error scenarios where relevant
-7. Consider non-functional requirements (performance, security, usability)
-
-**Story Quality Guidelines:**
-- Headlines should be specific and action-oriented
-- Descriptions should include both user value and technical context
-- Acceptance criteria should cover happy path, edge cases, and error scenarios
-- Stories should be sized for 1-3 day development efforts
-- Include relevant business rules and constraints
-
+        base_prompt += _STORY_GUIDELINES + """
 **Required JSON Response Format:**
 {
     "stories": [
-        {
-            "heading": "Specific, action-oriented title",
-            "description": "As a [specific user type], I want [specific goal] so that [clear benefit]",
-            "technical_context": "Technical details and implementation requirements",
-            "business_requirements": "Business rules, constraints, and requirements",
-            "acceptance_criteria": [
-                "Given [specific context/state] When [specific action] Then [specific outcome] And [additional outcomes]",
-                "Given [error condition] When [action] Then [error handling behavior]",
-                "Given [edge case] When [action] Then [expected behavior]"
-            ],
-            "priority": "High|Medium|Low",
-            "story_points": "1|2|3|5|8",
-            "dependencies": ["Other stories this depends on"],
-            "business_value": "Clear statement of business value"
-        }
+""" + _STORY_JSON_FORMAT + """
     ]
 }
 
@@ -251,97 +852,15 @@ Return only valid JSON, no additional text.
     
     def _get_enhanced_system_prompt(self, context: dict = None, domain_guidelines: dict = None) -> str:
         """Get enhanced system prompt based on context"""
-        
-        base_prompt = """You are a senior business analyst and product owner with deep expertise in agile development, user story creation, and domain-driven design.
-
-Your expertise includes:
-- Breaking down complex requirements into implementable user stories
-- Understanding user journeys and personas across different domains
-- Identifying dependencies and story relationships
-- Ensuring stories are testable, valuable, and appropriately sized
-- Incorporating non-functional requirements and business rules
-- Risk-based story prioritization
-
-**CORE PRINCIPLES:**
-1. **User-Centric**: Every story should deliver clear value to a specific user type
-2. **INVEST Criteria**: Stories should be Independent, Negotiable, Valuable, Estimable, Small, Testable
-3. **Definition of Ready**: Stories should have clear acceptance criteria and dependencies
-4. **Business Value**: Each story should articulate its business impact
-5. **Technical Feasibility**: Consider implementation complexity and constraints
-
-**STORY STRUCTURE REQUIREMENTS:**
-- **Heading**: Action-oriented, specific, under 80 characters
-- **Description**: Follow "As a [specific persona], I want [specific capability] so that [business value]" format
-- **Technical Context**: Separate field with technical details, implementation requirements, and system interactions
-- **Business Requirements**: Separate field with business rules, constraints, and domain-specific requirements
-- **Acceptance Criteria**: Use Given/When/Then format, cover positive, negative, and edge cases
-- **Priority**: Based on business value, risk, and dependencies
-- **Story Points**: Relative sizing (1=simple, 2=straightforward, 3=moderate, 5=complex, 8=very complex)
-"""
-        
-        # Add domain-specific context
-        if context and context.get('domain') != 'general':
-            domain = context.get('domain')
-            base_prompt += f"""
-**DOMAIN EXPERTISE - {domain.upper()}:**
-You have specialized knowledge in {domain} domain including:
-- Industry-specific workflows and user journeys
-- Regulatory requirements and compliance needs
-- Common integration patterns and technical constraints
-- Domain-specific security and performance requirements
-- Typical user personas and their goals
-"""
-        
-        # Add complexity awareness
-        if context and context.get('complexity'):
-            complexity = context.get('complexity')
-            if complexity == 'high':
-                base_prompt += """
-**COMPLEXITY AWARENESS:**
-This is a high-complexity requirement. Focus on:
-- Breaking down into smaller, manageable stories
-- Identifying technical risks and dependencies
-- Including infrastructure and non-functional stories
-- Planning for integration and testing complexity
-"""
-        
-        base_prompt += """
-**OUTPUT FORMAT:**
-Provide response as valid JSON only. Ensure all stories are well-formed and follow the specified structure.
-"""
-        
-        return base_prompt
+        return _system_prompt(*_system_prompt_variant(context))
     
     def validate_stories(self, stories: List[EnhancedUserStory]) -> List[str]:
         """Validate a list of enhanced user stories"""
-        issues = []
-        
-        for i, story in enumerate(stories):
-            story_num = i + 1
-            
-            # Check heading
-            if not story.heading or len(story.heading.strip()) < 5:
-                issues.append(f"Story {story_num}: Heading too short or missing")
-            
-            if len(story.heading) > 100:
-                issues.append(f"Story {story_num}: Heading too long (over 100 characters)")
-            
-            # Check description
-            if not story.description or len(story.description.strip()) < 10:
-                issues.append(f"Story {story_num}: Description too short or missing")
-            
-            # Check acceptance criteria
-            if not story.acceptance_criteria:
-                issues.append(f"Story {story_num}: No acceptance criteria provided")
-            elif len(story.acceptance_criteria) < 1:
-                issues.append(f"Story {story_num}: At least one acceptance criteria required")
-            
-            # Check each acceptance criteria
-            for j, criteria in enumerate(story.acceptance_criteria):
-                if not criteria or len(criteria.strip()) < 5:
-                    issues.append(f"Story {story_num}, Criteria {j+1}: Too short or empty")
-        
-        return issues
+        try:
+            _STORY_LIST_VALIDATOR.validate_python(stories)
+        except ValidationError as e:
+            return [_story_validation_issue(error) for error in e.errors()]
+        return []
     
     def _analyze_requirement_context(self, requirement: Requirement) -> dict:
         """Analyze requirement to extract context for better story generation"""
@@ -590,25 +1109,63 @@ Provide response as valid JSON only. Ensure all stories are well-formed and foll
         """Filter out duplicate stories while preserving EnhancedUserStory objects with complexity analysis"""
         filtered_stories = []
         
-        self.logger.debug(f"Checking against {len(existing_stories)} existing stories")
+        self.logger.debug("Checking against %d existing stories", len(existing_stories))
+        
+        # Hash the existing stories once so each new story is an O(1) lookup
+        existing_keys = {
+            self._story_dedupe_key(es.get('heading'), es.get('description'), es.get('acceptance_criteria'))
+            for es in existing_stories
+        }
+        
+        near_duplicates = self._get_near_duplicate_index(existing_stories)
         
         for story in stories:
             # Check for duplicates
-            is_duplicate = any(
-                story.heading == es.get('heading') and
-                story.description == es.get('description') and
-                story.acceptance_criteria == es.get('acceptance_criteria')
-                for es in existing_stories
-            )
+            is_duplicate = self._story_dedupe_key(story.heading, story.description, story.acceptance_criteria) in existing_keys
+            if not is_duplicate and near_duplicates is not None:
+                is_duplicate = bool(near_duplicates.query(self._story_minhash(story.heading, story.description)))
             
             if not is_duplicate:
                 # Keep the EnhancedUserStory object to preserve complexity analysis and story points
                 filtered_stories.append(story)
             else:
-                self.logger.debug(f"Duplicate story filtered out: {story.heading}")
+                self.logger.debug("Duplicate story filtered out: %s", story.heading)
         
         return filtered_stories
     
+    @staticmethod
+    def _story_dedupe_key(heading, description, acceptance_criteria) -> tuple:
+        """Hashable identity of a story; lists become tuples so they compare exactly as before"""
+        if isinstance(acceptance_criteria, list):
+            acceptance_criteria = tuple(acceptance_criteria)
+        return heading, description, acceptance_criteria
+    
+    def _get_near_duplicate_index(self, existing_stories: List[dict]):
+        """MinHash LSH index over the existing stories, reused while they are unchanged"""
+        threshold = getattr(Settings, 'STORY_NEAR_DUPLICATE_THRESHOLD', 0.85)
+        if MinHashLSH is None or threshold <= 0 or not existing_stories:
+            return None
+        
+        fingerprint = (threshold, hash(tuple((es.get('heading'), es.get('description')) for es in existing_stories)))
+        cached = getattr(self, '_near_duplicate_index', None)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        
+        lsh = MinHashLSH(threshold=threshold, num_perm=_MINHASH_PERMUTATIONS)
+        for i, es in enumerate(existing_stories):
+            lsh.insert(str(i), self._story_minhash(es.get('heading'), es.get('description')))
+        self._near_duplicate_index = (fingerprint, lsh)
+        return lsh
+    
+    @staticmethod
+    def _story_minhash(heading: str, description: str):
+        """MinHash of the story's normalized text, shingled into overlapping character runs"""
+        text = ' '.join(f"{heading or ''} {description or ''}".lower().split())
+        minhash = MinHash(num_perm=_MINHASH_PERMUTATIONS)
+        for i in range(max(1, len(text) - _SHINGLE_SIZE + 1)):
+            minhash.update(text[i:i + _SHINGLE_SIZE].encode('utf-8'))
+        return minhash
+    
     def _prioritize_stories(self, stories: List[EnhancedUserStory], context: dict) -> List[EnhancedUserStory]:
         """Prioritize stories based on business value and dependencies"""
         # Simple prioritization based on context
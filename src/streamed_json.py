@@ -0,0 +1,78 @@
+"""
+Incremental parsing of streamed JSON responses
+Lets AI callers act on each item of a response array while the rest is still generating
+"""
+
+import json
+from typing import List
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib parser
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+class StreamedArrayParser:
+    """Pulls each complete object out of the array under key in a streamed response's root object as soon as it closes"""
+    
+    def __init__(self, key: str):
+        self.key = key
+        self._chunks = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_chars = None   # characters of a string being read directly inside the root object
+        self._last_key = None
+        self._in_array = False
+        self._item_chars = None  # characters of the array item being read
+        self.array_closed = False
+    
+    @property
+    def content(self) -> str:
+        return ''.join(self._chunks)
+    
+    def feed(self, delta: str) -> List[dict]:
+        """Consume the next chunk of response text and return any array items it completed"""
+        self._chunks.append(delta)
+        completed = []
+        for ch in delta:
+            if self._item_chars is not None:
+                self._item_chars.append(ch)
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        self._last_key = ''.join(self._key_chars)
+                        self._key_chars = None
+                elif self._key_chars is not None:
+                    self._key_chars.append(ch)
+                continue
+            
+            if ch == '"':
+                self._in_string = True
+                self._key_chars = [] if self._depth == 1 else None
+            elif ch == '{' or ch == '[':
+                self._depth += 1
+                if ch == '[' and self._depth == 2 and self._last_key == self.key:
+                    self._in_array = True
+                elif ch == '{' and self._depth == 3 and self._in_array:
+                    self._item_chars = ['{']
+            elif ch == '}' or ch == ']':
+                if ch == '}' and self._depth == 3 and self._item_chars is not None:
+                    try:
+                        completed.append(_json_loads(''.join(self._item_chars)))
+                    except ValueError:
+                        pass  # Balanced but malformed; leave it for the full-response parse to report
+                    self._item_chars = None
+                elif ch == ']' and self._depth == 2 and self._in_array:
+                    self._in_array = False
+                    self.array_closed = True
+                self._depth -= 1
+        return completed
@@ -2,237 +2,166 @@
 Test Case Extractor using AI to generate comprehensive test cases from user stories
 """
 
+import asyncio
 import json
 import logging
-from typing import List, Dict, Any
+import re
+import sys
+import threading
+from collections import Counter
+from typing import List, Dict, Any, Iterator, Tuple
 
 from src.models import UserStory, TestCase, TestCaseExtractionResult
 from config.settings import Settings
-from src.ai_client import get_ai_client
+from src.ai_client import count_message_tokens, get_ai_client
+from src.llm_cache import LLMResponseCache, get_llm_cache
+from src.rate_limiter import LLMRateLimiter
+from src.semantic_cache import get_semantic_cache
+from src.streamed_json import StreamedArrayParser
 from src.token_stats_manager import get_token_stats_manager
 
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib parser
+    orjson = None
 
-class TestCaseExtractor:
-    """Extracts test cases from user stories using AI"""
-
-    def __init__(self, use_toon: bool = None):
-        self.settings = Settings()
-        self.ai_client = get_ai_client()
-        self.logger = logging.getLogger(__name__)
-        # Use setting from config if not explicitly provided
-        self.use_toon = use_toon if use_toon is not None else getattr(Settings, 'USE_TOON', True)
-        
-        # Log which AI service is being used
-        ai_provider = getattr(Settings, 'AI_SERVICE_PROVIDER', 'OPENAI')
-        self.logger.info(f"🤖 TestCaseExtractor: Initialized with AI provider '{ai_provider}'")
-        self.logger.info(f"📊 TOON Mode: {'Enabled' if self.use_toon else 'Disabled'} (Token Optimization)")
-        if ai_provider == 'AZURE_OPENAI':
-            deployment = getattr(Settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', 'Unknown')
-            self.logger.info(f"🔷 TestCaseExtractor: Using Azure OpenAI deployment '{deployment}'")
-        else:
-            model = getattr(Settings, 'OPENAI_MODEL', 'Unknown')
-            self.logger.info(f"🔶 TestCaseExtractor: Using OpenAI model '{model}'")
+try:
+    import ahocorasick
+except ImportError:  # Optional: context keywords are matched with one scan per keyword without pyahocorasick
+    ahocorasick = None
 
-    def extract_test_cases(self, user_story: UserStory, parent_story_id: str = None) -> TestCaseExtractionResult:
-        """Extract test cases from a user story using AI"""
+# AI responses are parsed with orjson when available; its JSONDecodeError subclasses json.JSONDecodeError
+_json_loads = orjson.loads if orjson is not None else json.loads
 
-        try:
-            self.logger.info(f"Starting test case extraction for story: {user_story.heading}")
+# A whole JSON string literal (escapes included) or a brace; strings are matched whole so braces inside them are skipped.
+# The string branch is written as unrolled runs of plain characters so the regex engine does not branch per character.
+_JSON_STRING_OR_BRACE_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]')
 
-            # Prepare the prompt for AI service
-            prompt = self._build_extraction_prompt(user_story)
 
-            # Call AI service with better error handling
-            try:
-                # Use TOON system prompt if enabled for token optimization
-                system_prompt = self._get_system_prompt_toon() if self.use_toon else self._get_system_prompt()
-                
-                # Estimate tokens for comparison (non-TOON vs TOON)
-                from src.ai_client import count_message_tokens
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ]
-                
-                # Calculate what the prompt would have been without TOON
-                if self.use_toon:
-                    non_toon_system = self._get_system_prompt()
-                    non_toon_prompt = self._build_extraction_prompt_standard(user_story)
-                    estimated_tokens_without_toon = count_message_tokens([
-                        {"role": "system", "content": non_toon_system},
-                        {"role": "user", "content": non_toon_prompt}
-                    ])
-                else:
-                    estimated_tokens_without_toon = count_message_tokens(messages)
-                
-                response_content = self.ai_client.chat_completion(
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=3000
-                )
-                
-                # Get actual token usage from API
-                token_usage = self.ai_client.get_last_token_usage()
-                actual_tokens = token_usage.get('prompt_tokens', 0)
-                
-                # Calculate tokens saved
-                tokens_saved = estimated_tokens_without_toon - actual_tokens if self.use_toon else 0
-                
-                # Validate that we got a response
-                if not response_content or not response_content.strip():
-                    raise ValueError("Empty response from AI service")
-                
-                self.logger.debug(f"AI response length: {len(response_content)} characters")
-                
-            except Exception as ai_error:
-                error_msg = f"AI service error: {str(ai_error)}"
-                self.logger.error(error_msg)
-                
-                # Return a result with a generic test case
-                generic_test_case = TestCase(
-                    title="Validate User Story - AI Service Unavailable",
-                    description="Generic test case created when AI service was unavailable",
-                    test_type="positive",
-                    test_steps=[
-                        "1. Review the user story requirements",
-                        "2. Execute the main functionality manually",  
-                        "3. Verify expected behavior",
-                        "4. Document any issues found"
-                    ],
-                    expected_result="Functionality works as described in the user story.",
-                    preconditions=["System is available for testing"],
-                    priority="Medium",
-                    parent_story_id=parent_story_id
-                )
-                
-                return TestCaseExtractionResult(
-                    story_id=parent_story_id or "unknown",
-                    story_title=user_story.heading,
-                    test_cases=[generic_test_case],
-                    extraction_successful=False,
-                    error_message=error_msg
-                )
-
-            # Parse the response
-            test_cases = self._parse_test_cases_response(response_content)
-            
-            # Validate that we got some test cases
-            if not test_cases:
-                self.logger.warning("No test cases were extracted from AI response")
-                # Create a fallback test case
-                fallback_test_case = TestCase(
-                    title="Manual Validation Required",
-                    description="Please manually create test cases for this user story",
-                    test_type="positive",
-                    test_steps=["1. Review user story", "2. Create appropriate test cases"],
-                    expected_result="Test cases are created and validated.",
-                    preconditions=["User story is well-defined"],
-                    priority="Medium",
-                    parent_story_id=parent_story_id
-                )
-                test_cases = [fallback_test_case]
-
-            self.logger.info(f"Successfully extracted {len(test_cases)} test cases")
-            self.logger.info(f"Token usage - Estimated (non-TOON): {estimated_tokens_without_toon}, Actual: {actual_tokens}, Saved: {tokens_saved}")
-            
-            # Save token usage statistics
-            try:
-                token_manager = get_token_stats_manager()
-                token_manager.add_record(
-                    story_id=parent_story_id or "unknown",
-                    story_title=user_story.heading,
-                    estimated_tokens=estimated_tokens_without_toon,
-                    actual_tokens=actual_tokens,
-                    tokens_saved=tokens_saved,
-                    toon_enabled=self.use_toon
-                )
-            except Exception as stats_error:
-                self.logger.warning(f"Failed to save token stats: {stats_error}")
-            
-            return TestCaseExtractionResult(
-                story_id=parent_story_id or "unknown",
-                story_title=user_story.heading,
-                test_cases=test_cases,
-                extraction_successful=True,
-                error_message="",
-                estimated_tokens=estimated_tokens_without_toon,
-                actual_tokens=actual_tokens,
-                tokens_saved=tokens_saved,
-                toon_enabled=self.use_toon
-            )
-
-        except Exception as e:
-            error_msg = f"Failed to extract test cases: {str(e)}"
-            self.logger.error(error_msg)
-
-            return TestCaseExtractionResult(
-                story_id=parent_story_id or "unknown",
-                story_title=user_story.heading,
-                test_cases=[],
-                extraction_successful=False,
-                error_message=error_msg
-            )
+def _find_json_span(content: str) -> Tuple[int, int]:
+    """Start and end of the first balanced JSON object in content
+    
+    One regex pass finds the closing brace; start is -1 when there is no object and end is
+    len(content) when it never closes.
+    """
+    start = content.find('{')
+    if start == -1:
+        return -1, -1
+    depth = 0
+    for match in _JSON_STRING_OR_BRACE_RE.finditer(content, start):
+        token = match.group()
+        if token == '{':
+            depth += 1
+        elif token == '}':
+            depth -= 1
+            if depth == 0:
+                return start, match.end()
+    return start, len(content)
+
+
+# Stories with less text than this (heading, description and acceptance criteria) skip context analysis
+_MIN_CONTEXT_TEXT_LENGTH = 40
+
+# Common user type patterns
+_USER_TYPE_PATTERNS = [
+    re.compile(r'(?:as an?|as a)\s+([a-zA-Z\s]+?)(?:,|\s+I)', re.IGNORECASE),
+    re.compile(r'(?:user|customer|admin|manager|employee|student|patient)\w*', re.IGNORECASE),
+    re.compile(r'(?:logged[\s-]?in|authenticated|authorized)\s+user', re.IGNORECASE)
+]
+
+# Common data elements, as whole words in one alternation so the text is scanned once
+_DATA_ELEMENT_RE = re.compile(
+    r'\b(?:email|password|username|name|address|phone|date|amount|price|quantity'
+    r'|id|code|number|reference|token|key'
+    r'|status|type|category|level|priority)\b',
+    re.IGNORECASE
+)
+
+# Application domains and their keywords, matched as substrings; the domain with the most keyword hits wins
+_DOMAIN_KEYWORDS = {
+    'e-commerce': ['shop', 'cart', 'order', 'payment', 'product', 'checkout', 'purchase'],
+    'banking': ['account', 'transfer', 'balance', 'transaction', 'loan', 'credit'],
+    'healthcare': ['patient', 'medical', 'appointment', 'prescription', 'diagnosis'],
+    'education': ['student', 'course', 'grade', 'assignment', 'enrollment'],
+    'hrms': ['employee', 'payroll', 'leave', 'performance', 'attendance']
+}
 
-    def _get_system_prompt_toon(self) -> str:
-        """Get the TOON-optimized system prompt for test case extraction (reduced token usage)"""
-        return """QA Expert. Generate test cases using Token Oriented Object Notation (TOON).
 
-**TOON FORMAT:**
-- Use abbrev. for common terms
-- Compact structure
-- Remove redundant words
-- Key fields only
+def _best_domain(domain_hits: Counter) -> str:
+    """The domain with the most keyword hits, or 'general' when nothing matched or the lead is tied"""
+    ranked = domain_hits.most_common(2)
+    if not ranked or (len(ranked) > 1 and ranked[0][1] == ranked[1][1]):
+        return 'general'
+    return ranked[0][0]
 
-**Abbreviations:**
-TC=TestCase, desc=description, exp=expected, prereq=prerequisites, pos=positive, neg=negative, 
-edge=edge_case, sec=security, perf=performance, steps=test_steps, prio=priority, 
-auth=authentication, val=validation, UI=user_interface, API=application_interface, 
-DB=database, max=maximum, min=minimum, req=required, opt=optional
 
-**Test Types:** pos|neg|edge|sec|perf|integ
+# Integration keywords; a '.' stands for an optional space or hyphen
+_INTEGRATION_KEYWORDS = [
+    'api', 'service', 'database', 'external', 'third.party', 'integration',
+    'payment.gateway', 'notification', 'email', 'sms', 'webhook'
+]
+_INTEGRATION_PATTERNS = [
+    (keyword.replace('.', ' '), re.compile(keyword.replace('.', r'[\s\-]?'), re.IGNORECASE))
+    for keyword in _INTEGRATION_KEYWORDS
+]
 
-**Priorities:** Crit|High|Med|Low
+# Security keywords, matched as word prefixes
+_SECURITY_KEYWORDS = [
+    'login', 'authentication', 'authorization', 'permission', 'access',
+    'secure', 'encrypt', 'privacy', 'gdpr', 'compliance', 'audit'
+]
+_SECURITY_PATTERNS = [(keyword, re.compile(rf'\b{keyword}\w*', re.IGNORECASE)) for keyword in _SECURITY_KEYWORDS]
 
-**Coverage Areas:**
-1. Happy path (pos scenarios) - PRIORITIZE: Generate 8-10 positive test cases
-2. Error handling (neg/edge) - Generate 3-4 negative test cases
-3. Boundaries (min/max limits) - Generate 2-3 edge cases
-4. Security (auth/authz) - Generate 1-2 security test cases
-5. Integration points
-6. Data validation
 
-**Output Format (JSON):**
-{
-  "tcs": [
-    {
-      "t": "Action Verb + Specific Target",
-      "desc": "Brief objective",
-      "type": "pos|neg|edge|sec",
-      "prio": "Crit|High|Med|Low",
-      "steps": ["1.Action+input", "2.Verify+criteria"],
-      "exp": "Clear outcome.",
-      "prereq": "Setup needs",
-      "data": {"valid":[],"invalid":[],"boundary":[]},
-      "auto": "High|Med|Low",
-      "time": "5m|15m|30m|1h"
-    }
-  ],
-  "cov": {
-    "func": ["area1","area2"],
-    "risk": ["high_risk1"]
-  }
+def _build_context_keyword_automaton():
+    """Aho-Corasick automaton over every domain, integration and security keyword
+    
+    Each entry maps a lower-case keyword to its (category, label) tags. Integration keywords are
+    added once per spelling of their optional separator.
+    """
+    tags = {}
+    for domain, keywords in _DOMAIN_KEYWORDS.items():
+        for keyword in keywords:
+            tags.setdefault(keyword, []).append(('domain', domain))
+    for keyword in _INTEGRATION_KEYWORDS:
+        for separator in ('', ' ', '-', '\t', '\n') if '.' in keyword else ('',):
+            tags.setdefault(keyword.replace('.', separator), []).append(('integration', keyword.replace('.', ' ')))
+    for keyword in _SECURITY_KEYWORDS:
+        tags.setdefault(keyword, []).append(('security', keyword))
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_tags in tags.items():
+        automaton.add_word(keyword, (len(keyword), tuple(keyword_tags)))
+    automaton.make_automaton()
+    return automaton
+
+
+_CONTEXT_KEYWORD_AUTOMATON = _build_context_keyword_automaton() if ahocorasick is not None else None
+
+# JavaScript-isms the model sometimes writes into its JSON
+_JS_REPEAT_RE = re.compile(r'"a"\.repeat\(\d+\)')
+_JS_COMMENT_RE = re.compile(r'//.*$', re.MULTILINE)
+
+# Pattern for test case blocks in a non-JSON response
+_FALLBACK_TITLE_RE = re.compile(r'(?i)(?:test\s*case|title|tc\s*\d+)[:\-\s]*([^\n]+)')
+
+# TOON abbreviation mappings
+_TOON_TYPE_MAP = {
+    "pos": "positive",
+    "neg": "negative",
+    "edge": "edge_case",
+    "sec": "security",
+    "perf": "performance",
+    "integ": "integration"
 }
 
-**Title Rules:**
-- Start: Verify|Test|Check|Validate|Handle|Ensure
-- Be specific
-- No generic titles
-
-Generate practical, executable TCs with good coverage."""
+_TOON_PRIORITY_MAP = {
+    "Crit": "Critical",
+    "Med": "Medium"
+}
 
-    def _get_system_prompt(self) -> str:
-        """Get the system prompt for test case extraction"""
-        return """You are a senior QA engineer and test architect with expertise in comprehensive test design patterns, risk-based testing, and modern testing methodologies.
+# System prompts for test case extraction; they never vary, so each message is built once and shared read-only
+_SYSTEM_PROMPT = """You are a senior QA engineer and test architect with expertise in comprehensive test design patterns, risk-based testing, and modern testing methodologies.
 
 Your task is to analyze user stories and generate strategic, high-value test cases that cover:
 
@@ -317,6 +246,591 @@ Format your response as JSON with the following structure:
 
 Ensure test cases are practical, executable, and provide good coverage of the functionality."""
 
+# TOON-optimized system prompt (reduced token usage)
+_SYSTEM_PROMPT_TOON = """QA Expert. Generate test cases using Token Oriented Object Notation (TOON).
+
+**TOON FORMAT:**
+- Use abbrev. for common terms
+- Compact structure
+- Remove redundant words
+- Key fields only
+
+**Abbreviations:**
+TC=TestCase, desc=description, exp=expected, prereq=prerequisites, pos=positive, neg=negative, 
+edge=edge_case, sec=security, perf=performance, steps=test_steps, prio=priority, 
+auth=authentication, val=validation, UI=user_interface, API=application_interface, 
+DB=database, max=maximum, min=minimum, req=required, opt=optional
+
+**Test Types:** pos|neg|edge|sec|perf|integ
+
+**Priorities:** Crit|High|Med|Low
+
+**Coverage Areas:**
+1. Happy path (pos scenarios) - PRIORITIZE: Generate 8-10 positive test cases
+2. Error handling (neg/edge) - Generate 3-4 negative test cases
+3. Boundaries (min/max limits) - Generate 2-3 edge cases
+4. Security (auth/authz) - Generate 1-2 security test cases
+5. Integration points
+6. Data validation
+
+**Output Format (JSON):**
+{
+  "tcs": [
+    {
+      "t": "Action Verb + Specific Target",
+      "desc": "Brief objective",
+      "type": "pos|neg|edge|sec",
+      "prio": "Crit|High|Med|Low",
+      "steps": ["1.Action+input", "2.Verify+criteria"],
+      "exp": "Clear outcome.",
+      "prereq": "Setup needs",
+      "data": {"valid":[],"invalid":[],"boundary":[]},
+      "auto": "High|Med|Low",
+      "time": "5m|15m|30m|1h"
+    }
+  ],
+  "cov": {
+    "func": ["area1","area2"],
+    "risk": ["high_risk1"]
+  }
+}
+
+**Title Rules:**
+- Start: Verify|Test|Check|Validate|Handle|Ensure
+- Be specific
+- No generic titles
+
+Generate practical, executable TCs with good coverage."""
+
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+_SYSTEM_MESSAGE_TOON = {"role": "system", "content": _SYSTEM_PROMPT_TOON}
+
+# JSON schemas of one test case in each response format, enforced server-side when structured outputs are enabled.
+# They keep only the fields a TestCase is built from; strict mode needs every property required and no others.
+_TOON_TEST_CASE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "t": {"type": "string"},
+        "desc": {"type": "string"},
+        "type": {"type": "string", "enum": list(_TOON_TYPE_MAP)},
+        "prio": {"type": "string", "enum": ["Crit", "High", "Med", "Low"]},
+        "steps": {"type": "array", "items": {"type": "string"}},
+        "exp": {"type": "string"},
+        "prereq": {"type": "string"}
+    },
+    "required": ["t", "desc", "type", "prio", "steps", "exp", "prereq"],
+    "additionalProperties": False
+}
+
+_STANDARD_TEST_CASE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "test_type": {"type": "string", "enum": list(_TOON_TYPE_MAP.values())},
+        "priority": {"type": "string", "enum": ["Critical", "High", "Medium", "Low"]},
+        "steps": {"type": "array", "items": {"type": "string"}},
+        "expected_result": {"type": "string"},
+        "prerequisites": {"type": "string"}
+    },
+    "required": ["title", "description", "test_type", "priority", "steps", "expected_result", "prerequisites"],
+    "additionalProperties": False
+}
+
+
+def _test_cases_object_schema(key: str, test_case_schema: dict, **properties) -> dict:
+    """Schema of an object holding an array of test cases under key, after any extra properties"""
+    properties = {**properties, key: {"type": "array", "items": test_case_schema}}
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+
+def _json_schema_response_format(name: str, schema: dict) -> dict:
+    return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+
+
+def _batch_response_format(key: str, test_case_schema: dict) -> dict:
+    """Response format of a batched call: one entry of test cases per story, tagged with its story_index"""
+    story_schema = _test_cases_object_schema(key, test_case_schema, story_index={"type": "integer"})
+    return _json_schema_response_format(f"{key}_by_story", {
+        "type": "object",
+        "properties": {"results": {"type": "array", "items": story_schema}},
+        "required": ["results"],
+        "additionalProperties": False
+    })
+
+
+_TOON_RESPONSE_FORMAT = _json_schema_response_format("tcs", _test_cases_object_schema("tcs", _TOON_TEST_CASE_SCHEMA))
+_STANDARD_RESPONSE_FORMAT = _json_schema_response_format("test_cases", _test_cases_object_schema("test_cases", _STANDARD_TEST_CASE_SCHEMA))
+_TOON_BATCH_RESPONSE_FORMAT = _batch_response_format("tcs", _TOON_TEST_CASE_SCHEMA)
+_STANDARD_BATCH_RESPONSE_FORMAT = _batch_response_format("test_cases", _STANDARD_TEST_CASE_SCHEMA)
+
+# Settings that decide which AI client get_ai_client builds; a change to any of them needs a new client
+_AI_CLIENT_SETTINGS = (
+    'AI_SERVICE_PROVIDER', 'OPENAI_API_KEY', 'OPENAI_MODEL',
+    'AZURE_OPENAI_ENDPOINT', 'AZURE_OPENAI_API_KEY', 'AZURE_OPENAI_API_VERSION', 'AZURE_OPENAI_DEPLOYMENT_NAME', 'AZURE_OPENAI_MODEL',
+    'GITHUB_API_BASE', 'GITHUB_TOKEN', 'GITHUB_MODEL'
+)
+
+
+class TestCaseExtractor:
+    """Extracts test cases from user stories using AI"""
+
+    # One AI client shared by every extractor, rebuilt only when the provider configuration changes
+    _shared_ai_client = None
+    _shared_ai_client_config = None
+    _shared_ai_client_lock = threading.Lock()
+
+    def __init__(self, use_toon: bool = None):
+        self.settings = Settings
+        self.ai_client = self._get_shared_ai_client()
+        self.rate_limiter = LLMRateLimiter.from_settings()
+        self.llm_cache = get_llm_cache()
+        self.semantic_cache = get_semantic_cache('semantic_test_cases')
+        self._inflight_requests = {}  # Prompt key -> future of the async AI call in flight for it
+        self.logger = logging.getLogger(__name__)
+        # Use setting from config if not explicitly provided
+        self.use_toon = use_toon if use_toon is not None else getattr(Settings, 'USE_TOON', True)
+        
+        # Log which AI service is being used
+        ai_provider = getattr(Settings, 'AI_SERVICE_PROVIDER', 'OPENAI')
+        self.logger.info("🤖 TestCaseExtractor: Initialized with AI provider '%s'", ai_provider)
+        self.logger.info("📊 TOON Mode: %s (Token Optimization)", 'Enabled' if self.use_toon else 'Disabled')
+        if ai_provider == 'AZURE_OPENAI':
+            deployment = getattr(Settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', 'Unknown')
+            self.logger.info("🔷 TestCaseExtractor: Using Azure OpenAI deployment '%s'", deployment)
+        else:
+            model = getattr(Settings, 'OPENAI_MODEL', 'Unknown')
+            self.logger.info("🔶 TestCaseExtractor: Using OpenAI model '%s'", model)
+
+    @classmethod
+    def _get_shared_ai_client(cls):
+        config = tuple(getattr(Settings, name, None) for name in _AI_CLIENT_SETTINGS)
+        with cls._shared_ai_client_lock:
+            if cls._shared_ai_client is None or cls._shared_ai_client_config != config:
+                cls._shared_ai_client = get_ai_client()
+                cls._shared_ai_client_config = config
+            return cls._shared_ai_client
+
+    def extract_test_cases(self, user_story: UserStory, parent_story_id: str = None) -> TestCaseExtractionResult:
+        """Extract test cases from a user story using AI"""
+
+        try:
+            self.logger.info("Starting test case extraction for story: %s", user_story.heading)
+
+            # Call AI service with better error handling
+            try:
+                messages, estimated_tokens_without_toon = self._build_request(user_story)
+                
+                cache_key = self._response_cache_key(messages, 0.7)
+                response_content = self._cached_response(cache_key, user_story)
+                from_cache = response_content is not None
+                parsed = None
+                # Only stream when the provider reports usage for streams, so token stats stay real
+                stream = (getattr(Settings, 'TEST_CASE_STREAMING_ENABLED', False)
+                          and getattr(self.ai_client, 'stream_usage_supported', False))
+                if not from_cache and stream:
+                    # Build each test case while the rest of the response generates
+                    parser = StreamedArrayParser('tcs' if self.use_toon else 'test_cases')
+                    test_cases = list(self._iter_streamed_test_cases(messages, parser))
+                    response_content = parser.content
+                    if test_cases:
+                        parsed = (test_cases, parser.array_closed)
+                elif not from_cache:
+                    response_content = self.ai_client.chat_completion(
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=3000,
+                        response_format=self._response_format()
+                    )
+                
+                actual_tokens = self._check_response(response_content, from_cache)
+                
+            except Exception as ai_error:
+                return self._ai_unavailable_result(user_story, parent_story_id, ai_error)
+
+            return self._handle_response(
+                user_story, parent_story_id, response_content, cache_key, from_cache, estimated_tokens_without_toon, actual_tokens, parsed
+            )
+
+        except Exception as e:
+            return self._failed_result(user_story, parent_story_id, e)
+
+    def extract_test_cases_batch(self, user_stories: List[UserStory], parent_story_ids: List[str] = None) -> List[TestCaseExtractionResult]:
+        """Extract test cases for several stories, sending up to TEST_CASE_EXTRACTION_BATCH_SIZE of them per AI call"""
+        batch_size = max(1, getattr(Settings, 'TEST_CASE_EXTRACTION_BATCH_SIZE', 5))
+        parent_story_ids = parent_story_ids or [None] * len(user_stories)
+        results = []
+        for start in range(0, len(user_stories), batch_size):
+            results.extend(self._extract_test_cases_chunk(
+                user_stories[start:start + batch_size], parent_story_ids[start:start + batch_size]
+            ))
+        return results
+
+    def _extract_test_cases_chunk(self, user_stories: List[UserStory], parent_story_ids: List[str]) -> List[TestCaseExtractionResult]:
+        """Answer a chunk of stories from the response caches, then one batched AI call for the rest
+        
+        Stories the batched call fails or leaves out are extracted individually.
+        """
+        results = [None] * len(user_stories)
+        pending = []  # (position, cache key, non-TOON token estimate) of each story that needs the AI
+        for position, (user_story, parent_story_id) in enumerate(zip(user_stories, parent_story_ids)):
+            try:
+                messages, estimated_tokens_without_toon = self._build_request(user_story)
+                cache_key = self._response_cache_key(messages, 0.7)
+                response_content = self._cached_response(cache_key, user_story)
+                if response_content is None:
+                    pending.append((position, cache_key, estimated_tokens_without_toon))
+                    continue
+                results[position] = self._handle_response(
+                    user_story, parent_story_id, response_content, cache_key, True, estimated_tokens_without_toon, 0
+                )
+            except Exception as e:
+                results[position] = self._failed_result(user_story, parent_story_id, e)
+        
+        if len(pending) == 1:
+            position = pending[0][0]
+            results[position] = self.extract_test_cases(user_stories[position], parent_story_ids[position])
+        elif pending:
+            self.logger.info("Starting batched test case extraction for %d stories", len(pending))
+            try:
+                batch_results, prompt_tokens = self._extract_test_cases_with_ai_batch([user_stories[p] for p, _, _ in pending])
+            except Exception as e:
+                self.logger.warning("Batched test case extraction failed, extracting individually: %s", e)
+                batch_results, prompt_tokens = None, 0
+            
+            for index, (position, cache_key, estimated_tokens_without_toon) in enumerate(pending):
+                user_story, parent_story_id = user_stories[position], parent_story_ids[position]
+                if batch_results is None or index not in batch_results:
+                    if batch_results is not None:
+                        self.logger.warning("Batched response had no test cases for story %s, extracting individually", user_story.heading)
+                    results[position] = self.extract_test_cases(user_story, parent_story_id)
+                    continue
+                test_cases, response_content = batch_results[index]
+                try:
+                    # The stories share the batched call's prompt, so each is charged an equal part of it
+                    results[position] = self._handle_response(
+                        user_story, parent_story_id, response_content, cache_key, False,
+                        estimated_tokens_without_toon, prompt_tokens // len(pending), (test_cases, True)
+                    )
+                except Exception as e:
+                    results[position] = self._failed_result(user_story, parent_story_id, e)
+        return results
+
+    def _extract_test_cases_with_ai_batch(self, user_stories: List[UserStory]) -> Tuple[Dict[int, Tuple[List[TestCase], str]], int]:
+        """Use one AI call to build test cases for several stories, keyed by position in user_stories
+        
+        Each story's test cases come with the single-story response they amount to, so that it can be
+        cached like one, and the call's prompt tokens are returned alongside.
+        """
+        key = 'tcs' if self.use_toon else 'test_cases'
+        max_tokens = min(3000 * len(user_stories), getattr(Settings, 'TEST_CASE_EXTRACTION_BATCH_MAX_TOKENS', 16000))
+        
+        response_content = self.ai_client.chat_completion(
+            messages=[
+                _SYSTEM_MESSAGE_TOON if self.use_toon else _SYSTEM_MESSAGE,
+                {"role": "user", "content": self._build_batch_extraction_prompt(user_stories)}
+            ],
+            temperature=0.7,
+            max_tokens=max_tokens,
+            response_format=self._response_format(batch=True)
+        )
+        prompt_tokens = self._check_response(response_content, False)
+        
+        batch_results = {}
+        for entry in self._parse_batch_response(response_content).get("results", []):
+            index = entry.get("story_index")
+            if isinstance(index, int) and 0 <= index < len(user_stories) and entry.get(key):
+                story_response = {key: entry[key]}
+                batch_results[index] = (self._build_test_cases_from_parsed(story_response), json.dumps(story_response))
+        
+        self.logger.info("Batched AI call returned test cases for %d of %d stories", len(batch_results), len(user_stories))
+        return batch_results, prompt_tokens
+
+    def _parse_batch_response(self, response_content: str) -> Dict:
+        """Parse a batched response, ignoring any text or code fence around its JSON object"""
+        try:
+            return _json_loads(response_content)
+        except json.JSONDecodeError:
+            json_start, json_end = _find_json_span(response_content)
+            if json_start == -1:
+                raise
+            return _json_loads(response_content[json_start:json_end])
+
+    async def extract_test_cases_async(self, user_story: UserStory, parent_story_id: str = None) -> TestCaseExtractionResult:
+        """Async variant of extract_test_cases that awaits the AI call instead of blocking on it"""
+
+        try:
+            self.logger.info("Starting async test case extraction for story: %s", user_story.heading)
+
+            try:
+                messages, estimated_tokens_without_toon = self._build_request(user_story)
+                
+                cache_key = self._response_cache_key(messages, 0.7)
+                response_content = self._cached_response(cache_key, user_story)
+                from_cache = response_content is not None
+                if not from_cache:
+                    # A response shared from an identical in-flight call counts as cached: it cost no AI call
+                    response_content, from_cache = await self._coalesced_completion(messages)
+                
+                actual_tokens = self._check_response(response_content, from_cache)
+                
+            except Exception as ai_error:
+                return self._ai_unavailable_result(user_story, parent_story_id, ai_error)
+
+            return self._handle_response(
+                user_story, parent_story_id, response_content, cache_key, from_cache, estimated_tokens_without_toon, actual_tokens
+            )
+
+        except Exception as e:
+            return self._failed_result(user_story, parent_story_id, e)
+
+    async def _coalesced_completion(self, messages: List[dict]) -> Tuple[str, bool]:
+        """Make the AI call for messages, or join the identical call already in flight
+        
+        Returns the response content and whether it came from another caller's call.
+        """
+        key = LLMResponseCache.make_key(messages, getattr(self.ai_client, 'request_model', ''), 0.7)
+        future = self._inflight_requests.get(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_requests[key] = future
+        try:
+            # Pace against the provider's RPM/TPM quota; the token budget counts the completion allowance too
+            await self.rate_limiter.acquire(count_message_tokens(messages) + 3000)
+            response_content = await self.ai_client.chat_completion_async(
+                messages=messages,
+                temperature=0.7,
+                max_tokens=3000,
+                response_format=self._response_format()
+            )
+            future.set_result(response_content)
+            return response_content, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here so an unjoined failure is not logged as never retrieved
+            raise
+        finally:
+            del self._inflight_requests[key]
+
+    async def extract_test_cases_many(self, user_stories: List[UserStory], parent_story_ids: List[str] = None, max_concurrency: int = None) -> List[TestCaseExtractionResult]:
+        """Extract test cases for several stories with at most max_concurrency AI calls in flight"""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or getattr(Settings, 'LLM_MAX_CONCURRENCY', 4)))
+        parent_story_ids = parent_story_ids or [None] * len(user_stories)
+        
+        async def _extract(user_story: UserStory, parent_story_id: str) -> TestCaseExtractionResult:
+            async with semaphore:
+                return await self.extract_test_cases_async(user_story, parent_story_id)
+        
+        return await asyncio.gather(*(_extract(story, story_id) for story, story_id in zip(user_stories, parent_story_ids)))
+
+    def extract_test_cases_many_sync(self, user_stories: List[UserStory], parent_story_ids: List[str] = None, max_concurrency: int = None) -> List[TestCaseExtractionResult]:
+        """Blocking wrapper around extract_test_cases_many for callers without an event loop"""
+        async def _run():
+            try:
+                return await self.extract_test_cases_many(user_stories, parent_story_ids, max_concurrency)
+            finally:
+                # asyncio.run closes the loop on return, so the AI client's connections on it are released first
+                await self.ai_client.aclose_async_client()
+        
+        return asyncio.run(_run())
+
+    def _iter_streamed_test_cases(self, messages: List[dict], parser: StreamedArrayParser) -> Iterator[TestCase]:
+        """Stream the completion and yield each test case as soon as its JSON object is complete"""
+        to_test_case = self._toon_test_case if parser.key == 'tcs' else self._standard_test_case
+        count = 0
+        for delta in self.ai_client.chat_completion_stream(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=3000,
+            response_format=self._response_format()
+        ):
+            for tc_data in parser.feed(delta):
+                count += 1
+                yield to_test_case(tc_data, count)
+
+    def _response_format(self, batch: bool = False):
+        """The structured-output response format for the prompt format in use, or None when disabled"""
+        if not getattr(Settings, 'TEST_CASE_STRUCTURED_OUTPUTS_ENABLED', False):
+            return None
+        if batch:
+            return _TOON_BATCH_RESPONSE_FORMAT if self.use_toon else _STANDARD_BATCH_RESPONSE_FORMAT
+        return _TOON_RESPONSE_FORMAT if self.use_toon else _STANDARD_RESPONSE_FORMAT
+
+    def _build_request(self, user_story: UserStory) -> Tuple[List[dict], int]:
+        """Build the prompt messages and the token estimate the same prompt would need without TOON"""
+        # Prepare the prompt for AI service
+        prompt = self._build_extraction_prompt(user_story)
+        
+        # Use TOON system prompt if enabled for token optimization
+        messages = [
+            _SYSTEM_MESSAGE_TOON if self.use_toon else _SYSTEM_MESSAGE,
+            {"role": "user", "content": prompt}
+        ]
+        
+        # Calculate what the prompt would have been without TOON
+        if self.use_toon:
+            non_toon_prompt = self._build_extraction_prompt_standard(user_story)
+            estimated_tokens_without_toon = count_message_tokens([
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": non_toon_prompt}
+            ])
+        else:
+            estimated_tokens_without_toon = count_message_tokens(messages)
+        
+        return messages, estimated_tokens_without_toon
+
+    def _check_response(self, response_content: str, from_cache: bool) -> int:
+        """Reject an empty response and return the prompt tokens the AI call used"""
+        # Get actual token usage from API; a cached response sent no prompt.
+        # Concurrent async calls share the client's last-usage record, so their counts are approximate.
+        token_usage = {} if from_cache else self.ai_client.get_last_token_usage()
+        
+        # Validate that we got a response
+        if not response_content or not response_content.strip():
+            raise ValueError("Empty response from AI service")
+        
+        self.logger.debug("AI response length: %d characters", len(response_content))
+        return token_usage.get('prompt_tokens', 0)
+
+    def _ai_unavailable_result(self, user_story: UserStory, parent_story_id: str, ai_error: Exception) -> TestCaseExtractionResult:
+        """Result holding a generic test case when the AI service call failed"""
+        error_msg = f"AI service error: {str(ai_error)}"
+        self.logger.error(error_msg)
+        
+        # Return a result with a generic test case
+        generic_test_case = TestCase(
+            title="Validate User Story - AI Service Unavailable",
+            description="Generic test case created when AI service was unavailable",
+            test_type="positive",
+            test_steps=[
+                "1. Review the user story requirements",
+                "2. Execute the main functionality manually",  
+                "3. Verify expected behavior",
+                "4. Document any issues found"
+            ],
+            expected_result="Functionality works as described in the user story.",
+            preconditions=["System is available for testing"],
+            priority="Medium",
+            parent_story_id=parent_story_id
+        )
+        
+        return TestCaseExtractionResult(
+            story_id=parent_story_id or "unknown",
+            story_title=user_story.heading,
+            test_cases=[generic_test_case],
+            extraction_successful=False,
+            error_message=error_msg
+        )
+
+    def _handle_response(self, user_story: UserStory, parent_story_id: str, response_content: str, cache_key: str, from_cache: bool, estimated_tokens_without_toon: int, actual_tokens: int, parsed: Tuple[List[TestCase], bool] = None) -> TestCaseExtractionResult:
+        """Parse an AI response into test cases, cache it and record token statistics
+        
+        parsed carries test cases already built from a streamed response, with whether its array closed.
+        """
+        # Calculate tokens saved
+        tokens_saved = estimated_tokens_without_toon - actual_tokens if self.use_toon and not from_cache else 0
+        
+        # Parse the response
+        test_cases, parsed_json = parsed or self._parse_test_cases_response(response_content)
+        
+        # Only well-formed responses are cached; text-parsed fallbacks are not worth repeating
+        if test_cases and parsed_json and not from_cache:
+            self._store_response(cache_key, user_story, response_content)
+        
+        # Validate that we got some test cases
+        if not test_cases:
+            self.logger.warning("No test cases were extracted from AI response")
+            # Create a fallback test case
+            fallback_test_case = TestCase(
+                title="Manual Validation Required",
+                description="Please manually create test cases for this user story",
+                test_type="positive",
+                test_steps=["1. Review user story", "2. Create appropriate test cases"],
+                expected_result="Test cases are created and validated.",
+                preconditions=["User story is well-defined"],
+                priority="Medium",
+                parent_story_id=parent_story_id
+            )
+            test_cases = [fallback_test_case]
+
+        self.logger.info("Successfully extracted %d test cases", len(test_cases))
+        self.logger.info("Token usage - Estimated (non-TOON): %s, Actual: %s, Saved: %s", estimated_tokens_without_toon, actual_tokens, tokens_saved)
+        
+        # Save token usage statistics
+        try:
+            token_manager = get_token_stats_manager()
+            token_manager.add_record(
+                story_id=parent_story_id or "unknown",
+                story_title=user_story.heading,
+                estimated_tokens=estimated_tokens_without_toon,
+                actual_tokens=actual_tokens,
+                tokens_saved=tokens_saved,
+                toon_enabled=self.use_toon
+            )
+        except Exception as stats_error:
+            self.logger.warning("Failed to save token stats: %s", stats_error)
+        
+        return TestCaseExtractionResult(
+            story_id=parent_story_id or "unknown",
+            story_title=user_story.heading,
+            test_cases=test_cases,
+            extraction_successful=True,
+            error_message="",
+            estimated_tokens=estimated_tokens_without_toon,
+            actual_tokens=actual_tokens,
+            tokens_saved=tokens_saved,
+            toon_enabled=self.use_toon
+        )
+
+    def _failed_result(self, user_story: UserStory, parent_story_id: str, error: Exception) -> TestCaseExtractionResult:
+        """Log a failed extraction and wrap it in an unsuccessful result"""
+        error_msg = f"Failed to extract test cases: {str(error)}"
+        self.logger.error(error_msg)
+
+        return TestCaseExtractionResult(
+            story_id=parent_story_id or "unknown",
+            story_title=user_story.heading,
+            test_cases=[],
+            extraction_successful=False,
+            error_message=error_msg
+        )
+
+    def _response_cache_key(self, messages: List[dict], temperature: float) -> str:
+        """Cache key for a prompt, or None when the response cache is disabled"""
+        if self.llm_cache is None:
+            return None
+        return LLMResponseCache.make_key(messages, getattr(self.ai_client, 'request_model', ''), temperature)
+    
+    def _cached_response(self, cache_key: str, user_story: UserStory) -> str:
+        """Return a cached raw response for an identical prompt, or failing that a near-duplicate story"""
+        if cache_key is not None:
+            content = self.llm_cache.get(cache_key)
+            if content is not None:
+                self.logger.info("Using cached AI response for identical test case prompt")
+                return content
+        if self.semantic_cache is not None:
+            content = self.semantic_cache.get(self._semantic_cache_text(user_story))
+            if content is not None:
+                self.logger.info("Using cached test cases from a near-duplicate of story: %s", user_story.heading)
+                return content
+        return None
+    
+    def _store_response(self, cache_key: str, user_story: UserStory, content: str):
+        """Remember a raw response that parsed into test cases so identical or similar stories can reuse it"""
+        if cache_key is not None:
+            self.llm_cache.set(cache_key, content)
+        if self.semantic_cache is not None:
+            self.semantic_cache.set(self._semantic_cache_text(user_story), content)
+    
+    @staticmethod
+    def _semantic_cache_text(user_story: UserStory) -> str:
+        return f"{user_story.heading}\n{user_story.description}"
+
     def _build_extraction_prompt(self, user_story: UserStory) -> str:
         """Build the extraction prompt from user story details (TOON-optimized if enabled)"""
 
@@ -325,6 +839,39 @@ Ensure test cases are practical, executable, and provide good coverage of the fu
         else:
             return self._build_extraction_prompt_standard(user_story)
     
+    def _build_batch_extraction_prompt(self, user_stories: List[UserStory]) -> str:
+        """Build one prompt asking for test cases for each of several user stories"""
+        key = 'tcs' if self.use_toon else 'test_cases'
+        batch = {
+            "stories": [
+                {
+                    "story_index": index,
+                    "title": user_story.heading,
+                    "description": user_story.description,
+                    "acceptance_criteria": user_story.acceptance_criteria,
+                    "context": self._analyze_story_context(user_story)
+                }
+                for index, user_story in enumerate(user_stories)
+            ]
+        }
+        
+        return f"""Generate test cases for each of the following user stories.
+Keep each story's test cases separate and return them under that story's story_index.
+
+**Stories:**
+{json.dumps(batch, indent=2)}
+
+Give every story the full test case distribution and coverage, with test cases in the format described above.
+
+**Required JSON Response Format:**
+{{
+  "results": [
+    {{"story_index": 0, "{key}": [...]}}
+  ]
+}}
+
+Return one entry in "results" for every story. Return only valid JSON, no additional text."""
+
     def _build_extraction_prompt_standard(self, user_story: UserStory) -> str:
         """Build standard (non-TOON) extraction prompt"""
         # Standard prompt (existing logic)
@@ -435,113 +982,110 @@ Gen comprehensive TCs with strong pos coverage."""
 
     def _analyze_story_context(self, user_story: UserStory) -> Dict[str, List[str]]:
         """Analyze user story to extract testing context"""
+        # Every matcher is case-insensitive, so the story text is joined and lowered once for all of them
+        text = f"{user_story.heading} {user_story.description}".lower()
+        full_text = f"{text} {' '.join(user_story.acceptance_criteria).lower()}"
+        if len(full_text) < _MIN_CONTEXT_TEXT_LENGTH:
+            # Too little text to yield useful context; the prompts leave the context section out
+            return {}
+        
+        if _CONTEXT_KEYWORD_AUTOMATON is not None:
+            domain, integrations, security_aspects = self._scan_context_keywords(text)
+        else:
+            domain = self._detect_domain(text)
+            integrations = self._extract_integrations(text)
+            security_aspects = self._extract_security_aspects(text)
+        
         context = {
-            'domain': self._detect_domain(user_story),
-            'user_types': self._extract_user_types(user_story),
-            'data_elements': self._extract_data_elements(user_story),
-            'integrations': self._extract_integrations(user_story),
-            'security_aspects': self._extract_security_aspects(user_story)
+            'domain': domain,
+            'user_types': self._extract_user_types(text),
+            'data_elements': self._extract_data_elements(full_text),
+            'integrations': integrations,
+            'security_aspects': security_aspects
         }
         return {k: v for k, v in context.items() if v}
     
-    def _detect_domain(self, user_story: UserStory) -> str:
-        """Detect the application domain for context-specific testing"""
-        text = f"{user_story.heading} {user_story.description}".lower()
+    def _scan_context_keywords(self, text: str) -> Tuple[str, List[str], List[str]]:
+        """Domain, integrations and security aspects from one Aho-Corasick pass over the lower-case story text
         
-        domains = {
-            'e-commerce': ['shop', 'cart', 'order', 'payment', 'product', 'checkout', 'purchase'],
-            'banking': ['account', 'transfer', 'balance', 'transaction', 'loan', 'credit'],
-            'healthcare': ['patient', 'medical', 'appointment', 'prescription', 'diagnosis'],
-            'education': ['student', 'course', 'grade', 'assignment', 'enrollment'],
-            'hrms': ['employee', 'payroll', 'leave', 'performance', 'attendance']
-        }
+        Gives the same answers as _detect_domain, _extract_integrations and _extract_security_aspects.
+        """
+        found = set()
+        domain_hits = Counter()
+        for end, (length, keyword_tags) in _CONTEXT_KEYWORD_AUTOMATON.iter(text):
+            start = end - length + 1
+            # Security keywords only count at the start of a word
+            at_word_start = start == 0 or not (text[start - 1].isalnum() or text[start - 1] == '_')
+            for category, label in keyword_tags:
+                if category == 'domain':
+                    domain_hits[label] += 1
+                elif category != 'security' or at_word_start:
+                    found.add((category, label))
         
-        for domain, keywords in domains.items():
-            if any(keyword in text for keyword in keywords):
-                return domain
-        return 'general'
+        domain = _best_domain(domain_hits)
+        integrations = [label for label, _ in _INTEGRATION_PATTERNS if ('integration', label) in found]
+        security_aspects = [keyword for keyword in _SECURITY_KEYWORDS if ('security', keyword) in found]
+        return domain, integrations[:3], security_aspects[:3]
     
-    def _extract_user_types(self, user_story: UserStory) -> List[str]:
-        """Extract different user types mentioned in the story"""
-        import re
-        text = f"{user_story.heading} {user_story.description}"
-        
-        # Common user type patterns
-        patterns = [
-            r'(?:as an?|as a)\s+([a-zA-Z\s]+?)(?:,|\s+I)',
-            r'(?:user|customer|admin|manager|employee|student|patient)\w*',
-            r'(?:logged[\s-]?in|authenticated|authorized)\s+user'
-        ]
-        
+    def _detect_domain(self, text: str) -> str:
+        """Detect the application domain for context-specific testing from the lower-case story text"""
+        domain_hits = Counter()
+        for domain, keywords in _DOMAIN_KEYWORDS.items():
+            hits = sum(text.count(keyword) for keyword in keywords)
+            if hits:
+                domain_hits[domain] = hits
+        return _best_domain(domain_hits)
+    
+    def _extract_user_types(self, text: str) -> List[str]:
+        """Extract different user types mentioned in the lower-case story text"""
         user_types = set()
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
+        for pattern in _USER_TYPE_PATTERNS:
+            matches = pattern.finditer(text)
             for match in matches:
                 user_type = match.group(1) if match.groups() else match.group(0)
-                user_types.add(user_type.strip().lower())
+                user_types.add(user_type.strip())
         
         return list(user_types)[:3]  # Limit to 3 most relevant
     
-    def _extract_data_elements(self, user_story: UserStory) -> List[str]:
-        """Extract key data elements that need testing"""
-        import re
-        text = f"{user_story.heading} {user_story.description} {' '.join(user_story.acceptance_criteria)}"
-        
-        # Common data element patterns
-        patterns = [
-            r'\b(?:email|password|username|name|address|phone|date|amount|price|quantity)\b',
-            r'\b(?:id|code|number|reference|token|key)\b',
-            r'\b(?:status|type|category|level|priority)\b'
-        ]
-        
-        data_elements = set()
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                data_elements.add(match.group(0).lower())
+    def _extract_data_elements(self, text: str) -> List[str]:
+        """Extract key data elements that need testing from the lower-case story and acceptance criteria text"""
+        data_elements = set(_DATA_ELEMENT_RE.findall(text))
         
         return list(data_elements)[:5]  # Limit to 5 most relevant
     
-    def _extract_integrations(self, user_story: UserStory) -> List[str]:
-        """Extract system integrations mentioned"""
-        import re
-        text = f"{user_story.heading} {user_story.description}"
-        
-        # Integration keywords
-        integration_keywords = [
-            'api', 'service', 'database', 'external', 'third.party', 'integration',
-            'payment.gateway', 'notification', 'email', 'sms', 'webhook'
-        ]
-        
+    def _extract_integrations(self, text: str) -> List[str]:
+        """Extract system integrations mentioned in the lower-case story text"""
         integrations = []
-        for keyword in integration_keywords:
-            pattern = keyword.replace('.', r'[\s\-]?')
-            if re.search(pattern, text, re.IGNORECASE):
-                integrations.append(keyword.replace('.', ' '))
+        for integration, pattern in _INTEGRATION_PATTERNS:
+            if pattern.search(text):
+                integrations.append(integration)
         
         return integrations[:3]  # Limit to 3 most relevant
     
-    def _extract_security_aspects(self, user_story: UserStory) -> List[str]:
-        """Extract security-related aspects"""
-        import re
-        text = f"{user_story.heading} {user_story.description}"
-        
-        security_keywords = [
-            'login', 'authentication', 'authorization', 'permission', 'access',
-            'secure', 'encrypt', 'privacy', 'gdpr', 'compliance', 'audit'
-        ]
-        
+    def _extract_security_aspects(self, text: str) -> List[str]:
+        """Extract security-related aspects from the lower-case story text"""
         security_aspects = []
-        for keyword in security_keywords:
-            if re.search(rf'\b{keyword}\w*', text, re.IGNORECASE):
+        for keyword, pattern in _SECURITY_PATTERNS:
+            if pattern.search(text):
                 security_aspects.append(keyword)
         
         return security_aspects[:3]  # Limit to 3 most relevant
 
-    def _parse_test_cases_response(self, response_content: str) -> List[TestCase]:
-        """Parse the AI response into TestCase objects (supports both TOON and standard format)"""
+    def _parse_test_cases_response(self, response_content: str) -> Tuple[List[TestCase], bool]:
+        """Parse the AI response into TestCase objects (supports both TOON and standard format)
+        
+        Returns the test cases and whether they came from the response JSON rather than a text fallback.
+        """
 
         try:
+            # Structured outputs return bare JSON, so try it as-is before any clean-up
+            try:
+                parsed_response = _json_loads(response_content)
+            except json.JSONDecodeError:
+                parsed_response = None
+            if isinstance(parsed_response, dict):
+                return self._build_test_cases_from_parsed(parsed_response), True
+
             # Clean up the response content
             response_content = response_content.strip()
 
@@ -552,169 +1096,134 @@ Gen comprehensive TCs with strong pos coverage."""
                 response_content = response_content[:-3]  # Remove ```
 
             # Fix common JavaScript-like syntax issues in JSON
-            import re
-            response_content = re.sub(r'"a"\.repeat\(\d+\)', '"a" * 255', response_content)
-            response_content = re.sub(r'//.*$', '', response_content, flags=re.MULTILINE)  # Remove JS comments
+            response_content = _JS_REPEAT_RE.sub('"a" * 255', response_content)
+            response_content = _JS_COMMENT_RE.sub('', response_content)  # Remove JS comments
             
             # Handle extra data after JSON by finding the valid JSON portion
-            # Look for the JSON object boundaries
-            json_start = response_content.find('{')
+            json_start, json_end = _find_json_span(response_content)
             if json_start == -1:
                 self.logger.warning("No JSON object found in response, trying fallback parsing")
-                return self._fallback_parse_test_cases(response_content)
-                
-            # Find the matching closing brace for the first opening brace
-            brace_count = 0
-            json_end = json_start
-            for i, char in enumerate(response_content[json_start:], json_start):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        json_end = i + 1
-                        break
+                return self._fallback_parse_test_cases(response_content), False
             
             # Extract only the JSON portion
-            if json_end > json_start:
-                json_content = response_content[json_start:json_end]
-                self.logger.debug(f"Extracted JSON content: {json_content[:200]}...")
-            else:
-                json_content = response_content
+            json_content = response_content[json_start:json_end]
+            self.logger.debug("Extracted JSON content: %.200s...", json_content)
 
             # Parse JSON
-            parsed_response = json.loads(json_content)
-            
-            # Check if this is TOON format or standard format
-            if "tcs" in parsed_response:
-                self.logger.info("Detected TOON format response")
-                return self._parse_toon_format(parsed_response)
-            else:
-                self.logger.info("Detected standard format response")
-                return self._parse_standard_format(parsed_response)
+            parsed_response = _json_loads(json_content)
+            return self._build_test_cases_from_parsed(parsed_response), True
 
         except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse JSON response: {str(e)}")
+            self.logger.error("Failed to parse JSON response: %s", e)
             
             # Log more details about the response for debugging
             if len(response_content) > 500:
-                self.logger.error(f"Response content (first 500 chars): {response_content[:500]}")
-                self.logger.error(f"Response content (last 200 chars): ...{response_content[-200:]}")
+                self.logger.error("Response content (first 500 chars): %.500s", response_content)
+                self.logger.error("Response content (last 200 chars): ...%s", response_content[-200:])
             else:
-                self.logger.error(f"Response content: {response_content}")
+                self.logger.error("Response content: %s", response_content)
             
             # Fallback: Try to extract test cases using text parsing
             self.logger.info("Falling back to text-based parsing...")
-            return self._fallback_parse_test_cases(response_content)
+            return self._fallback_parse_test_cases(response_content), False
 
         except Exception as e:
-            self.logger.error(f"Error parsing test cases: {str(e)}")
-            return []
+            self.logger.error("Error parsing test cases: %s", e)
+            return [], False
+
+    def _build_test_cases_from_parsed(self, parsed_response: Dict) -> List[TestCase]:
+        """Build TestCase objects from a parsed response in either TOON or standard format"""
+        # Check if this is TOON format or standard format
+        if "tcs" in parsed_response:
+            self.logger.info("Detected TOON format response")
+            key, to_test_case = "tcs", self._toon_test_case
+        else:
+            self.logger.info("Detected standard format response")
+            key, to_test_case = "test_cases", self._standard_test_case
 
-    def _parse_toon_format(self, parsed_response: Dict) -> List[TestCase]:
-        """Parse TOON (Token Oriented Object Notation) format response"""
-        test_cases_data = parsed_response.get("tcs", [])
-        test_cases = []
+        test_cases = [
+            to_test_case(tc_data, number)
+            for number, tc_data in enumerate(parsed_response.get(key, []), 1)
+        ]
+
+        self.logger.info("Successfully parsed %d test cases", len(test_cases))
+        return test_cases
+
+    def _toon_test_case(self, tc_data: Dict, number: int) -> TestCase:
+        """Build a TestCase from one TOON test case object; number names it when the title is missing"""
+        # Map TOON fields to standard fields
+        title = tc_data.get("t", "")
+        description = tc_data.get("desc", "")
+        test_type = _TOON_TYPE_MAP.get(tc_data.get("type", "pos"), "positive")
+        # Interned so every test case of a batch shares one copy of each priority string
+        priority = sys.intern(_TOON_PRIORITY_MAP.get(tc_data.get("prio", "Med"), tc_data.get("prio", "Medium")))
+        steps = tc_data.get("steps", [])
+        expected_result = tc_data.get("exp", "")
+        prerequisites = tc_data.get("prereq", "")
         
-        # TOON abbreviation mappings
-        type_map = {
-            "pos": "positive",
-            "neg": "negative",
-            "edge": "edge_case",
-            "sec": "security",
-            "perf": "performance",
-            "integ": "integration"
-        }
+        # Ensure prerequisites is a list
+        if isinstance(prerequisites, str):
+            prerequisites = [prerequisites] if prerequisites else []
         
-        prio_map = {
-            "Crit": "Critical",
-            "Med": "Medium"
-        }
+        # Use test steps as-is without adding numbers (ADO has default numbering)
+        formatted_steps = [step for step in map(str.strip, steps) if step]
         
-        for tc_data in test_cases_data:
-            # Map TOON fields to standard fields
-            title = tc_data.get("t", "")
-            description = tc_data.get("desc", "")
-            test_type = type_map.get(tc_data.get("type", "pos"), "positive")
-            priority = prio_map.get(tc_data.get("prio", "Med"), tc_data.get("prio", "Medium"))
-            steps = tc_data.get("steps", [])
-            expected_result = tc_data.get("exp", "")
-            prerequisites = tc_data.get("prereq", "")
-            
-            # Ensure prerequisites is a list
-            if isinstance(prerequisites, str):
-                prerequisites = [prerequisites] if prerequisites else []
-            
-            # Use test steps as-is without adding numbers (ADO has default numbering)
-            formatted_steps = [step.strip() for step in steps if step.strip()]
-            
-            # Ensure expected result ends with a period
-            if expected_result and not expected_result.endswith('.'):
-                expected_result += '.'
-            
-            # Generate title if missing
-            if not title:
-                title = description or f"Test Case {len(test_cases) + 1}"
-            
-            test_case = TestCase(
-                title=title,
-                description=description,
-                test_type=test_type,
-                test_steps=formatted_steps,
-                expected_result=expected_result,
-                preconditions=prerequisites,
-                priority=priority,
-                parent_story_id=None
-            )
-            test_cases.append(test_case)
+        # Ensure expected result ends with a period
+        if expected_result and not expected_result.endswith('.'):
+            expected_result += '.'
         
-        self.logger.info(f"Successfully parsed {len(test_cases)} test cases from TOON format")
-        return test_cases
-
-    def _parse_standard_format(self, parsed_response: Dict) -> List[TestCase]:
-        """Parse standard format response"""
-        test_cases_data = parsed_response.get("test_cases", [])
-
-        test_cases = []
-        for tc_data in test_cases_data:
-            # Handle field name mismatch: steps vs test_steps
-            steps = tc_data.get("test_steps", tc_data.get("steps", []))
-
-            # Ensure prerequisites is a list if it's a string
-            prerequisites = tc_data.get("prerequisites", "")
-            if isinstance(prerequisites, str):
-                prerequisites = [prerequisites] if prerequisites else []
-
-            # Use test steps as-is without adding numbers (ADO has default numbering)
-            formatted_steps = [step.strip() for step in steps if step.strip()]
-
-            # Ensure expected result is a complete sentence
-            expected_result = tc_data.get("expected_result", "")
-            if not expected_result.endswith('.'):
-                expected_result += '.'
-
-            # Generate a descriptive title if none provided
-            title = tc_data.get("title")
-            if not title:
-                # Create a title from test description or first test step
-                description = tc_data.get("description", "").strip()
-                first_step = next((step for step in formatted_steps if step), "")
-                title = description or first_step.split(".", 1)[-1].strip() or "Validate User Story"
-
-            test_case = TestCase(
-                title=title,
-                description=tc_data.get("description", ""),
-                test_type=tc_data.get("test_type", "positive"),
-                test_steps=formatted_steps,
-                expected_result=expected_result,
-                preconditions=prerequisites,
-                priority=tc_data.get("priority", "Medium"),
-                parent_story_id=None
-            )
-            test_cases.append(test_case)
-
-        self.logger.info(f"Successfully parsed {len(test_cases)} test cases")
-        return test_cases
+        # Generate title if missing
+        if not title:
+            title = description or f"Test Case {number}"
+        
+        return TestCase(
+            title=title,
+            description=description,
+            test_type=test_type,
+            test_steps=formatted_steps,
+            expected_result=expected_result,
+            preconditions=prerequisites,
+            priority=priority,
+            parent_story_id=None
+        )
+
+    def _standard_test_case(self, tc_data: Dict, number: int = None) -> TestCase:
+        """Build a TestCase from one standard-format test case object"""
+        # Handle field name mismatch: steps vs test_steps
+        steps = tc_data.get("test_steps", tc_data.get("steps", []))
+
+        # Ensure prerequisites is a list if it's a string
+        prerequisites = tc_data.get("prerequisites", "")
+        if isinstance(prerequisites, str):
+            prerequisites = [prerequisites] if prerequisites else []
+
+        # Use test steps as-is without adding numbers (ADO has default numbering)
+        formatted_steps = [step for step in map(str.strip, steps) if step]
+
+        # Ensure expected result is a complete sentence
+        expected_result = tc_data.get("expected_result", "")
+        if not expected_result.endswith('.'):
+            expected_result += '.'
+
+        # Generate a descriptive title if none provided
+        title = tc_data.get("title")
+        if not title:
+            # Create a title from test description or first test step
+            description = tc_data.get("description", "").strip()
+            first_step = next((step for step in formatted_steps if step), "")
+            title = description or first_step.split(".", 1)[-1].strip() or "Validate User Story"
+
+        return TestCase(
+            title=title,
+            description=tc_data.get("description", ""),
+            # Type and priority come from a handful of values; interned so test cases share one copy of each
+            test_type=sys.intern(tc_data.get("test_type", "positive")),
+            test_steps=formatted_steps,
+            expected_result=expected_result,
+            preconditions=prerequisites,
+            priority=sys.intern(tc_data.get("priority", "Medium")),
+            parent_story_id=None
+        )
 
     def _fallback_parse_test_cases(self, content: str) -> List[TestCase]:
         """Fallback method to parse test cases when JSON parsing fails"""
@@ -724,14 +1233,10 @@ Gen comprehensive TCs with strong pos coverage."""
         # Try multiple parsing strategies
         
         # Strategy 1: Look for structured text patterns
-        import re
-        
-        # Pattern for test case blocks
-        test_case_pattern = r'(?i)(?:test\s*case|title|tc\s*\d+)[:\-\s]*([^\n]+)'
-        title_matches = re.findall(test_case_pattern, content)
+        title_matches = _FALLBACK_TITLE_RE.findall(content)
         
         if title_matches:
-            self.logger.info(f"Found {len(title_matches)} potential test case titles using regex")
+            self.logger.info("Found %d potential test case titles using regex", len(title_matches))
             for i, title in enumerate(title_matches[:10]):  # Limit to 10 test cases
                 test_case = TestCase(
                     title=title.strip(),
@@ -746,7 +1251,7 @@ Gen comprehensive TCs with strong pos coverage."""
                 test_cases.append(test_case)
                 
             if test_cases:
-                self.logger.info(f"Regex parsing extracted {len(test_cases)} test cases")
+                self.logger.info("Regex parsing extracted %d test cases", len(test_cases))
                 return test_cases
 
         # Strategy 2: Simple text-based parsing (original fallback)
@@ -814,5 +1319,5 @@ Gen comprehensive TCs with strong pos coverage."""
             )
             test_cases.append(generic_test)
 
-        self.logger.info(f"Fallback parsing extracted {len(test_cases)} test cases")
+        self.logger.info("Fallback parsing extracted %d test cases", len(test_cases))
         return test_cases
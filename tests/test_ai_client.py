@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError
+
+from src.ai_client import BaseAIClient
+
+_REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+@pytest.fixture
+def client():
+    """BaseAIClient retrying three times without waiting"""
+    client = BaseAIClient.__new__(BaseAIClient)
+    client.max_retries = 3
+    client.retry_delay = 0
+    return client
+
+
+class TestRetryRequest:
+    def test_transient_error_is_retried(self, client):
+        """Test a connection failure is retried and the later success returned"""
+        outcomes = [APIConnectionError(request=_REQUEST), "ok"]
+
+        def request():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert client._retry_request(request) == "ok"
+
+    def test_client_error_is_not_retried(self, client):
+        """Test a 400 response fails on the first attempt"""
+        calls = 0
+
+        def request():
+            nonlocal calls
+            calls += 1
+            raise BadRequestError("bad request", response=httpx.Response(400, request=_REQUEST), body=None)
+
+        with pytest.raises(BadRequestError):
+            client._retry_request(request)
+        assert calls == 1
+
+
+class TestAsyncClientLifecycle:
+    @pytest.fixture
+    def client(self):
+        """BaseAIClient whose asyncio clients are mocks"""
+        client = BaseAIClient()
+        client._create_async_client = lambda: Mock(close=AsyncMock())
+        return client
+
+    def test_each_event_loop_gets_its_own_client(self, client):
+        """Test the asyncio client is reused within a loop and rebuilt for a new one"""
+        async def get_twice():
+            return client._get_async_client(), client._get_async_client()
+
+        first, again = asyncio.run(get_twice())
+        second, _ = asyncio.run(get_twice())
+
+        assert first is again
+        assert first is not second
+
+    def test_close_releases_the_running_loops_client(self, client):
+        """Test aclose_async_client closes and forgets the client of the running loop"""
+        async def use_and_close():
+            async_client = client._get_async_client()
+            await client.aclose_async_client()
+            return async_client, client._get_async_client()
+
+        closed, replacement = asyncio.run(use_and_close())
+
+        closed.close.assert_awaited_once()
+        assert replacement is not closed
+
+
+def _chunk(content=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if content is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class TestStreamingUsage:
+    @pytest.fixture
+    def streaming_client(self, client):
+        client.request_model = "gpt-4"
+        client.stream_usage_supported = True
+        client.client = Mock()
+        return client
+
+    def test_usage_from_final_chunk_is_recorded(self, streaming_client):
+        """Test the provider's usage block on the last chunk replaces the estimate"""
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=7, total_tokens=127,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=64))
+        streaming_client.client.chat.completions.create.return_value = iter([_chunk("Hel"), _chunk("lo"), _chunk(usage=usage)])
+
+        assert "".join(streaming_client.chat_completion_stream([{"role": "user", "content": "hi"}])) == "Hello"
+
+        assert streaming_client.last_request_tokens == {
+            'prompt_tokens': 120, 'completion_tokens': 7, 'total_tokens': 127, 'cached_tokens': 64
+        }
+        assert streaming_client.client.chat.completions.create.call_args.kwargs['stream_options'] == {'include_usage': True}
+
+    def test_estimate_used_when_provider_sends_no_usage(self, streaming_client):
+        """Test the character-based estimate is the fallback without a usage chunk"""
+        streaming_client.client.chat.completions.create.return_value = iter([_chunk("12345678")])
+
+        list(streaming_client.chat_completion_stream([{"role": "user", "content": "hi"}]))
+
+        assert streaming_client.last_request_tokens['completion_tokens'] == 2
+        assert streaming_client.last_request_tokens['cached_tokens'] == 0
@@ -0,0 +1,39 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.enhanced_story_creator import EnhancedStoryCreator
+
+
+class TestComplexityCache:
+    @pytest.fixture
+    def creator(self):
+        creator = EnhancedStoryCreator.__new__(EnhancedStoryCreator)
+        creator.ai_client = Mock()
+        EnhancedStoryCreator._complexity_cache.clear()
+        yield creator
+        EnhancedStoryCreator._complexity_cache.clear()
+
+    def test_identical_story_reuses_complexity_analysis(self, creator):
+        """Test a repeated story skips the complexity AI call and gets its own copy of the analysis"""
+        creator.ai_client.chat_completion.return_value = json.dumps({
+            "overall_complexity": "High", "story_points": "8", "factors": [], "rationale": "Many integrations"
+        })
+
+        first = creator.create_enhanced_story("Export reports", "As an auditor, I want exports", ["Given a report"])
+        second = creator.create_enhanced_story("Export reports", "As an auditor, I want exports", ["Given a report"])
+
+        assert creator.ai_client.chat_completion.call_count == 1
+        assert second.complexity_analysis.story_points == 8
+        assert second.complexity_analysis is not first.complexity_analysis
+
+    def test_failed_analysis_is_not_cached(self, creator):
+        """Test a failed analysis falls back to the default and is retried for the next identical story"""
+        creator.ai_client.chat_completion.return_value = ""
+
+        story = creator.create_enhanced_story("Export reports", "As an auditor, I want exports", ["Given a report"])
+        creator.create_enhanced_story("Export reports", "As an auditor, I want exports", ["Given a report"])
+
+        assert story.complexity_analysis.factors[0].name == "Default Assessment"
+        assert creator.ai_client.chat_completion.call_count == 2
@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.extraction_batcher import ExtractionBatcher
+
+
+class TestExtractionBatcher:
+    def test_duplicate_story_requests_share_one_extraction(self):
+        """Test requests for the same story within the window run the extraction once"""
+        release = threading.Event()
+        extract = MagicMock(side_effect=lambda story_id: release.wait(5) and f"result-{story_id}")
+        batcher = ExtractionBatcher(extract, ThreadPoolExecutor(max_workers=4), flush_interval=0.2)
+
+        futures = [batcher.submit("101"), batcher.submit("101"), batcher.submit("202")]
+        release.set()
+
+        assert [f.result(timeout=5) for f in futures] == ["result-101", "result-101", "result-202"]
+        assert sorted(call.args[0] for call in extract.call_args_list) == ["101", "202"]
+
+    def test_extraction_error_reaches_every_waiter(self):
+        """Test a failed extraction is raised to all requests for that story"""
+        extract = MagicMock(side_effect=RuntimeError("ADO unavailable"))
+        batcher = ExtractionBatcher(extract, ThreadPoolExecutor(max_workers=2), flush_interval=0.2)
+
+        futures = [batcher.submit("101"), batcher.submit("101")]
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="ADO unavailable"):
+                future.result(timeout=5)
+        extract.assert_called_once_with("101")
+
+    def test_unique_stories_are_grouped_for_the_batch_function(self):
+        """Test different stories in one window go to the batch function in groups of batch_size"""
+        extract = MagicMock()
+        batch = MagicMock(side_effect=lambda story_ids: [f"result-{story_id}" for story_id in story_ids])
+        batcher = ExtractionBatcher(extract, ThreadPoolExecutor(max_workers=2), flush_interval=0.2,
+                                    batch_func=batch, batch_size=2)
+
+        futures = [batcher.submit(story_id) for story_id in ("101", "202", "101", "303")]
+
+        assert [f.result(timeout=5) for f in futures] == ["result-101", "result-202", "result-101", "result-303"]
+        assert sorted(call.args[0] for call in batch.call_args_list) == [["101", "202"], ["303"]]
+        extract.assert_not_called()
+
+    def test_single_story_skips_the_batch_function(self):
+        """Test a window holding one unique story uses the single-story extraction"""
+        extract = MagicMock(return_value="result-101")
+        batch = MagicMock()
+        batcher = ExtractionBatcher(extract, ThreadPoolExecutor(max_workers=2), flush_interval=0.2, batch_func=batch)
+
+        assert batcher.submit("101").result(timeout=5) == "result-101"
+        batch.assert_not_called()
@@ -0,0 +1,22 @@
+from src.llm_cache import LLMResponseCache
+
+
+class TestLLMResponseCache:
+    def test_round_trip_persists_across_instances(self, tmp_path):
+        """Test a stored response is readable from a new cache on the same directory"""
+        key = LLMResponseCache.make_key([{"role": "user", "content": "hi"}], "gpt-4", 0.3)
+        LLMResponseCache(str(tmp_path)).set(key, '{"stories": []}')
+
+        assert LLMResponseCache(str(tmp_path)).get(key) == '{"stories": []}'
+
+    def test_key_covers_model_and_temperature(self):
+        """Test the same messages under a different model or temperature miss the cache"""
+        messages = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+        key = LLMResponseCache.make_key(messages, "gpt-4", 0.3)
+
+        assert key == LLMResponseCache.make_key(list(messages), "gpt-4", 0.3)
+        assert key != LLMResponseCache.make_key(messages, "gpt-4o", 0.3)
+        assert key != LLMResponseCache.make_key(messages, "gpt-4", 0.7)
+
+    def test_missing_key_returns_none(self, tmp_path):
+        assert LLMResponseCache(str(tmp_path)).get("absent") is None
@@ -1,5 +1,6 @@
 import pytest
 from src.models import UserStory, Requirement, StoryExtractionResult
+from src.models_enhanced import EnhancedUserStory
 
 class TestUserStory:
     def test_user_story_creation(self):
@@ -34,6 +35,29 @@ class TestUserStory:
         assert "• System validates login" in description
         assert "<br>" in description  # Check HTML formatting is used
 
+class TestEnhancedUserStory:
+    def test_to_user_story_shares_fields(self):
+        """Test conversion to UserStory reuses the acceptance criteria list instead of copying it"""
+        criteria = ["User can enter credentials", "System validates login"]
+        story = EnhancedUserStory(
+            heading="Login Feature",
+            description="As a user, I want to login so that I can access my account",
+            acceptance_criteria=criteria
+        )
+        
+        user_story = story.to_user_story()
+        
+        assert isinstance(user_story, UserStory)
+        assert user_story.heading == "Login Feature"
+        assert user_story.acceptance_criteria is story.acceptance_criteria
+        assert user_story.test_cases == []
+    
+    def test_to_user_story_wraps_string_criteria(self):
+        """Test a single acceptance criteria string becomes a one-item list"""
+        story = EnhancedUserStory(heading="Login Feature", description="Login", acceptance_criteria="User can log in")
+        
+        assert story.to_user_story().acceptance_criteria == ["User can log in"]
+
 class TestRequirement:
     def test_requirement_creation(self):
         """Test Requirement model creation"""
@@ -0,0 +1,460 @@
+import gzip
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from flask import Flask
+
+from src.monitor import load_config_from_file, write_json_if_changed
+from src.monitor_api import (
+    MonitorAPI, _MONITOR_CONFIG_COERCERS, _apply_env_updates, _gzip_chunks, _parse_log_line, _tail_lines
+)
+
+
+class TestTailLines:
+    def test_returns_last_lines_across_blocks(self, tmp_path):
+        """Test the tail reader stitches lines that span block boundaries"""
+        log_file = tmp_path / "epic_monitor.log"
+        log_file.write_text("".join(f"line {i}\n" for i in range(100)))
+
+        assert _tail_lines(str(log_file), 3, block_size=7) == ["line 97", "line 98", "line 99"]
+
+    def test_returns_whole_file_when_shorter_than_requested(self, tmp_path):
+        """Test asking for more lines than the file has returns every line"""
+        log_file = tmp_path / "epic_monitor.log"
+        log_file.write_text("first\nsecond")
+
+        assert _tail_lines(str(log_file), 50) == ["first", "second"]
+
+    def test_empty_file(self, tmp_path):
+        """Test an empty log file yields no lines"""
+        log_file = tmp_path / "epic_monitor.log"
+        log_file.write_text("")
+
+        assert _tail_lines(str(log_file), 10) == []
+
+
+class TestParseLogLine:
+    def test_parses_standard_log_format(self):
+        """Test a formatted log line is split into dashboard fields"""
+        entry = _parse_log_line("2025-08-09 07:12:03,405 - MonitorAPI - INFO - Monitor started")
+
+        assert entry == {
+            'timestamp': '2025-08-09T07:12:03.405000',
+            'level': 'info',
+            'component': 'MonitorAPI',
+            'message': 'Monitor started'
+        }
+
+    def test_malformed_line_is_kept_as_system_message(self):
+        """Test lines without the expected separators are returned verbatim"""
+        entry = _parse_log_line("Traceback (most recent call last):")
+
+        assert entry['component'] == 'System'
+        assert entry['message'] == "Traceback (most recent call last):"
+
+
+class TestApplyEnvUpdates:
+    def test_updates_existing_keys_and_appends_new_ones(self):
+        """Test known keys are replaced in place and unknown keys are appended"""
+        lines = ['# comment\n', 'ADO_PROJECT=old\n', 'PLATFORM_TYPE=ADO']
+
+        result = _apply_env_updates(lines, {'PLATFORM_TYPE': 'JIRA', 'ADO_ORG': 'contoso'})
+
+        assert result == ['# comment\n', 'ADO_PROJECT=old\n', 'PLATFORM_TYPE=JIRA\n', 'ADO_ORG=contoso\n']
+        assert lines[-1] == 'PLATFORM_TYPE=ADO'
+
+    def test_only_first_duplicate_key_is_replaced(self):
+        """Test duplicate keys keep first-occurrence semantics"""
+        result = _apply_env_updates(['KEY=a\n', 'KEY=b\n'], {'KEY': 'c'})
+
+        assert result == ['KEY=c\n', 'KEY=b\n']
+
+
+class TestGzipChunks:
+    def test_stream_decompresses_to_joined_chunks(self):
+        """Test the gzipped stream round-trips to the original text"""
+        chunks = ['[', '{"id": "1"}', ',{"id": "2"}', ']']
+
+        body = b''.join(_gzip_chunks(iter(chunks)))
+
+        assert gzip.decompress(body).decode('utf-8') == ''.join(chunks)
+
+    def test_each_chunk_is_flushed(self):
+        """Test every chunk yields decodable output before the stream ends"""
+        compressed = _gzip_chunks(iter(['[', '{"id": "1"}']))
+        decompressor = zlib.decompressobj(31)
+
+        assert decompressor.decompress(next(compressed)) == b'['
+        assert decompressor.decompress(next(compressed)) == b'{"id": "1"}'
+
+
+class TestMonitorConfigCoercers:
+    def test_values_are_cast_to_field_types(self):
+        """Test posted values are coerced to the MonitorConfig field types"""
+        posted = {'poll_interval_seconds': '60', 'auto_sync': 'false', 'epic_ids': [1, '2'], 'notification_webhook': None}
+
+        coerced = {key: _MONITOR_CONFIG_COERCERS[key](value) for key, value in posted.items()}
+
+        assert coerced == {'poll_interval_seconds': 60, 'auto_sync': False, 'epic_ids': ['1', '2'], 'notification_webhook': None}
+
+
+class TestForceCheckCoalescing:
+    def _make_api(self):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api._executor = ThreadPoolExecutor(max_workers=4)
+        api._inflight_checks = {}
+        api._inflight_lock = threading.Lock()
+        api.monitor = MagicMock()
+        return api
+
+    def test_concurrent_checks_for_same_epic_share_one_run(self):
+        """Test duplicate in-flight checks reuse the running future"""
+        api = self._make_api()
+        release = threading.Event()
+        api.monitor.force_check.side_effect = lambda epic_id: release.wait(5) and {epic_id: {'has_changes': False}}
+
+        first = api._submit_force_check("42")
+        second = api._submit_force_check("42")
+        release.set()
+
+        assert first is second
+        assert first.result(timeout=5) == {"42": {'has_changes': False}}
+        api.monitor.force_check.assert_called_once_with("42")
+
+    def test_finished_check_is_not_reused(self):
+        """Test a new check starts once the previous one has completed"""
+        api = self._make_api()
+        api.monitor.force_check.return_value = {}
+
+        api._submit_force_check().result(timeout=5)
+        api._submit_force_check().result(timeout=5)
+
+        assert api.monitor.force_check.call_count == 2
+
+
+class TestBackgroundJobs:
+    def _make_api(self):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api._job_pool = ThreadPoolExecutor(max_workers=2)
+        api._jobs = OrderedDict()
+        api._jobs_lock = threading.Lock()
+        return api
+
+    def test_job_result_is_available_by_id(self):
+        """Test a submitted job can be looked up and resolves to its result"""
+        api = self._make_api()
+
+        job_id = api._submit_job(lambda story_id: {'story_id': story_id}, "42")
+
+        assert api._jobs[job_id].result(timeout=5) == {'story_id': "42"}
+
+    def test_oldest_jobs_are_evicted(self, monkeypatch):
+        """Test the job registry stays bounded"""
+        monkeypatch.setattr('src.monitor_api.MAX_TRACKED_JOBS', 2)
+        api = self._make_api()
+
+        job_ids = [api._submit_job(lambda: None) for _ in range(3)]
+
+        assert list(api._jobs) == job_ids[1:]
+
+
+class TestSlowExtractionHandoff:
+    def _make_api(self, future):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api.app = Flask(__name__)
+        api._job_pool = ThreadPoolExecutor(max_workers=2)
+        api._jobs = OrderedDict()
+        api._jobs_lock = threading.Lock()
+        api._extraction_batcher = MagicMock()
+        api._extraction_batcher.submit.return_value = future
+        return api
+
+    def test_extraction_past_the_wait_becomes_a_job_with_the_real_result(self, monkeypatch):
+        """Test a slow extraction answers 202 and its job later resolves to the finished payload"""
+        monkeypatch.setattr('src.monitor_api.Settings.TEST_CASE_EXTRACTION_WAIT_SECONDS', 0.01, raising=False)
+        future = Future()
+        api = self._make_api(future)
+
+        with api.app.test_request_context():
+            response, status = api._extraction_response("42", lambda result: {'result': result})
+            job_id = response.get_json()['job_id']
+        future.set_result("done")
+
+        assert status == 202
+        assert api._jobs[job_id].result(timeout=5) == {'result': "done"}
+
+    def test_fast_extraction_is_answered_directly(self):
+        """Test an extraction finishing within the wait is returned in the response"""
+        future = Future()
+        future.set_result("done")
+        api = self._make_api(future)
+
+        with api.app.test_request_context():
+            response = api._extraction_response("42", lambda result: {'result': result})
+
+        assert response.get_json() == {'result': "done"}
+        assert not api._jobs
+
+
+class TestSettingsReloadCoalescing:
+    def test_requests_during_a_reload_share_the_next_one(self, monkeypatch):
+        """Test a burst of reload requests costs at most one extra reload"""
+        api = MonitorAPI.__new__(MonitorAPI)
+        api._config_snapshot = None
+        api._config_snapshot_lock = threading.Lock()
+        api._config_snapshot_version = 0
+        api._settings_reload_lock = threading.Lock()
+        api._settings_reload_requests = 0
+        api._settings_reloaded_through = 0
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def reload_config():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+
+        monkeypatch.setattr('src.monitor_api.Settings.reload_config', reload_config)
+        first = threading.Thread(target=api._reload_settings)
+        first.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=api._reload_settings) for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        while api._settings_reload_requests < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in [first] + waiters:
+            thread.join(5)
+
+        assert len(calls) == 2
+        assert api._config_snapshot_version == 2
+
+
+class TestPlatformClientCache:
+    def _make_api(self):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api._platform_clients = {}
+        api._platform_clients_lock = threading.Lock()
+        return api
+
+    def test_client_reused_while_credentials_unchanged(self):
+        """Test the same client instance is returned for identical credentials"""
+        api = self._make_api()
+        client_cls = MagicMock(side_effect=lambda: object())
+
+        first = api._get_platform_client(client_cls, "org", "project", "pat")
+        second = api._get_platform_client(client_cls, "org", "project", "pat")
+
+        assert first is second
+        client_cls.assert_called_once()
+
+    def test_client_rebuilt_when_credentials_change(self):
+        """Test a new client is constructed after the credentials change"""
+        api = self._make_api()
+        client_cls = MagicMock(side_effect=lambda: object())
+
+        first = api._get_platform_client(client_cls, "org", "project", "old-pat")
+        second = api._get_platform_client(client_cls, "org", "project", "new-pat")
+
+        assert first is not second
+        assert client_cls.call_count == 2
+
+
+class TestMonitorStatusCache:
+    def _make_api(self):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api.app = Flask(__name__)
+        api._status_cache = None
+        api.logger = MagicMock()
+        api.monitor = MagicMock(monitored_epics={'1': object()}, last_check=None, state_version=0)
+        api.is_monitor_running = True
+        api.monitor_restart_count = 0
+        api.monitor_last_error = None
+        return api
+
+    def test_status_reused_until_state_changes(self):
+        """Test repeated polls share one payload until the monitor reports a state change"""
+        api = self._make_api()
+
+        first = api._get_cached_monitor_status()
+        assert api._get_cached_monitor_status() is first
+
+        api.monitor.monitored_epics['2'] = object()
+        api.monitor.state_version = 1
+        refreshed = api._get_cached_monitor_status()
+
+        assert refreshed is not first
+        assert refreshed['epic_count'] == 2
+
+    def test_status_rebuilt_when_running_flag_changes(self):
+        """Test stopping the monitor is reflected immediately"""
+        api = self._make_api()
+        api._get_cached_monitor_status()
+
+        api.is_monitor_running = False
+
+        assert api._get_cached_monitor_status()['status'] == 'stopped'
+
+
+class TestEventStreamBounds:
+    def _make_api(self, slots):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api.app = Flask(__name__)
+        api.logger = MagicMock()
+        api.monitor = MagicMock()
+        api._get_monitor_status_data = lambda: {'status': 'running'}
+        api._sse_slots = threading.BoundedSemaphore(slots)
+        api.monitor.wait_for_state_change.side_effect = lambda version, timeout: version + 1
+        return api
+
+    def test_stream_ends_after_max_duration_and_frees_its_slot(self, monkeypatch):
+        """Test an SSE stream is closed once it has run for SSE_STREAM_MAX_SECONDS"""
+        monkeypatch.setattr('src.monitor_api.SSE_STREAM_MAX_SECONDS', 0.05)
+        api = self._make_api(1)
+
+        with api.app.test_request_context():
+            events = list(api.stream_events().response)
+
+        assert events and all(event.startswith('data: ') for event in events)
+        assert api._sse_slots.acquire(blocking=False)
+
+    def test_stream_over_capacity_sends_one_snapshot_and_retry_hint(self):
+        """Test dashboards beyond SSE_MAX_STREAMS are told to reconnect later instead of holding a thread"""
+        api = self._make_api(1)
+        api._sse_slots.acquire()
+
+        with api.app.test_request_context():
+            events = list(api.stream_events().response)
+
+        assert events[0].startswith('retry: ')
+        assert len(events) == 2 and events[1].startswith('data: ')
+        api.monitor.wait_for_state_change.assert_not_called()
+
+
+class TestWriteJsonIfChanged:
+    def test_writes_new_file_and_skips_identical_content(self, tmp_path):
+        """Test the config file is written once and identical saves are skipped"""
+        config_file = tmp_path / "monitor_config.json"
+
+        assert write_json_if_changed(str(config_file), {"auto_sync": True}) is True
+        mtime = config_file.stat().st_mtime_ns
+        assert write_json_if_changed(str(config_file), {"auto_sync": True}) is False
+
+        assert config_file.stat().st_mtime_ns == mtime
+        assert json.loads(config_file.read_text()) == {"auto_sync": True}
+
+    def test_replaces_changed_content_without_leaving_temp_files(self, tmp_path):
+        """Test changed content replaces the file atomically"""
+        config_file = tmp_path / "monitor_config.json"
+        write_json_if_changed(str(config_file), {"auto_sync": True})
+
+        assert write_json_if_changed(str(config_file), {"auto_sync": False}) is True
+
+        assert json.loads(config_file.read_text()) == {"auto_sync": False}
+        assert [p.name for p in tmp_path.iterdir()] == ["monitor_config.json"]
+
+
+class TestLoadConfigFromFile:
+    def test_reloads_only_after_file_changes_and_returns_independent_configs(self, tmp_path):
+        """Test the parsed config is reused until the file changes and callers get separate objects"""
+        config_file = tmp_path / "monitor_config.json"
+        write_json_if_changed(str(config_file), {"epic_ids": ["1"], "ado_pat": "secret"})
+
+        first = load_config_from_file(str(config_file))
+        first.epic_ids.append("2")
+        second = load_config_from_file(str(config_file))
+        assert second.epic_ids == ["1"]
+
+        write_json_if_changed(str(config_file), {"epic_ids": ["1", "3"]})
+        assert load_config_from_file(str(config_file)).epic_ids == ["1", "3"]
+
+
+class TestEpicDataCache:
+    def _make_api(self):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api.app = Flask(__name__)
+        api._epic_data_cache = {}
+        api.monitor = MagicMock(state_version=0)
+        return api
+
+    def test_payload_reused_until_monitor_state_changes(self):
+        """Test cached EPIC payloads are dropped once the monitor state version moves"""
+        api = self._make_api()
+        api._store_epic_data('stats', api._epic_data_cache_key(), {'total_epics': 1})
+
+        assert api._get_cached_epic_data('stats', api._epic_data_cache_key()) == {'total_epics': 1}
+
+        api.monitor.state_version = 1
+        assert api._get_cached_epic_data('stats', api._epic_data_cache_key()) is None
+
+    def test_cached_payload_answers_matching_etag_with_304(self):
+        """Test a poll carrying the cached body's ETag gets an empty 304"""
+        api = self._make_api()
+        entry = api._store_epic_data('stats', api._epic_data_cache_key(), {'total_epics': 1})
+
+        with api.app.test_request_context(headers={'If-None-Match': f'"{entry[4]}"'}):
+            not_modified = api._conditional_json_response(entry[3], entry[4])
+        with api.app.test_request_context():
+            full = api._conditional_json_response(entry[3], entry[4])
+
+        assert not_modified.status_code == 304 and not_modified.get_data() == b''
+        assert full.status_code == 200 and full.get_json() == {'total_epics': 1}
+
+
+class TestConfigEtag:
+    def _make_api(self):
+        api = MonitorAPI.__new__(MonitorAPI)
+        api.app = Flask(__name__)
+        api._config_snapshot = {'poll_interval_seconds': 60}
+        api._config_snapshot_lock = threading.Lock()
+        api.monitor = MagicMock(monitored_epics={'1': object()})
+        return api
+
+    def test_etag_depends_only_on_config_content(self):
+        """Test separate API instances with identical config hand out the same ETag"""
+        with Flask(__name__).test_request_context():
+            first = self._make_api().get_config()
+            second = self._make_api().get_config()
+
+        assert first.get_etag() == second.get_etag()
+        assert first.get_json() == {'poll_interval_seconds': 60, 'epic_ids': ['1']}
+
+    def test_etag_changes_with_monitored_epics(self):
+        """Test adding an EPIC produces a new ETag"""
+        api = self._make_api()
+        with api.app.test_request_context():
+            before = api.get_config().get_etag()
+            api.monitor.monitored_epics['2'] = object()
+            after = api.get_config().get_etag()
+
+        assert before != after
+
+
+class TestMonitorSupervisor:
+    def test_stopped_monitor_is_not_restarted(self):
+        """Test stopping through the API ends the supervisor instead of triggering a restart"""
+        api = MonitorAPI.__new__(MonitorAPI)
+        api.logger = MagicMock()
+        api._monitor_lock = threading.Lock()
+        api._monitor_stop_event = threading.Event()
+        api.monitor_restart_count = 0
+        api.monitor_last_error = None
+        stopped = threading.Event()
+        api.monitor = MagicMock()
+        api.monitor.start.side_effect = lambda: stopped.wait(5)
+        api.monitor.stop.side_effect = stopped.set
+
+        api.is_monitor_running = True
+        api.monitor_thread = threading.Thread(target=api._supervise_monitor, daemon=True)
+        api.monitor_thread.start()
+        api._stop_monitor_worker()
+
+        assert api.monitor_thread is None
+        assert api.monitor.start.call_count == 1
+        assert api.monitor_restart_count == 0
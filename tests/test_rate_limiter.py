@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from src.rate_limiter import AsyncTokenBucket, LLMRateLimiter
+
+
+class TestAsyncTokenBucket:
+    def test_burst_is_served_immediately(self):
+        """Test requests within the burst size do not wait"""
+        bucket = AsyncTokenBucket(rate_per_sec=1, burst=5)
+
+        async def take():
+            for _ in range(5):
+                await bucket.acquire()
+
+        started = time.monotonic()
+        asyncio.run(take())
+        assert time.monotonic() - started < 0.1
+
+    def test_waits_for_refill_once_empty(self):
+        """Test an empty bucket delays the next request until enough tokens refill"""
+        bucket = AsyncTokenBucket(rate_per_sec=20, burst=2)
+
+        async def take():
+            for _ in range(4):
+                await bucket.acquire()
+
+        started = time.monotonic()
+        asyncio.run(take())
+        assert time.monotonic() - started >= 0.09
+
+    def test_usable_across_event_loops(self):
+        """Test the bucket keeps working when each call runs in a fresh event loop"""
+        bucket = AsyncTokenBucket(rate_per_sec=100, burst=1)
+
+        asyncio.run(bucket.acquire())
+        asyncio.run(bucket.acquire())
+
+
+class TestLLMRateLimiter:
+    def test_zero_limits_disable_buckets(self):
+        """Test a limiter with no configured limits never waits"""
+        limiter = LLMRateLimiter()
+
+        assert limiter.request_bucket is None
+        assert limiter.token_bucket is None
+        asyncio.run(limiter.acquire(10_000_000))
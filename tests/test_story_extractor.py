@@ -1,9 +1,15 @@
+import asyncio
+import time
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 import json
 
 from src.story_extractor import StoryExtractor
 from src.models import Requirement, UserStory, StoryExtractionResult
+from src.rate_limiter import LLMRateLimiter
+from src.ai_client import count_message_tokens, estimate_tokens
+from src.llm_cache import LLMResponseCache
+from src.story_extractor import _StreamedStoryParser
 
 class TestStoryExtractor:
     @pytest.fixture
@@ -146,7 +152,7 @@ class TestStoryExtractor:
         
         extractor.client.chat.completions.create.return_value = mock_response
         
-        stories = extractor._analyze_requirement_with_ai(sample_requirement)
+        stories, salvaged = extractor._analyze_requirement_with_ai(sample_requirement)
         
         assert len(stories) == 1
         assert stories[0].heading == "Test Story"
@@ -159,3 +165,278 @@ class TestStoryExtractor:
         assert call_args[1]['model'] == 'gpt-4'
         assert call_args[1]['temperature'] == 0.3
         assert len(call_args[1]['messages']) == 2
+
+
+class TestStoryExtractorAICalls:
+    @pytest.fixture
+    def extractor(self):
+        """StoryExtractor with a mocked AI client and a story creator that returns plain UserStory objects"""
+        extractor = StoryExtractor.__new__(StoryExtractor)
+        extractor.ai_client = Mock()
+        extractor.ai_client.aclose_async_client = AsyncMock()
+        extractor.story_creator = Mock()
+        extractor.story_creator.create_enhanced_story.side_effect = lambda heading, description, acceptance_criteria: UserStory(
+            heading=heading, description=description, acceptance_criteria=acceptance_criteria
+        )
+        extractor.rate_limiter = LLMRateLimiter()
+        extractor.llm_cache = None
+        extractor.semantic_cache = None
+        extractor.logger = Mock()
+        with patch('src.story_extractor.Settings.STORY_STREAMING_ENABLED', False, create=True):
+            yield extractor
+    
+    @pytest.fixture
+    def requirements(self):
+        return [
+            Requirement(id=str(i), title=f"Requirement {i}", description=f"Users need report export number {i} for auditing", state="Active")
+            for i in range(1, 4)
+        ]
+    
+    @staticmethod
+    def _story(heading):
+        return {
+            "heading": heading,
+            "description": "As an auditor, I want to export reports so that I can review activity",
+            "acceptance_criteria": ["Given a report When I export it Then a file is downloaded"]
+        }
+    
+    def test_batch_uses_single_ai_call(self, extractor, requirements):
+        """All requirements in a batch are answered by one chat completion"""
+        extractor.ai_client.chat_completion.return_value = json.dumps({
+            "results": [{"id": r.id, "stories": [self._story(f"Export report {r.id}")]} for r in requirements]
+        })
+        
+        with patch('src.story_extractor.Settings.STORY_EXTRACTION_BATCH_SIZE', 5, create=True):
+            results = extractor.extract_stories_batch(requirements)
+        
+        assert extractor.ai_client.chat_completion.call_count == 1
+        assert [r.requirement_id for r in results] == ["1", "2", "3"]
+        assert all(r.extraction_successful for r in results)
+        assert [r.stories[0].heading for r in results] == ["Export report 1", "Export report 2", "Export report 3"]
+    
+    def test_batch_falls_back_for_missing_requirement(self, extractor, requirements):
+        """A requirement left out of the batched response is extracted on its own"""
+        extractor.ai_client.chat_completion.side_effect = [
+            json.dumps({"results": [{"id": r.id, "stories": [self._story(f"Export report {r.id}")]} for r in requirements[:2]]}),
+            json.dumps({"stories": [self._story("Export report 3 alone")]})
+        ]
+        
+        with patch('src.story_extractor.Settings.STORY_EXTRACTION_BATCH_SIZE', 5, create=True):
+            results = extractor.extract_stories_batch(requirements)
+        
+        assert extractor.ai_client.chat_completion.call_count == 2
+        assert results[2].stories[0].heading == "Export report 3 alone"
+    
+    @pytest.mark.parametrize("enabled", [True, False])
+    def test_structured_outputs_request_story_schema(self, extractor, requirements, enabled):
+        """The story JSON schema is sent as the response format only when structured outputs are enabled"""
+        extractor.ai_client.chat_completion.return_value = json.dumps({"stories": [self._story("Export report")]})
+        
+        with patch('src.story_extractor.Settings.STORY_STRUCTURED_OUTPUTS_ENABLED', enabled, create=True):
+            extractor.extract_stories(requirements[0])
+        
+        response_format = extractor.ai_client.chat_completion.call_args[1]['response_format']
+        if enabled:
+            assert response_format['type'] == 'json_schema'
+            assert response_format['json_schema']['strict'] is True
+        else:
+            assert response_format is None
+    
+    def test_concurrent_extraction_respects_max_concurrency(self, extractor, requirements):
+        """extract_stories_many overlaps AI calls but never exceeds the concurrency limit"""
+        in_flight = 0
+        peak = 0
+        
+        async def fake_completion(messages, temperature, max_tokens, response_format=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return json.dumps({"stories": [self._story("Export report")]})
+        
+        extractor.ai_client.chat_completion_async = fake_completion
+        
+        results = extractor.extract_stories_many_sync(requirements, max_concurrency=2)
+        
+        assert peak == 2
+        assert [r.requirement_id for r in results] == ["1", "2", "3"]
+        assert all(r.extraction_successful for r in results)
+    
+    def test_stories_are_created_concurrently_in_response_order(self, extractor, requirements):
+        """Enhanced stories are built in parallel but returned in the order the AI listed them"""
+        headings = [f"Export report part {i}" for i in range(4)]
+        in_flight = 0
+        peak = 0
+        
+        def slow_create(heading, description, acceptance_criteria):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            time.sleep(0.05 if heading.endswith("0") else 0.01)
+            in_flight -= 1
+            return UserStory(heading=heading, description=description, acceptance_criteria=acceptance_criteria)
+        
+        extractor.story_creator.create_enhanced_story.side_effect = slow_create
+        extractor.ai_client.chat_completion.return_value = json.dumps({"stories": [self._story(h) for h in headings]})
+        
+        with patch('src.story_extractor.Settings.LLM_MAX_CONCURRENCY', 4, create=True):
+            result = extractor.extract_stories(requirements[0])
+        
+        assert peak > 1
+        assert [s.heading for s in result.stories] == headings
+    
+    def test_oversized_requirement_is_extracted_in_parts(self, extractor):
+        """A description that would overflow the context window is split at paragraphs and the stories merged"""
+        paragraphs = [f"Paragraph {i}: " + "users need detailed audit reports " * 40 for i in range(3)]
+        requirement = Requirement(id="1", title="Audit reports", description="\n\n".join(paragraphs), state="Active")
+        extractor.ai_client.chat_completion.side_effect = [
+            json.dumps({"stories": [self._story(f"Export report part {i}")]}) for i in range(3)
+        ]
+        prompt_tokens = count_message_tokens(extractor._build_extraction_messages(requirement, *extractor._prepare_extraction(requirement)))
+        # Room for the rest of the prompt, the response budget and one and a half paragraphs
+        context_window = prompt_tokens - estimate_tokens(requirement.description) + 3000 + estimate_tokens(paragraphs[0]) * 3 // 2
+        
+        with patch('src.story_extractor.Settings.LLM_CONTEXT_WINDOW', context_window, create=True):
+            result = extractor.extract_stories(requirement)
+        
+        assert extractor.ai_client.chat_completion.call_count == 3
+        sent = [c[1]['messages'][1]['content'] for c in extractor.ai_client.chat_completion.call_args_list]
+        assert all(paragraphs[i] in sent[i] and paragraphs[(i + 1) % 3] not in sent[i] for i in range(3))
+        assert sorted(s.heading for s in result.stories) == [f"Export report part {i}" for i in range(3)]
+    
+    def test_identical_prompt_reuses_cached_response(self, extractor, requirements, tmp_path):
+        """A repeated requirement is answered from the response cache without another AI call"""
+        extractor.llm_cache = LLMResponseCache(str(tmp_path))
+        extractor.ai_client.request_model = "gpt-4"
+        extractor.ai_client.chat_completion.return_value = json.dumps({"stories": [self._story("Export report")]})
+        
+        first = extractor.extract_stories(requirements[0])
+        second = extractor.extract_stories(requirements[0])
+        
+        assert extractor.ai_client.chat_completion.call_count == 1
+        assert [s.heading for s in second.stories] == [s.heading for s in first.stories] == ["Export report"]
+    
+    def test_near_duplicate_requirement_uses_semantic_cache(self, extractor, requirements):
+        """A semantic cache hit skips the AI call even when the exact prompt is new"""
+        extractor.semantic_cache = Mock()
+        extractor.semantic_cache.get.return_value = json.dumps({"stories": [self._story("Cached export report")]})
+        
+        result = extractor.extract_stories(requirements[0])
+        
+        extractor.ai_client.chat_completion.assert_not_called()
+        extractor.semantic_cache.set.assert_not_called()
+        assert result.stories[0].heading == "Cached export report"
+    
+    def test_filter_duplicate_stories_matches_all_fields(self, extractor):
+        """With near-duplicate matching off, only identical heading, description and criteria count"""
+        story = UserStory(heading="Export report", description="As an auditor, I want exports", acceptance_criteria=["Given a report"])
+        other = UserStory(heading="Export report", description="As an auditor, I want exports", acceptance_criteria=["Given a PDF"])
+        existing = [
+            {"heading": "Export report", "description": "As an auditor, I want exports", "acceptance_criteria": ["Given a report"]},
+            {"heading": "Unrelated", "description": "Other", "acceptance_criteria": None}
+        ]
+        
+        with patch('src.story_extractor.Settings.STORY_NEAR_DUPLICATE_THRESHOLD', 0, create=True):
+            assert extractor._filter_duplicate_stories([story, other], existing) == [other]
+    
+    def test_filter_duplicate_stories_catches_near_duplicates(self, extractor):
+        """A story that only differs from an existing one in case and spacing is filtered out"""
+        pytest.importorskip("datasketch")
+        description = "As an auditor, I want to export monthly activity reports so that I can review account changes"
+        paraphrase = UserStory(heading="Export  Monthly Reports", description=description.upper(), acceptance_criteria=["Given a report"])
+        distinct = UserStory(heading="Reset password", description="As a user, I want to reset my password by email", acceptance_criteria=["Given an email"])
+        existing = [{"heading": "Export monthly reports", "description": description, "acceptance_criteria": ["Other"]}]
+        
+        with patch('src.story_extractor.Settings.STORY_NEAR_DUPLICATE_THRESHOLD', 0.85, create=True):
+            assert extractor._filter_duplicate_stories([paraphrase, distinct], existing) == [distinct]
+    
+    @pytest.mark.parametrize("content", [
+        '{"stories": []}',
+        '```json\n{"stories": []}\n```',
+        '  ```\n{"stories": []}```  '
+    ])
+    def test_parse_ai_json_strips_code_fences(self, extractor, content):
+        """Responses wrapped in markdown fences parse the same as bare JSON"""
+        assert extractor._parse_ai_json(content) == {"stories": []}
+    
+    def test_streamed_parser_yields_stories_as_they_close(self):
+        """Each story object is returned by the chunk that completes it, not at the end of the response"""
+        response = '```json\n{"summary": "x", "stories": [{"heading": "A \\"quoted\\" }"}, {"heading": "B", "acceptance_criteria": ["[1]"]}]}\n```'
+        parser = _StreamedStoryParser()
+        
+        emitted = [parser.feed(response[i:i + 7]) for i in range(0, len(response), 7)]
+        
+        assert [story for chunk in emitted for story in chunk] == [{"heading": 'A "quoted" }'}, {"heading": "B", "acceptance_criteria": ["[1]"]}]
+        assert emitted[-1] == []
+        assert parser.content == response
+    
+    def test_streaming_extraction_builds_stories_from_deltas(self, extractor, requirements):
+        """With streaming on, stories come from the streamed deltas instead of a blocking completion"""
+        response = json.dumps({"stories": [self._story("First story"), self._story("Second story")]})
+        extractor.ai_client.chat_completion_stream.return_value = iter([response[:40], response[40:]])
+        
+        with patch('src.story_extractor.Settings.STORY_STREAMING_ENABLED', True, create=True):
+            result = extractor.extract_stories(requirements[0])
+        
+        extractor.ai_client.chat_completion.assert_not_called()
+        assert [s.heading for s in result.stories] == ["First story", "Second story"]
+    
+    def test_truncated_response_salvages_complete_stories(self, extractor, requirements):
+        """A response cut off mid-story keeps the complete stories and flags the result as salvaged"""
+        complete = json.dumps({"stories": [self._story("Export report one"), self._story("Export report two")]})
+        extractor.ai_client.chat_completion.return_value = complete[:complete.rindex('{"heading"') + 20]
+        
+        result = extractor.extract_stories(requirements[0])
+        
+        assert result.extraction_successful is True
+        assert result.salvaged is True
+        assert [s.heading for s in result.stories] == ["Export report one"]
+    
+    def test_unsalvageable_response_still_fails(self, extractor, requirements):
+        extractor.ai_client.chat_completion.return_value = '{"stories": [{"heading": "cut'
+        
+        result = extractor.extract_stories(requirements[0])
+        
+        assert result.extraction_successful is False
+        assert "Failed to parse AI response as JSON" in result.error_message
+    
+    def test_validate_stories_reports_issues_in_story_order(self, extractor):
+        """Schema validation reports the same per-story messages, story by story"""
+        stories = [
+            UserStory(heading="Valid Story Title", description="As a user, I want this feature", acceptance_criteria=["Valid criteria"]),
+            UserStory(heading="   ", description="Short", acceptance_criteria=[]),
+            UserStory(heading="A" * 101, description="Valid description for the story", acceptance_criteria=["Fine criteria", "  "])
+        ]
+        
+        assert extractor.validate_stories(stories) == [
+            "Story 2: Heading too short or missing",
+            "Story 2: Description too short or missing",
+            "Story 2: No acceptance criteria provided",
+            "Story 3: Heading too long (over 100 characters)",
+            "Story 3, Criteria 2: Too short or empty"
+        ]
+    
+    def test_offline_batch_demultiplexes_results(self, extractor, requirements):
+        """Batch API output is matched back to each requirement by custom_id"""
+        def run_batch(requests, **kwargs):
+            return {custom_id: json.dumps({"stories": [self._story(f"Batched report {custom_id}")]}) for custom_id, _ in requests}
+        extractor.ai_client.run_batch.side_effect = run_batch
+        
+        results = extractor.extract_stories_batch_offline(requirements)
+        
+        assert extractor.ai_client.run_batch.call_count == 1
+        assert [r.stories[0].heading for r in results] == ["Batched report 0", "Batched report 1", "Batched report 2"]
+    
+    def test_offline_batch_timeout_falls_back_to_direct_calls(self, extractor, requirements):
+        """When the batch misses its deadline every requirement is extracted directly"""
+        extractor.ai_client.run_batch.side_effect = TimeoutError("batch still in progress")
+        
+        async def fake_completion(messages, temperature, max_tokens, response_format=None):
+            return json.dumps({"stories": [self._story("Direct export report")]})
+        extractor.ai_client.chat_completion_async = fake_completion
+        
+        results = extractor.extract_stories_batch_offline(requirements)
+        
+        assert [r.requirement_id for r in results] == ["1", "2", "3"]
+        assert all(r.stories[0].heading == "Direct export report" for r in results)
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.test_case_extractor import TestCaseExtractor, _find_json_span
+from src.models import UserStory
+from src.llm_cache import LLMResponseCache
+from src.rate_limiter import LLMRateLimiter
+
+
+class TestTestCaseExtractorAICalls:
+    @pytest.fixture
+    def extractor(self):
+        """TestCaseExtractor with a mocked AI client, no caches and token stats kept in memory"""
+        extractor = TestCaseExtractor.__new__(TestCaseExtractor)
+        extractor.ai_client = Mock()
+        extractor.ai_client.aclose_async_client = AsyncMock()
+        extractor.ai_client.get_last_token_usage.return_value = {'prompt_tokens': 100}
+        extractor.ai_client.request_model = "gpt-4"
+        extractor.rate_limiter = LLMRateLimiter()
+        extractor.llm_cache = None
+        extractor.semantic_cache = None
+        extractor._inflight_requests = {}
+        extractor.use_toon = True
+        extractor.logger = Mock()
+        with patch('src.test_case_extractor.get_token_stats_manager'), \
+                patch('src.test_case_extractor.Settings.TEST_CASE_STREAMING_ENABLED', False, create=True):
+            yield extractor
+
+    @pytest.fixture
+    def user_story(self):
+        return UserStory(
+            heading="Export audit report",
+            description="As an auditor, I want to export reports so that I can review activity",
+            acceptance_criteria=["Given a report When I export it Then a file is downloaded"]
+        )
+
+    @staticmethod
+    def _response(*titles):
+        return json.dumps({"tcs": [
+            {"t": title, "desc": "Checks the export", "type": "pos", "prio": "High", "steps": ["Open report", "Export"], "exp": "File downloads"}
+            for title in titles
+        ]})
+
+    def test_identical_prompt_reuses_cached_response(self, extractor, user_story, tmp_path):
+        """A repeated story is answered from the response cache without another AI call"""
+        extractor.llm_cache = LLMResponseCache(str(tmp_path))
+        extractor.ai_client.chat_completion.return_value = self._response("Verify report export")
+
+        first = extractor.extract_test_cases(user_story, "42")
+        second = extractor.extract_test_cases(user_story, "42")
+
+        assert extractor.ai_client.chat_completion.call_count == 1
+        assert [tc.title for tc in second.test_cases] == [tc.title for tc in first.test_cases] == ["Verify report export"]
+        assert second.actual_tokens == 0 and second.tokens_saved == 0
+
+    def test_near_duplicate_story_uses_semantic_cache(self, extractor, user_story):
+        """A semantic cache hit skips the AI call even when the exact prompt is new"""
+        extractor.semantic_cache = Mock()
+        extractor.semantic_cache.get.return_value = self._response("Verify cached export")
+
+        result = extractor.extract_test_cases(user_story, "42")
+
+        extractor.ai_client.chat_completion.assert_not_called()
+        extractor.semantic_cache.set.assert_not_called()
+        assert result.test_cases[0].title == "Verify cached export"
+
+    def test_unparseable_response_is_not_cached(self, extractor, user_story):
+        """A response only recovered by text fallback parsing is not stored for reuse"""
+        extractor.semantic_cache = Mock()
+        extractor.semantic_cache.get.return_value = None
+        extractor.ai_client.chat_completion.return_value = "Test case: Verify export works"
+
+        result = extractor.extract_test_cases(user_story, "42")
+
+        assert result.extraction_successful
+        extractor.semantic_cache.set.assert_not_called()
+
+    def test_streaming_extraction_builds_test_cases_from_deltas(self, extractor, user_story):
+        """With streaming on, test cases are built from the streamed deltas without a blocking call"""
+        response = self._response("Verify report export", "Handle export failure")
+        extractor.ai_client.chat_completion_stream.return_value = iter([response[:50], response[50:]])
+
+        with patch('src.test_case_extractor.Settings.TEST_CASE_STREAMING_ENABLED', True, create=True):
+            result = extractor.extract_test_cases(user_story, "42")
+
+        extractor.ai_client.chat_completion.assert_not_called()
+        assert [tc.title for tc in result.test_cases] == ["Verify report export", "Handle export failure"]
+        assert result.test_cases[0].test_type == "positive" and result.test_cases[0].expected_result == "File downloads."
+
+    def test_streaming_skipped_when_provider_reports_no_stream_usage(self, extractor, user_story):
+        """Providers without usage on streams take the blocking call so token stats are not estimates"""
+        extractor.ai_client.stream_usage_supported = False
+        extractor.ai_client.chat_completion.return_value = self._response("Verify report export")
+
+        with patch('src.test_case_extractor.Settings.TEST_CASE_STREAMING_ENABLED', True, create=True):
+            result = extractor.extract_test_cases(user_story, "42")
+
+        extractor.ai_client.chat_completion_stream.assert_not_called()
+        assert [tc.title for tc in result.test_cases] == ["Verify report export"]
+
+    def test_structured_outputs_request_the_toon_schema(self, extractor, user_story):
+        """With structured outputs on, the AI call carries the TOON json_schema and the bare JSON reply is parsed"""
+        extractor.ai_client.chat_completion.return_value = self._response("Verify report export")
+
+        with patch('src.test_case_extractor.Settings.TEST_CASE_STRUCTURED_OUTPUTS_ENABLED', True, create=True):
+            result = extractor.extract_test_cases(user_story, "42")
+
+        response_format = extractor.ai_client.chat_completion.call_args.kwargs['response_format']
+        assert response_format['type'] == 'json_schema'
+        assert response_format['json_schema']['schema']['required'] == ['tcs']
+        assert [tc.title for tc in result.test_cases] == ["Verify report export"]
+
+    def test_concurrent_extraction_respects_max_concurrency(self, extractor, user_story):
+        """extract_test_cases_many overlaps AI calls but never exceeds the concurrency limit"""
+        in_flight = 0
+        peak = 0
+
+        async def fake_completion(messages, temperature, max_tokens, response_format=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return self._response("Verify report export")
+
+        extractor.ai_client.chat_completion_async = fake_completion
+
+        stories = [user_story.model_copy(update={"heading": f"Export audit report {n}"}) for n in range(3)]
+        results = extractor.extract_test_cases_many_sync(stories, ["1", "2", "3"], max_concurrency=2)
+
+        assert peak == 2
+        assert [r.story_id for r in results] == ["1", "2", "3"]
+        assert all(r.extraction_successful for r in results)
+        extractor.ai_client.aclose_async_client.assert_awaited_once()
+
+
+    def test_identical_concurrent_prompts_share_one_ai_call(self, extractor, user_story):
+        """Duplicate stories extracted concurrently wait for one AI call instead of making their own"""
+        calls = 0
+
+        async def fake_completion(messages, temperature, max_tokens, response_format=None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return self._response("Verify report export")
+
+        extractor.ai_client.chat_completion_async = fake_completion
+
+        results = extractor.extract_test_cases_many_sync([user_story] * 3, ["1", "2", "3"])
+
+        assert calls == 1
+        assert [[tc.title for tc in r.test_cases] for r in results] == [["Verify report export"]] * 3
+        assert not extractor._inflight_requests
+
+    def test_batch_extraction_sends_stories_in_one_call(self, extractor, user_story):
+        """Several stories share one AI call, and a story left out of the batched reply is extracted on its own"""
+        stories = [user_story.model_copy(update={"heading": f"Export audit report {n}"}) for n in range(3)]
+        extractor.ai_client.chat_completion.side_effect = [
+            json.dumps({"results": [
+                {"story_index": 0, "tcs": json.loads(self._response("Verify export 0"))["tcs"]},
+                {"story_index": 2, "tcs": json.loads(self._response("Verify export 2"))["tcs"]}
+            ]}),
+            self._response("Verify export 1")
+        ]
+
+        with patch('src.test_case_extractor.Settings.TEST_CASE_EXTRACTION_BATCH_SIZE', 5, create=True):
+            results = extractor.extract_test_cases_batch(stories, ["10", "11", "12"])
+
+        assert extractor.ai_client.chat_completion.call_count == 2
+        assert [r.story_id for r in results] == ["10", "11", "12"]
+        assert [[tc.title for tc in r.test_cases] for r in results] == [["Verify export 0"], ["Verify export 1"], ["Verify export 2"]]
+
+class TestSharedAIClient:
+    def test_extractors_share_one_client_until_the_provider_changes(self):
+        """Test new extractors reuse the AI client and get a new one after the provider settings change"""
+        with patch('src.test_case_extractor.get_ai_client', side_effect=lambda: Mock()), \
+                patch.object(TestCaseExtractor, '_shared_ai_client', None), \
+                patch('src.test_case_extractor.Settings.OPENAI_MODEL', 'gpt-4o-mini'):
+            first = TestCaseExtractor._get_shared_ai_client()
+            assert TestCaseExtractor._get_shared_ai_client() is first
+
+            with patch('src.test_case_extractor.Settings.OPENAI_MODEL', 'gpt-4o'):
+                assert TestCaseExtractor._get_shared_ai_client() is not first
+
+
+class TestFindJsonSpan:
+    def test_ignores_braces_inside_strings_and_trailing_text(self):
+        """Test the span ends at the object's own closing brace, not at braces inside string values"""
+        content = 'Here you go: {"tcs": [{"t": "Handle } in names", "desc": "quote \\" {"}]} Hope this helps!'
+
+        start, end = _find_json_span(content)
+
+        assert content[start:end] == '{"tcs": [{"t": "Handle } in names", "desc": "quote \\" {"}]}'
+
+    def test_unclosed_object_runs_to_the_end(self):
+        assert _find_json_span('{"tcs": [') == (0, 9)
+
+    def test_no_object(self):
+        assert _find_json_span('no json here') == (-1, -1)
+
+
+class TestStoryContextKeywords:
+    @pytest.mark.parametrize("heading, description", [
+        ("Checkout with saved card", "As a shopper I want a third-party payment gateway API so that login stays secure"),
+        ("Relogin after timeout", "Insecure rapid re-access must be audited for GDPR compliance by the employee"),
+        ("Course enrollment", "As a student I want notification emails via webhook"),
+        ("Plain story", "Nothing to see here")
+    ])
+    def test_single_pass_scan_matches_per_keyword_scans(self, heading, description):
+        """Test the Aho-Corasick scan finds the same domain, integrations and security aspects as the keyword loops"""
+        pytest.importorskip("ahocorasick")
+        extractor = TestCaseExtractor.__new__(TestCaseExtractor)
+        text = f"{heading} {description}".lower()
+
+        assert extractor._scan_context_keywords(text) == (
+            extractor._detect_domain(text),
+            extractor._extract_integrations(text),
+            extractor._extract_security_aspects(text)
+        )
+
+    @pytest.mark.parametrize("text, domain", [
+        ("add the product to my cart and pay the order from my account", "e-commerce"),
+        ("transfer money to pay the order", "general"),
+        ("nothing to see here", "general")
+    ])
+    def test_domain_with_most_keyword_hits_wins(self, text, domain):
+        """Test the domain is chosen by keyword hits, falling back to general when none match or the lead is tied"""
+        extractor = TestCaseExtractor.__new__(TestCaseExtractor)
+
+        assert extractor._detect_domain(text) == domain
+
+    def test_tiny_story_skips_context_analysis(self):
+        """Test a story with almost no text gets no context instead of a default domain"""
+        extractor = TestCaseExtractor.__new__(TestCaseExtractor)
+        story = UserStory(heading="Payment page", description="", acceptance_criteria=[])
+
+        assert extractor._analyze_story_context(story) == {}